@@ -32,6 +32,19 @@ DEEPSEEK_MODEL_ID = os.getenv('DEEPSEEK_MODEL_ID', DEEPSEEK_MODEL_ID_DEFAULT)
 CONTENT_MODEL_ID_DEFAULT = "qwen2.5:14b"
 CONTENT_MODEL_ID = os.getenv('CONTENT_MODEL_ID', CONTENT_MODEL_ID_DEFAULT)
 
+# --- Content Model Client Configuration ---
+CONTENT_MODEL_BASE_URL_DEFAULT = "http://127.0.0.1:11434/v1/" # Any OpenAI-compatible endpoint, Ollama by default
+CONTENT_MODEL_BASE_URL = os.getenv('CONTENT_MODEL_BASE_URL', CONTENT_MODEL_BASE_URL_DEFAULT)
+CONTENT_MODEL_TIMEOUT_DEFAULT = 120 # Seconds per request
+CONTENT_MODEL_TIMEOUT = float(os.getenv('CONTENT_MODEL_TIMEOUT', str(CONTENT_MODEL_TIMEOUT_DEFAULT)))
+LLM_MAX_INFLIGHT_DEFAULT = 4 # Concurrent requests per model server, match Ollama's OLLAMA_NUM_PARALLEL
+LLM_MAX_INFLIGHT = int(os.getenv('LLM_MAX_INFLIGHT', str(LLM_MAX_INFLIGHT_DEFAULT)))
+DIGEST_MODEL_TIMEOUT_DEFAULT = 600 # Seconds, the digest generates a long answer
+DIGEST_MODEL_TIMEOUT = float(os.getenv('DIGEST_MODEL_TIMEOUT', str(DIGEST_MODEL_TIMEOUT_DEFAULT)))
+DIGEST_MAX_RETRIES_DEFAULT = 3 # Attempts of the digest request
+DIGEST_MAX_RETRIES = int(os.getenv('DIGEST_MAX_RETRIES', str(DIGEST_MAX_RETRIES_DEFAULT)))
+# --- End Content Model Client Configuration ---
+
 RSS_URL_DEFAULT = None
 RSS_URL = os.getenv('RSS_URL', RSS_URL_DEFAULT)
 RSS_DAYS = int(os.getenv('RSS_DAYS', '1'))
@@ -236,3 +249,115 @@ SOURCE_NAME_MAP = {
     "lol": "英雄联盟",
     "52pojie": "吾爱破解",
 }
+
+# --- Raw HTML Page Cache Configuration ---
+PAGE_CACHE_ENABLED = os.getenv('PAGE_CACHE_ENABLED', 'true').lower() == 'true'
+PAGE_CACHE_TTL_HOURS_DEFAULT = 12 # Pages younger than this are served without any network request
+PAGE_CACHE_TTL_HOURS = float(os.getenv('PAGE_CACHE_TTL_HOURS', str(PAGE_CACHE_TTL_HOURS_DEFAULT)))
+PAGE_CACHE_MAX_AGE_DAYS_DEFAULT = 7 # Older entries are evicted
+PAGE_CACHE_MAX_AGE_DAYS = float(os.getenv('PAGE_CACHE_MAX_AGE_DAYS', str(PAGE_CACHE_MAX_AGE_DAYS_DEFAULT)))
+PAGE_CACHE_MAX_SIZE_MB_DEFAULT = 200
+PAGE_CACHE_MAX_SIZE_MB = float(os.getenv('PAGE_CACHE_MAX_SIZE_MB', str(PAGE_CACHE_MAX_SIZE_MB_DEFAULT)))
+# --- End Raw HTML Page Cache Configuration ---
+
+# --- Redirect Cache Configuration ---
+REDIRECT_CACHE_TTL_DAYS_DEFAULT = 7 # How long a resolved redirect (t.co, proxies, RSSHub) is trusted
+REDIRECT_CACHE_TTL_DAYS = float(os.getenv('REDIRECT_CACHE_TTL_DAYS', str(REDIRECT_CACHE_TTL_DAYS_DEFAULT)))
+# --- End Redirect Cache Configuration ---
+
+# --- Processed Item Store Configuration ---
+ITEM_STORE_TTL_DAYS_DEFAULT = 7 # Processed records older than this are processed again
+ITEM_STORE_TTL_DAYS = float(os.getenv('ITEM_STORE_TTL_DAYS', str(ITEM_STORE_TTL_DAYS_DEFAULT)))
+# --- End Processed Item Store Configuration ---
+
+# --- Processing Pipeline Configuration ---
+# Concurrency of each stage; 0 means "use MAX_WORKERS"
+FETCH_WORKERS = int(os.getenv('FETCH_WORKERS', '0')) # Webpage downloads (network bound)
+EXTRACT_WORKERS = int(os.getenv('EXTRACT_WORKERS', '0')) # Text/publish time extraction (CPU bound)
+SUMMARY_WORKERS = int(os.getenv('SUMMARY_WORKERS', '0')) # Items in the summarize stage at once, 0 means LLM_MAX_INFLIGHT (requests are capped by it)
+PIPELINE_QUEUE_SIZE_DEFAULT = 20 # Max items waiting between two stages
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', str(PIPELINE_QUEUE_SIZE_DEFAULT)))
+# --- End Processing Pipeline Configuration ---
+
+# --- Batch Summarization Configuration ---
+CONTENT_BATCH_ENABLED = os.getenv('CONTENT_BATCH_ENABLED', 'true').lower() == 'true'
+CONTENT_BATCH_TOKEN_BUDGET_DEFAULT = 3000 # Estimated prompt + output tokens of one batch request
+CONTENT_BATCH_TOKEN_BUDGET = int(os.getenv('CONTENT_BATCH_TOKEN_BUDGET', str(CONTENT_BATCH_TOKEN_BUDGET_DEFAULT)))
+CONTENT_BATCH_MAX_ITEMS_DEFAULT = 8
+CONTENT_BATCH_MAX_ITEMS = int(os.getenv('CONTENT_BATCH_MAX_ITEMS', str(CONTENT_BATCH_MAX_ITEMS_DEFAULT)))
+CONTENT_BATCH_ITEM_MAX_TOKENS_DEFAULT = 600 # Longer articles are summarized one per request
+CONTENT_BATCH_ITEM_MAX_TOKENS = int(os.getenv('CONTENT_BATCH_ITEM_MAX_TOKENS', str(CONTENT_BATCH_ITEM_MAX_TOKENS_DEFAULT)))
+CONTENT_BATCH_WAIT_SECONDS_DEFAULT = 2 # How long a partial batch waits for more items
+CONTENT_BATCH_WAIT_SECONDS = float(os.getenv('CONTENT_BATCH_WAIT_SECONDS', str(CONTENT_BATCH_WAIT_SECONDS_DEFAULT)))
+# --- End Batch Summarization Configuration ---
+
+# --- Long Content Summarization Configuration ---
+CONTENT_SINGLE_PASS_TOKENS_DEFAULT = 1500 # Longer content is split into chunks, summarized separately and then combined
+CONTENT_SINGLE_PASS_TOKENS = int(os.getenv('CONTENT_SINGLE_PASS_TOKENS', str(CONTENT_SINGLE_PASS_TOKENS_DEFAULT)))
+CONTENT_CHUNK_TOKENS_DEFAULT = 1200 # Estimated tokens per chunk
+CONTENT_CHUNK_TOKENS = int(os.getenv('CONTENT_CHUNK_TOKENS', str(CONTENT_CHUNK_TOKENS_DEFAULT)))
+CONTENT_MAX_CHUNKS_DEFAULT = 6 # Content beyond this many chunks is not sent to the model
+CONTENT_MAX_CHUNKS = int(os.getenv('CONTENT_MAX_CHUNKS', str(CONTENT_MAX_CHUNKS_DEFAULT)))
+CONTENT_COMPRESS_TOKENS_DEFAULT = 3600 # Longer content is reduced to its most informative sentences first, 0 disables
+CONTENT_COMPRESS_TOKENS = int(os.getenv('CONTENT_COMPRESS_TOKENS', str(CONTENT_COMPRESS_TOKENS_DEFAULT)))
+# --- End Long Content Summarization Configuration ---
+
+# --- Summary Policy Configuration ---
+# Items whose text is already short or whose source gives a usable description skip the content model
+SUMMARY_POLICY_ENABLED = os.getenv('SUMMARY_POLICY_ENABLED', 'true').lower() == 'true'
+SUMMARY_SHORT_TEXT_MIN_CHARS_DEFAULT = 20 # Shorter texts say too little to be a summary
+SUMMARY_SHORT_TEXT_MIN_CHARS = int(os.getenv('SUMMARY_SHORT_TEXT_MIN_CHARS', str(SUMMARY_SHORT_TEXT_MIN_CHARS_DEFAULT)))
+SUMMARY_SHORT_TEXT_MAX_CHARS_DEFAULT = 150 # Texts up to this length (tweets, briefs) are used as the summary as-is
+SUMMARY_SHORT_TEXT_MAX_CHARS = int(os.getenv('SUMMARY_SHORT_TEXT_MAX_CHARS', str(SUMMARY_SHORT_TEXT_MAX_CHARS_DEFAULT)))
+SUMMARY_DESC_MIN_CHARS_DEFAULT = 40 # Source descriptions within these lengths are reused as the summary
+SUMMARY_DESC_MIN_CHARS = int(os.getenv('SUMMARY_DESC_MIN_CHARS', str(SUMMARY_DESC_MIN_CHARS_DEFAULT)))
+SUMMARY_DESC_MAX_CHARS_DEFAULT = 200
+SUMMARY_DESC_MAX_CHARS = int(os.getenv('SUMMARY_DESC_MAX_CHARS', str(SUMMARY_DESC_MAX_CHARS_DEFAULT)))
+# --- End Summary Policy Configuration ---
+
+# --- Tech Prefilter Configuration ---
+# In tech_only runs a local classifier over title and description decides clear cases before fetching
+TECH_PREFILTER_ENABLED = os.getenv('TECH_PREFILTER_ENABLED', 'true').lower() == 'true'
+TECH_PREFILTER_POSITIVE_THRESHOLD_DEFAULT = 0.9 # Items scored at least this are kept without asking the content model
+TECH_PREFILTER_POSITIVE_THRESHOLD = float(os.getenv('TECH_PREFILTER_POSITIVE_THRESHOLD', str(TECH_PREFILTER_POSITIVE_THRESHOLD_DEFAULT)))
+TECH_PREFILTER_NEGATIVE_THRESHOLD_DEFAULT = 0.1 # Items scored at most this are dropped before fetching
+TECH_PREFILTER_NEGATIVE_THRESHOLD = float(os.getenv('TECH_PREFILTER_NEGATIVE_THRESHOLD', str(TECH_PREFILTER_NEGATIVE_THRESHOLD_DEFAULT)))
+TECH_CLASSIFIER_MIN_SAMPLES_DEFAULT = 50 # Labelled items of each class needed to train the model, until then the lexicon is used
+TECH_CLASSIFIER_MIN_SAMPLES = int(os.getenv('TECH_CLASSIFIER_MIN_SAMPLES', str(TECH_CLASSIFIER_MIN_SAMPLES_DEFAULT)))
+# --- End Tech Prefilter Configuration ---
+
+# --- Run Budget Configuration ---
+RUN_DEADLINE_MINUTES_DEFAULT = 0 # Max duration of a run, 0 disables the deadline
+RUN_DEADLINE_MINUTES = float(os.getenv('RUN_DEADLINE_MINUTES', str(RUN_DEADLINE_MINUTES_DEFAULT)))
+# Kept for the final digest (every attempt may run into its timeout) and one minute for the notification
+RUN_DEADLINE_RESERVE_MINUTES_DEFAULT = DIGEST_MODEL_TIMEOUT * DIGEST_MAX_RETRIES / 60 + 1
+RUN_DEADLINE_RESERVE_MINUTES = float(os.getenv('RUN_DEADLINE_RESERVE_MINUTES', str(RUN_DEADLINE_RESERVE_MINUTES_DEFAULT)))
+RUN_DEADLINE_FETCH_MARGIN_MINUTES_DEFAULT = 5 # No new webpage fetches this long before processing must end
+RUN_DEADLINE_FETCH_MARGIN_MINUTES = float(os.getenv('RUN_DEADLINE_FETCH_MARGIN_MINUTES', str(RUN_DEADLINE_FETCH_MARGIN_MINUTES_DEFAULT)))
+RUN_TOKEN_BUDGET_DEFAULT = 0 # Max content model tokens per run for optional work (retries), 0 means unlimited
+RUN_TOKEN_BUDGET = int(os.getenv('RUN_TOKEN_BUDGET', str(RUN_TOKEN_BUDGET_DEFAULT)))
+# --- End Run Budget Configuration ---
+
+# --- Retry Queue Configuration ---
+RETRY_FAILED_ITEMS = os.getenv('RETRY_FAILED_ITEMS', 'true').lower() == 'true'
+RETRY_WORKERS_DEFAULT = 2 # Lower concurrency than the main pass
+RETRY_WORKERS = int(os.getenv('RETRY_WORKERS', str(RETRY_WORKERS_DEFAULT)))
+RETRY_FETCH_TIMEOUT_DEFAULT = 45 # Seconds, the main pass uses 20
+RETRY_FETCH_TIMEOUT = int(os.getenv('RETRY_FETCH_TIMEOUT', str(RETRY_FETCH_TIMEOUT_DEFAULT)))
+# --- End Retry Queue Configuration ---
+
+# --- Content Blob Store Configuration ---
+BLOB_STORE_ENABLED = os.getenv('BLOB_STORE_ENABLED', 'true').lower() == 'true'
+BLOB_SPILL_MIN_CHARS_DEFAULT = 2000 # Item content at least this long is kept on disk instead of in memory
+BLOB_SPILL_MIN_CHARS = int(os.getenv('BLOB_SPILL_MIN_CHARS', str(BLOB_SPILL_MIN_CHARS_DEFAULT)))
+BLOB_STORE_MAX_AGE_HOURS_DEFAULT = 48
+BLOB_STORE_MAX_AGE_HOURS = float(os.getenv('BLOB_STORE_MAX_AGE_HOURS', str(BLOB_STORE_MAX_AGE_HOURS_DEFAULT)))
+# --- End Content Blob Store Configuration ---
+
+
+# --- Summary Cache Configuration ---
+SUMMARY_CACHE_TTL_DAYS_DEFAULT = 30 # Cached content model summaries older than this are generated again
+SUMMARY_CACHE_TTL_DAYS = float(os.getenv('SUMMARY_CACHE_TTL_DAYS', str(SUMMARY_CACHE_TTL_DAYS_DEFAULT)))
+SUMMARY_CACHE_MAX_ENTRIES_DEFAULT = 20000 # Least recently used entries are evicted beyond this
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv('SUMMARY_CACHE_MAX_ENTRIES', str(SUMMARY_CACHE_MAX_ENTRIES_DEFAULT)))
+# --- End Summary Cache Configuration ---
\ No newline at end of file
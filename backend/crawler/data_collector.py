@@ -8,7 +8,9 @@ from datetime import datetime, timedelta, timezone
 from config.config import SOURCE_NAME_MAP, XKIT_TWITTER_FEED, XKIT_TWITTER_FEED_URL
 from crawler.rss_parser import extract_rss_entry
 import json # Ensure json is imported
-from bs4 import BeautifulSoup # Import BeautifulSoup
+from utils.html_text import html_to_text
+from utils.news_item import NewsItem
+from utils.time_utils import struct_time_to_epoch, window_start, filter_by_window, normalize_item_times
 import socket
 
 # Configure logging
@@ -49,14 +51,14 @@ def collect_all_hotspots(sources, base_url):
             # Ensure each hotspot has a title and link
             if "title" in item and "url" in item:
                 # Build hotspot data, keep the desc field
-                hotspot_data = {
+                hotspot_data = NewsItem({
                     "title": item["title"],
                     "url": item["url"],
                     "source": source,
                     "hot": item.get("hot", ""),
                     "time": item.get("time", ""),
                     "timestamp": item.get("timestamp", ""),
-                }
+                })
                 
                 # If there's a summary, keep it
                 if "desc" in item and item["desc"]:
@@ -159,110 +161,107 @@ def _process_single_rss(feed_url, feed_name, headers, days, cutoff_time, current
         is_atom_format = True
         logger.info(f"Detected Atom format RSS source: {feed_name}")
     
+    feed_articles = []
     for entry in feed.entries:
         try:
             # Try to get publish time
             if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                pub_time = datetime.fromtimestamp(time.mktime(entry.published_parsed))
+                pub_time = datetime.fromtimestamp(struct_time_to_epoch(entry.published_parsed))
             elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                pub_time = datetime.fromtimestamp(time.mktime(entry.updated_parsed))
+                pub_time = datetime.fromtimestamp(struct_time_to_epoch(entry.updated_parsed))
             else:
                 # If no time information, assume it's recent
                 pub_time = current_time
             
-            # Only keep articles from the last 'days' days
-            if pub_time >= cutoff_time:
-                # Use standardized RSS parsing function to extract information
-                entry_data = extract_rss_entry(entry)
+            # Use standardized RSS parsing function to extract information
+            entry_data = extract_rss_entry(entry)
                 
-                # Set different source identifier based on source type
-                if feed_name.lower().find('公众号') >= 0:
-                    # If it's a WeChat official account type source
-                    source = "公众号精选"
-                    if entry_data["author"] != "未知作者":
-                        source = f"{feed_name}-{entry_data['author']}"
-                else:
-                    # Other tech blogs or news sources
-                    source = feed_name
+            # Set different source identifier based on source type
+            if feed_name.lower().find('公众号') >= 0:
+                # If it's a WeChat official account type source
+                source = "公众号精选"
+                if entry_data["author"] != "未知作者":
+                    source = f"{feed_name}-{entry_data['author']}"
+            else:
+                # Other tech blogs or news sources
+                source = feed_name
                 
-                # Build article data
-                article_data = {
-                    "title": entry_data["title"],
-                    "url": entry_data["link"],
-                    "source": source,
-                    "hot": "",
-                    "time": pub_time.strftime("%Y-%m-%d %H:%M:%S"),
-                    "timestamp": int(pub_time.timestamp() * 1000),
-                    "published": pub_time.strftime("%Y-%m-%d %H:%M:%S")
-                }
+            # Build article data
+            article_data = NewsItem({
+                "title": entry_data["title"],
+                "url": entry_data["link"],
+                "source": source,
+                "hot": "",
+                "time": pub_time.strftime("%Y-%m-%d %H:%M:%S"),
+                "timestamp": int(pub_time.timestamp() * 1000),
+                "published": pub_time.strftime("%Y-%m-%d %H:%M:%S")
+            })
                 
-                # --- Try to get content first ---
-                content_found = False
+            # --- Try to get content first ---
+            content_found = False
                 
-                # 1. Check content:encoded
-                content_encoded = None
-                if hasattr(entry, 'content_encoded'):
-                    content_encoded = entry.content_encoded
-                elif hasattr(entry, 'get') and entry.get('content_encoded'):
-                    content_encoded = entry.get('content_encoded')
-                elif hasattr(entry, 'tags') and entry.tags:
-                    for tag in entry.tags:
-                        if tag.term == 'content_encoded' or tag.get('term') == 'content_encoded':
-                            content_encoded = tag.value
-                            break
+            # 1. Check content:encoded
+            content_encoded = None
+            if hasattr(entry, 'content_encoded'):
+                content_encoded = entry.content_encoded
+            elif hasattr(entry, 'get') and entry.get('content_encoded'):
+                content_encoded = entry.get('content_encoded')
+            elif hasattr(entry, 'tags') and entry.tags:
+                for tag in entry.tags:
+                    if tag.term == 'content_encoded' or tag.get('term') == 'content_encoded':
+                        content_encoded = tag.value
+                        break
                 
-                if content_encoded:
-                    content_value = content_encoded
-                    if isinstance(content_value, str) and content_value.startswith('<![CDATA[') and content_value.endswith(']]>'):
-                        content_value = content_value[9:-3]
-                    if content_value and len(content_value.strip()) > 20:
-                        article_data["content"] = content_value
-                        logger.info(f"Got content from content:encoded: {entry_data['title'][:30]}...")
-                        content_found = True
+            if content_encoded:
+                content_value = content_encoded
+                if isinstance(content_value, str) and content_value.startswith('<![CDATA[') and content_value.endswith(']]>'):
+                    content_value = content_value[9:-3]
+                if content_value and len(content_value.strip()) > 20:
+                    article_data["content"] = content_value
+                    logger.info(f"Got content from content:encoded: {entry_data['title'][:30]}...")
+                    content_found = True
                 
-                # 2. Check content field
-                if not content_found and hasattr(entry, 'content') and entry.content:
-                    if isinstance(entry.content, list) and len(entry.content) > 0:
-                        content_item = entry.content[0]
-                        content_value = ""
+            # 2. Check content field
+            if not content_found and hasattr(entry, 'content') and entry.content:
+                if isinstance(entry.content, list) and len(entry.content) > 0:
+                    content_item = entry.content[0]
+                    content_value = ""
                         
-                        if isinstance(content_item, dict) and 'value' in content_item:
-                            content_value = content_item['value']
-                        elif hasattr(content_item, 'value'):
-                            content_value = content_item.value
-                        else:
-                            content_value = str(content_item)
+                    if isinstance(content_item, dict) and 'value' in content_item:
+                        content_value = content_item['value']
+                    elif hasattr(content_item, 'value'):
+                        content_value = content_item.value
+                    else:
+                        content_value = str(content_item)
                         
-                        if content_value and len(content_value.strip()) > 20:
-                            article_data["content"] = content_value
-                            logger.info(f"Got content from content field: {entry_data['title'][:30]}...")
-                            content_found = True
-                
-                # 3. Check description field
-                if not content_found and hasattr(entry, 'description') and entry.description:
-                    desc = entry.description
-                    if isinstance(desc, str) and desc.startswith('<![CDATA[') and desc.endswith(']]>'):
-                        desc = desc[9:-3]
-                    if len(desc.strip()) > 20:
-                        article_data["content"] = desc
-                        logger.info(f"Got content from description field: {entry_data['title'][:30]}...")
+                    if content_value and len(content_value.strip()) > 20:
+                        article_data["content"] = content_value
+                        logger.info(f"Got content from content field: {entry_data['title'][:30]}...")
                         content_found = True
                 
-                # --- Get and clean summary (use as desc) ---
-                raw_summary = entry_data.get("summary", "")
-                cleaned_summary_text = ""
-                if raw_summary and isinstance(raw_summary, str):
-                    try:
-                        soup = BeautifulSoup(raw_summary, 'html.parser')
-                        cleaned_summary_text = soup.get_text(strip=True)
-                        if len(cleaned_summary_text) > 10 and not cleaned_summary_text.startswith("点击查看原文"):
-                            article_data["desc"] = cleaned_summary_text
-                            logger.info(f"Got summary from RSS summary: {entry_data['title'][:30]}...")
-                    except Exception as parse_err:
-                        logger.warning(f"Error parsing summary HTML: {parse_err}")
+            # 3. Check description field
+            if not content_found and hasattr(entry, 'description') and entry.description:
+                desc = entry.description
+                if isinstance(desc, str) and desc.startswith('<![CDATA[') and desc.endswith(']]>'):
+                    desc = desc[9:-3]
+                if len(desc.strip()) > 20:
+                    article_data["content"] = desc
+                    logger.info(f"Got content from description field: {entry_data['title'][:30]}...")
+                    content_found = True
+                
+            # --- Get and clean summary (use as desc) ---
+            raw_summary = entry_data.get("summary", "")
+            cleaned_summary_text = ""
+            if raw_summary and isinstance(raw_summary, str):
+                try:
+                    cleaned_summary_text = html_to_text(raw_summary, keep_line_breaks=False)
+                    if len(cleaned_summary_text) > 10 and not cleaned_summary_text.startswith("点击查看原文"):
+                        article_data["desc"] = cleaned_summary_text
+                        logger.info(f"Got summary from RSS summary: {entry_data['title'][:30]}...")
+                except Exception as parse_err:
+                    logger.warning(f"Error parsing summary HTML: {parse_err}")
 
-            all_articles.append(article_data)
-            articles_count += 1
+            feed_articles.append(article_data)
 
         except Exception as entry_err: # Catch errors for this specific entry
             # Log error with entry link if available
@@ -276,6 +275,10 @@ def _process_single_rss(feed_url, feed_name, headers, days, cutoff_time, current
             # Continue to the next entry
             continue
 
+    # Only keep articles from the last 'days' days
+    recent_articles = filter_by_window(feed_articles, cutoff_time.timestamp(), label=f"articles from {feed_name}")
+    all_articles.extend(recent_articles)
+    articles_count = len(recent_articles)
     logger.info(f"Successfully processed {articles_count} articles from RSS source {feed_name} for the last {days} days") # Log count of successfully processed articles
 
 
@@ -408,110 +411,107 @@ def fetch_rss_articles(rss_url=None, days=1, rss_feeds=None):
                     logger.info(f"检测到Atom格式的RSS源: {feed_name}")
                 
                 articles_count = 0
+                feed_articles = []
                 for entry in feed.entries:
                     try:
                         # 尝试获取发布时间
                         if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                            pub_time = datetime.fromtimestamp(time.mktime(entry.published_parsed))
+                            pub_time = datetime.fromtimestamp(struct_time_to_epoch(entry.published_parsed))
                         elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                            pub_time = datetime.fromtimestamp(time.mktime(entry.updated_parsed))
+                            pub_time = datetime.fromtimestamp(struct_time_to_epoch(entry.updated_parsed))
                         else:
                             # 如果没有时间信息，假设是最近的
                             pub_time = current_time
                         
-                        # 只保留最近days天的文章
-                        if pub_time >= cutoff_time:
-                            # 使用标准化的RSS解析函数提取信息
-                            entry_data = extract_rss_entry(entry)
+                        # 使用标准化的RSS解析函数提取信息
+                        entry_data = extract_rss_entry(entry)
                             
-                            # 根据源类型设置不同的source标识
-                            if feed_name.lower().find('公众号') >= 0:
-                                # 如果是公众号类型的源
-                                source = "公众号精选"
-                                if entry_data["author"] != "未知作者":
-                                    source = f"{feed_name}-{entry_data['author']}"
-                            else:
-                                # 其他技术博客或新闻源
-                                source = feed_name
+                        # 根据源类型设置不同的source标识
+                        if feed_name.lower().find('公众号') >= 0:
+                            # 如果是公众号类型的源
+                            source = "公众号精选"
+                            if entry_data["author"] != "未知作者":
+                                source = f"{feed_name}-{entry_data['author']}"
+                        else:
+                            # 其他技术博客或新闻源
+                            source = feed_name
                             
-                            # 构建文章数据
-                            article_data = {
-                                "title": entry_data["title"],
-                                "url": entry_data["link"],
-                                "source": source,
-                                "hot": "",
-                                "time": pub_time.strftime("%Y-%m-%d %H:%M:%S"),
-                                "timestamp": int(pub_time.timestamp() * 1000),
-                                "published": pub_time.strftime("%Y-%m-%d %H:%M:%S")
-                            }
+                        # 构建文章数据
+                        article_data = NewsItem({
+                            "title": entry_data["title"],
+                            "url": entry_data["link"],
+                            "source": source,
+                            "hot": "",
+                            "time": pub_time.strftime("%Y-%m-%d %H:%M:%S"),
+                            "timestamp": int(pub_time.timestamp() * 1000),
+                            "published": pub_time.strftime("%Y-%m-%d %H:%M:%S")
+                        })
                             
-                            # --- 优先尝试获取 content ---
-                            content_found = False
+                        # --- 优先尝试获取 content ---
+                        content_found = False
                             
-                            # 1. 检查 content:encoded
-                            content_encoded = None
-                            if hasattr(entry, 'content_encoded'):
-                                content_encoded = entry.content_encoded
-                            elif hasattr(entry, 'get') and entry.get('content_encoded'):
-                                content_encoded = entry.get('content_encoded')
-                            elif hasattr(entry, 'tags') and entry.tags:
-                                for tag in entry.tags:
-                                    if tag.term == 'content_encoded' or tag.get('term') == 'content_encoded':
-                                        content_encoded = tag.value
-                                        break
+                        # 1. 检查 content:encoded
+                        content_encoded = None
+                        if hasattr(entry, 'content_encoded'):
+                            content_encoded = entry.content_encoded
+                        elif hasattr(entry, 'get') and entry.get('content_encoded'):
+                            content_encoded = entry.get('content_encoded')
+                        elif hasattr(entry, 'tags') and entry.tags:
+                            for tag in entry.tags:
+                                if tag.term == 'content_encoded' or tag.get('term') == 'content_encoded':
+                                    content_encoded = tag.value
+                                    break
                             
-                            if content_encoded:
-                                content_value = content_encoded
-                                if isinstance(content_value, str) and content_value.startswith('<![CDATA[') and content_value.endswith(']]>'):
-                                    content_value = content_value[9:-3]
-                                if content_value and len(content_value.strip()) > 20:
-                                    article_data["content"] = content_value
-                                    logger.info(f"从 content:encoded 获取到内容: {entry_data['title'][:30]}...")
-                                    content_found = True
+                        if content_encoded:
+                            content_value = content_encoded
+                            if isinstance(content_value, str) and content_value.startswith('<![CDATA[') and content_value.endswith(']]>'):
+                                content_value = content_value[9:-3]
+                            if content_value and len(content_value.strip()) > 20:
+                                article_data["content"] = content_value
+                                logger.info(f"从 content:encoded 获取到内容: {entry_data['title'][:30]}...")
+                                content_found = True
                             
-                            # 2. 检查 content 字段
-                            if not content_found and hasattr(entry, 'content') and entry.content:
-                                if isinstance(entry.content, list) and len(entry.content) > 0:
-                                    content_item = entry.content[0]
-                                    content_value = ""
+                        # 2. 检查 content 字段
+                        if not content_found and hasattr(entry, 'content') and entry.content:
+                            if isinstance(entry.content, list) and len(entry.content) > 0:
+                                content_item = entry.content[0]
+                                content_value = ""
                                     
-                                    if isinstance(content_item, dict) and 'value' in content_item:
-                                        content_value = content_item['value']
-                                    elif hasattr(content_item, 'value'):
-                                        content_value = content_item.value
-                                    else:
-                                        content_value = str(content_item)
+                                if isinstance(content_item, dict) and 'value' in content_item:
+                                    content_value = content_item['value']
+                                elif hasattr(content_item, 'value'):
+                                    content_value = content_item.value
+                                else:
+                                    content_value = str(content_item)
                                     
-                                    if content_value and len(content_value.strip()) > 20:
-                                        article_data["content"] = content_value
-                                        logger.info(f"从 content 字段获取到内容: {entry_data['title'][:30]}...")
-                                        content_found = True
-                            
-                            # 3. 检查 description 字段
-                            if not content_found and hasattr(entry, 'description') and entry.description:
-                                desc = entry.description
-                                if isinstance(desc, str) and desc.startswith('<![CDATA[') and desc.endswith(']]>'):
-                                    desc = desc[9:-3]
-                                if len(desc.strip()) > 20:
-                                    article_data["content"] = desc
-                                    logger.info(f"从 description 字段获取到内容: {entry_data['title'][:30]}...")
+                                if content_value and len(content_value.strip()) > 20:
+                                    article_data["content"] = content_value
+                                    logger.info(f"从 content 字段获取到内容: {entry_data['title'][:30]}...")
                                     content_found = True
                             
-                            # --- 获取并清理 summary (用作 desc) ---
-                            raw_summary = entry_data.get("summary", "")
-                            cleaned_summary_text = ""
-                            if raw_summary and isinstance(raw_summary, str):
-                                try:
-                                    soup = BeautifulSoup(raw_summary, 'html.parser')
-                                    cleaned_summary_text = soup.get_text(strip=True)
-                                    if len(cleaned_summary_text) > 10 and not cleaned_summary_text.startswith("点击查看原文"):
-                                        article_data["desc"] = cleaned_summary_text
-                                        logger.info(f"从 RSS summary 获取到摘要: {entry_data['title'][:30]}...")
-                                except Exception as parse_err:
-                                    logger.warning(f"解析摘要HTML时出错: {parse_err}")
-
-                        all_articles.append(article_data)
-                        articles_count += 1
+                        # 3. 检查 description 字段
+                        if not content_found and hasattr(entry, 'description') and entry.description:
+                            desc = entry.description
+                            if isinstance(desc, str) and desc.startswith('<![CDATA[') and desc.endswith(']]>'):
+                                desc = desc[9:-3]
+                            if len(desc.strip()) > 20:
+                                article_data["content"] = desc
+                                logger.info(f"从 description 字段获取到内容: {entry_data['title'][:30]}...")
+                                content_found = True
+                            
+                        # --- 获取并清理 summary (用作 desc) ---
+                        raw_summary = entry_data.get("summary", "")
+                        cleaned_summary_text = ""
+                        if raw_summary and isinstance(raw_summary, str):
+                            try:
+                                cleaned_summary_text = html_to_text(raw_summary, keep_line_breaks=False)
+                                if len(cleaned_summary_text) > 10 and not cleaned_summary_text.startswith("点击查看原文"):
+                                    article_data["desc"] = cleaned_summary_text
+                                    logger.info(f"从 RSS summary 获取到摘要: {entry_data['title'][:30]}...")
+                            except Exception as parse_err:
+                                logger.warning(f"解析摘要HTML时出错: {parse_err}")
+
+                        feed_articles.append(article_data)
 
                     except Exception as entry_err: # Catch errors for this specific entry
                         # Log error with entry link if available
@@ -525,6 +525,10 @@ def fetch_rss_articles(rss_url=None, days=1, rss_feeds=None):
                         # Continue to the next entry
                         continue
 
+                # 只保留最近days天的文章
+                recent_articles = filter_by_window(feed_articles, cutoff_time.timestamp(), label=f"articles from {feed_name}")
+                all_articles.extend(recent_articles)
+                articles_count = len(recent_articles)
                 logger.info(f"从RSS源 {feed_name} 成功处理 {articles_count} 篇最近{days}天的文章") # Log count of successfully processed articles
             except Exception as e:
                  # Log error without assuming 'title' exists in this scope
@@ -602,110 +606,107 @@ def fetch_rss_articles(rss_url=None, days=1, rss_feeds=None):
                 logger.info(f"检测到Atom格式的RSS源")
             
             articles_count = 0
+            feed_articles = []
             for entry in feed.entries:
                 try:
                     # 尝试获取发布时间
                     if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                        pub_time = datetime.fromtimestamp(time.mktime(entry.published_parsed))
+                        pub_time = datetime.fromtimestamp(struct_time_to_epoch(entry.published_parsed))
                     elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                        pub_time = datetime.fromtimestamp(time.mktime(entry.updated_parsed))
+                        pub_time = datetime.fromtimestamp(struct_time_to_epoch(entry.updated_parsed))
                     else:
                         # 如果没有时间信息，假设是最近的
                         pub_time = current_time
                     
-                    # 只保留最近days天的文章
-                    if pub_time >= cutoff_time:
-                        # 使用标准化的RSS解析函数提取信息
-                        entry_data = extract_rss_entry(entry)
+                    # 使用标准化的RSS解析函数提取信息
+                    entry_data = extract_rss_entry(entry)
                         
-                        # 根据源类型设置不同的source标识
-                        if feed_name.lower().find('公众号') >= 0:
-                            # 如果是公众号类型的源
-                            source = "公众号精选"
-                            if entry_data["author"] != "未知作者":
-                                source = f"{feed_name}-{entry_data['author']}"
-                        else:
-                            # 其他技术博客或新闻源
-                            source = feed_name
+                    # 根据源类型设置不同的source标识
+                    if feed_name.lower().find('公众号') >= 0:
+                        # 如果是公众号类型的源
+                        source = "公众号精选"
+                        if entry_data["author"] != "未知作者":
+                            source = f"{feed_name}-{entry_data['author']}"
+                    else:
+                        # 其他技术博客或新闻源
+                        source = feed_name
                         
-                        # 构建文章数据
-                        article_data = {
-                            "title": entry_data["title"],
-                            "url": entry_data["link"],
-                            "source": source,
-                            "hot": "",
-                            "time": pub_time.strftime("%Y-%m-%d %H:%M:%S"),
-                            "timestamp": int(pub_time.timestamp() * 1000),
-                            "published": pub_time.strftime("%Y-%m-%d %H:%M:%S")
-                        }
+                    # 构建文章数据
+                    article_data = NewsItem({
+                        "title": entry_data["title"],
+                        "url": entry_data["link"],
+                        "source": source,
+                        "hot": "",
+                        "time": pub_time.strftime("%Y-%m-%d %H:%M:%S"),
+                        "timestamp": int(pub_time.timestamp() * 1000),
+                        "published": pub_time.strftime("%Y-%m-%d %H:%M:%S")
+                    })
                         
-                        # --- 优先尝试获取 content ---
-                        content_found = False
+                    # --- 优先尝试获取 content ---
+                    content_found = False
                         
-                        # 1. 检查 content:encoded
-                        content_encoded = None
-                        if hasattr(entry, 'content_encoded'):
-                            content_encoded = entry.content_encoded
-                        elif hasattr(entry, 'get') and entry.get('content_encoded'):
-                            content_encoded = entry.get('content_encoded')
-                        elif hasattr(entry, 'tags') and entry.tags:
-                            for tag in entry.tags:
-                                if tag.term == 'content_encoded' or tag.get('term') == 'content_encoded':
-                                    content_encoded = tag.value
-                                    break
+                    # 1. 检查 content:encoded
+                    content_encoded = None
+                    if hasattr(entry, 'content_encoded'):
+                        content_encoded = entry.content_encoded
+                    elif hasattr(entry, 'get') and entry.get('content_encoded'):
+                        content_encoded = entry.get('content_encoded')
+                    elif hasattr(entry, 'tags') and entry.tags:
+                        for tag in entry.tags:
+                            if tag.term == 'content_encoded' or tag.get('term') == 'content_encoded':
+                                content_encoded = tag.value
+                                break
                         
-                        if content_encoded:
-                            content_value = content_encoded
-                            if isinstance(content_value, str) and content_value.startswith('<![CDATA[') and content_value.endswith(']]>'):
-                                content_value = content_value[9:-3]
-                            if content_value and len(content_value.strip()) > 20:
-                                article_data["content"] = content_value
-                                logger.info(f"从 content:encoded 获取到内容: {entry_data['title'][:30]}...")
-                                content_found = True
+                    if content_encoded:
+                        content_value = content_encoded
+                        if isinstance(content_value, str) and content_value.startswith('<![CDATA[') and content_value.endswith(']]>'):
+                            content_value = content_value[9:-3]
+                        if content_value and len(content_value.strip()) > 20:
+                            article_data["content"] = content_value
+                            logger.info(f"从 content:encoded 获取到内容: {entry_data['title'][:30]}...")
+                            content_found = True
                         
-                        # 2. 检查 content 字段
-                        if not content_found and hasattr(entry, 'content') and entry.content:
-                            if isinstance(entry.content, list) and len(entry.content) > 0:
-                                content_item = entry.content[0]
-                                content_value = ""
+                    # 2. 检查 content 字段
+                    if not content_found and hasattr(entry, 'content') and entry.content:
+                        if isinstance(entry.content, list) and len(entry.content) > 0:
+                            content_item = entry.content[0]
+                            content_value = ""
                                 
-                                if isinstance(content_item, dict) and 'value' in content_item:
-                                    content_value = content_item['value']
-                                elif hasattr(content_item, 'value'):
-                                    content_value = content_item.value
-                                else:
-                                    content_value = str(content_item)
+                            if isinstance(content_item, dict) and 'value' in content_item:
+                                content_value = content_item['value']
+                            elif hasattr(content_item, 'value'):
+                                content_value = content_item.value
+                            else:
+                                content_value = str(content_item)
                                 
-                                if content_value and len(content_value.strip()) > 20:
-                                    article_data["content"] = content_value
-                                    logger.info(f"从 content 字段获取到内容: {entry_data['title'][:30]}...")
-                                    content_found = True
-                        
-                        # 3. 检查 description 字段
-                        if not content_found and hasattr(entry, 'description') and entry.description:
-                            desc = entry.description
-                            if isinstance(desc, str) and desc.startswith('<![CDATA[') and desc.endswith(']]>'):
-                                desc = desc[9:-3]
-                            if len(desc.strip()) > 20:
-                                article_data["content"] = desc
-                                logger.info(f"从 description 字段获取到内容: {entry_data['title'][:30]}...")
+                            if content_value and len(content_value.strip()) > 20:
+                                article_data["content"] = content_value
+                                logger.info(f"从 content 字段获取到内容: {entry_data['title'][:30]}...")
                                 content_found = True
                         
-                        # --- 获取并清理 summary (用作 desc) ---
-                        raw_summary = entry_data.get("summary", "")
-                        cleaned_summary_text = ""
-                        if raw_summary and isinstance(raw_summary, str):
-                            try:
-                                soup = BeautifulSoup(raw_summary, 'html.parser')
-                                cleaned_summary_text = soup.get_text(strip=True)
-                                if len(cleaned_summary_text) > 10 and not cleaned_summary_text.startswith("点击查看原文"):
-                                    article_data["desc"] = cleaned_summary_text
-                                    logger.info(f"从 RSS summary 获取到摘要: {entry_data['title'][:30]}...")
-                            except Exception as parse_err:
-                                logger.warning(f"解析摘要HTML时出错: {parse_err}")
+                    # 3. 检查 description 字段
+                    if not content_found and hasattr(entry, 'description') and entry.description:
+                        desc = entry.description
+                        if isinstance(desc, str) and desc.startswith('<![CDATA[') and desc.endswith(']]>'):
+                            desc = desc[9:-3]
+                        if len(desc.strip()) > 20:
+                            article_data["content"] = desc
+                            logger.info(f"从 description 字段获取到内容: {entry_data['title'][:30]}...")
+                            content_found = True
+                        
+                    # --- 获取并清理 summary (用作 desc) ---
+                    raw_summary = entry_data.get("summary", "")
+                    cleaned_summary_text = ""
+                    if raw_summary and isinstance(raw_summary, str):
+                        try:
+                            cleaned_summary_text = html_to_text(raw_summary, keep_line_breaks=False)
+                            if len(cleaned_summary_text) > 10 and not cleaned_summary_text.startswith("点击查看原文"):
+                                article_data["desc"] = cleaned_summary_text
+                                logger.info(f"从 RSS summary 获取到摘要: {entry_data['title'][:30]}...")
+                        except Exception as parse_err:
+                            logger.warning(f"解析摘要HTML时出错: {parse_err}")
 
-                        all_articles.append(article_data)
-                        articles_count += 1
+                    feed_articles.append(article_data)
 
                 except Exception as entry_err: # Catch errors for this specific entry
                     entry_link = "N/A"
@@ -719,6 +720,10 @@ def fetch_rss_articles(rss_url=None, days=1, rss_feeds=None):
                     # Continue to the next entry
                     continue
 
+            # 只保留最近days天的文章
+            recent_articles = filter_by_window(feed_articles, cutoff_time.timestamp(), label=f"articles from {rss_url}")
+            all_articles.extend(recent_articles)
+            articles_count = len(recent_articles)
             logger.info(f"从单个RSS源 {rss_url} 成功处理 {articles_count} 篇最近{days}天的文章") # Log successful count
         except Exception as e:
             logger.error(f"处理单个 RSS 源 {rss_url} 时发生错误: {str(e)}")
@@ -734,73 +739,11 @@ def fetch_rss_articles(rss_url=None, days=1, rss_feeds=None):
 def filter_recent_hotspots(hotspots, days=1):
     """
     Filter hotspot data within the time range
-    Time range: All of yesterday + today until current time
+    Time range: All of yesterday + today until current time (for days=1)
+    Hotspot times are normalized to epoch millisecond timestamps first
     """
-    filtered_hotspots = []
-    current_time = datetime.now()
-    
-    # Set time range: yesterday at 00:00 until now
-    yesterday = current_time.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
-    
-    logger.info(f"Current time: {current_time}, filter time range: {yesterday} to {current_time}")
-    
-    for item in hotspots:
-        # Try to parse timestamp
-        timestamp = item.get("timestamp") or item.get("time", "")
-        
-        if timestamp:
-            try:
-                # Convert timestamp to datetime object
-                if isinstance(timestamp, str):
-                    if 'T' in timestamp and ('Z' in timestamp or '+' in timestamp):
-                        # ISO format: 2025-03-08T12:04:22.020Z
-                        item_time = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                    else:
-                        # Try to process as number
-                        timestamp = float(timestamp)
-                        # Convert millisecond timestamp to second timestamp
-                        if timestamp > 9999999999:
-                            timestamp = timestamp / 1000
-                        item_time = datetime.fromtimestamp(timestamp)
-                else:
-                    # Numeric timestamp
-                    if timestamp > 9999999999:  # Millisecond timestamp
-                        timestamp = timestamp / 1000
-                    item_time = datetime.fromtimestamp(float(timestamp))
-                
-                # Check if time is in the future (possibly an incorrect timestamp)
-                if item_time > current_time + timedelta(hours=1):
-                    # Could be a future timestamp, try to adjust the year
-                    logger.warning(f"Detected future timestamp: {item_time}, title: {item['title']}")
-                    
-                    # If the timestamp year is a future year, adjust to current year
-                    if item_time.year > current_time.year:
-                        adjusted_year = current_time.year
-                        try:
-                            item_time = item_time.replace(year=adjusted_year)
-                            logger.info(f"Adjusted timestamp year to current year: {item_time}")
-                        except ValueError as e:
-                            logger.warning(f"Failed to adjust timestamp year: {str(e)}")
-                
-                # Log the parse result
-                logger.info(f"Hotspot: {item['title'][:30]}..., time: {item_time}")
-                
-                # Only keep hotspots from yesterday at 00:00 until now
-                if yesterday <= item_time <= current_time:
-                    filtered_hotspots.append(item)
-                    continue
-                else:
-                    logger.info(f"Discarded hotspot outside time range: {item['title']}, time: {item_time}")
-                    continue
-            except (ValueError, TypeError) as e:
-                logger.warning(f"Failed to parse timestamp: {timestamp}, error: {str(e)}, title: {item['title']}")
-        
-        # If no valid timestamp or parsing failed, keep the item by default
-        logger.info(f"No valid timestamp, keeping by default: {item['title']}")
-        filtered_hotspots.append(item)
-    
-    logger.info(f"Kept {len(filtered_hotspots)}/{len(hotspots)} hotspots after time range filtering")
-    return filtered_hotspots
+    normalize_item_times(hotspots)
+    return filter_by_window(hotspots, window_start(days), label="hotspots")
 
 def fetch_twitter_feed(days_to_fetch=2):
     """
@@ -888,7 +831,7 @@ def fetch_twitter_feed(days_to_fetch=2):
                         # If neither is available, keep "Twitter"
 
                     # Format as standard dictionary
-                    formatted_tweet = {
+                    formatted_tweet = NewsItem({
                         "title": title,
                         "url": tweet.get("tweetUrl", ""),
                         "source": source_name,
@@ -898,7 +841,7 @@ def fetch_twitter_feed(days_to_fetch=2):
                         "timestamp": timestamp_ms, # Use millisecond timestamp
                         "published": published_str, # Add published field again to be compatible with RSS format
                         "desc": full_text, # Use full tweet text as initial description
-                    }
+                    })
                     # Tweets don't have a preset summary, so desc field is not added
 
                     all_tweets_formatted.append(formatted_tweet)
@@ -1,8 +1,9 @@
 import logging
-import time
 from datetime import datetime
 from typing import Dict, Any, Optional, List, Union
 
+from utils.time_utils import struct_time_to_epoch
+
 logger = logging.getLogger(__name__)
 
 
@@ -125,11 +126,11 @@ def _extract_publish_time(entry: Any) -> Optional[datetime]:
     """
     # Prefer published_parsed field
     if hasattr(entry, 'published_parsed') and entry.published_parsed:
-        return datetime.fromtimestamp(time.mktime(entry.published_parsed))
+        return datetime.fromtimestamp(struct_time_to_epoch(entry.published_parsed))
     
     # Otherwise use updated_parsed field
     if hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-        return datetime.fromtimestamp(time.mktime(entry.updated_parsed))
+        return datetime.fromtimestamp(struct_time_to_epoch(entry.updated_parsed))
     
     return None
 
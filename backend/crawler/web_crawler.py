@@ -8,6 +8,7 @@ from threading import Lock
 from bs4 import BeautifulSoup
 from dateutil import parser as date_parser
 from datetime import datetime
+from urllib.parse import urlsplit
 
 # Import professional news content extraction libraries
 import newspaper
@@ -16,18 +17,31 @@ import trafilatura
 from trafilatura.settings import use_config
 from trafilatura import extract
 
+from utils.page_cache import page_cache
+from utils.redirect_cache import redirect_cache
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Global request lock
-request_lock = Lock()
+# Per-host request locks: one request at a time to the same site, different sites in parallel
+_host_locks = {}
+_host_locks_guard = Lock()
+
+def _get_host_lock(url):
+    host = urlsplit(url).netloc.lower()
+    with _host_locks_guard:
+        if host not in _host_locks:
+            _host_locks[host] = Lock()
+        return _host_locks[host]
 
-def fetch_webpage_content(url, timeout=20, max_retries=3, existing_content=None, fetch_html_only=False):
+def fetch_webpage_content(url, timeout=20, max_retries=3, existing_content=None, fetch_html_only=False, use_page_cache=True):
     """
     Get webpage content, return processed text content and original HTML
     If existing_content is provided, use it directly without crawling
     Use cloudscraper to try to bypass Cloudflare, then use multiple methods to extract content
     If fetch_html_only is True, then only get the raw HTML, without extracting the text content.
+    If use_page_cache is True, fresh pages are served from the on-disk page cache and stale
+    ones are revalidated with ETag/Last-Modified before downloading again.
     """
     # Check if there is substantial existing content (length greater than 10 after removing leading and trailing spaces)
     has_substantial_existing_content = (
@@ -37,18 +51,60 @@ def fetch_webpage_content(url, timeout=20, max_retries=3, existing_content=None,
     if has_substantial_existing_content and not fetch_html_only:
         logger.info(f"Detected existing substantial content ({len(existing_content)} characters), skipping crawling: {url}")
         return existing_content, None 
-    
+
+    html_content, cached_text = fetch_webpage_html(url, timeout=timeout, max_retries=max_retries,
+                                                   use_page_cache=use_page_cache)
+    if not html_content:
+        return "", ""
+
+    # If only HTML is needed, return directly
+    if fetch_html_only:
+        logger.info(f"Only getting original HTML: {url}, HTML length: {len(html_content)}")
+        return None, html_content
+
+    if cached_text is not None:
+        return cached_text, html_content
+
+    # Use multiple methods to extract content
+    processed_content = extract_webpage_text(html_content, url, use_page_cache=use_page_cache)
+    logger.info(f"Got webpage content: {url}, original HTML length: {len(html_content)}, processed text length: {len(processed_content)} characters")
+    return processed_content, html_content
+
+def fetch_webpage_html(url, timeout=20, max_retries=3, use_page_cache=True):
+    """
+    Download the raw HTML of a webpage (network only, no text extraction)
+    Returns (html_content, cached_text): cached_text is the text extracted earlier from the same
+    page when it was served from the page cache, otherwise None. html_content is "" on failure.
+    """
+    cached_entry = page_cache.get(url) if use_page_cache else None
+    if cached_entry and page_cache.is_fresh(cached_entry):
+        logger.info(f"Serving webpage from page cache: {url}")
+        return cached_entry.get("html", ""), cached_entry.get("text")
+
+    # Conditional request headers for revalidating a stale cache entry
+    conditional_headers = {}
+    if cached_entry:
+        if cached_entry.get("etag"):
+            conditional_headers["If-None-Match"] = cached_entry["etag"]
+        if cached_entry.get("last_modified"):
+            conditional_headers["If-Modified-Since"] = cached_entry["last_modified"]
+
+    # Skip known redirect hops (t.co, RSSHub, proxies) and go straight to the final page
+    fetch_url = redirect_cache.resolve(url)
+    if fetch_url != url:
+        logger.info(f"Using cached redirect target: {url} -> {fetch_url}")
+
     retry_count = 0
     while retry_count < max_retries:
         try:
-            # Use lock to ensure only one request at a time
-            with request_lock:
-                # Add random delay to avoid frequent requests
-                if retry_count > 0:
-                    delay = random.uniform(1, 5)
-                    logger.info(f"Waiting {delay:.2f} seconds before retrying...")
-                    time.sleep(delay)
+            # Add random delay to avoid frequent requests
+            if retry_count > 0:
+                delay = random.uniform(1, 5)
+                logger.info(f"Waiting {delay:.2f} seconds before retrying...")
+                time.sleep(delay)
 
+            # Use lock to ensure only one request at a time per site
+            with _get_host_lock(fetch_url):
                 # Create cloudscraper instance
                 scraper = cloudscraper.create_scraper(
                     browser={
@@ -59,23 +115,26 @@ def fetch_webpage_content(url, timeout=20, max_retries=3, existing_content=None,
                 )
 
                 # Use scraper.get to get webpage
-                response = scraper.get(url, timeout=timeout, verify=True, allow_redirects=True)
-                response.raise_for_status()
+                response = scraper.get(fetch_url, timeout=timeout, verify=True, allow_redirects=True,
+                                       headers=conditional_headers or None)
 
-                # Get original HTML content
-                html_content = response.text
+            # Cached copy is still valid, no body was transferred
+            if response.status_code == 304 and cached_entry:
+                logger.info(f"Page not modified, serving from page cache: {url}")
+                page_cache.touch(url)
+                return cached_entry.get("html", ""), cached_entry.get("text")
 
-                # If only HTML is needed, return directly
-                if fetch_html_only:
-                    logger.info(f"Only getting original HTML: {url}, HTML length: {len(html_content)}")
-                    return None, html_content
+            response.raise_for_status()
+            # Only a chain that ends on the page itself is worth remembering, not one ending on an error page
+            redirect_cache.record_response(url, response)
 
-                # Use multiple methods to extract content
-                processed_content = extract_content_with_multiple_methods(html_content, url)
-                
-                logger.info(f"Got webpage content: {url}, original HTML length: {len(html_content)}, processed text length: {len(processed_content)} characters")
-                
-                return processed_content, html_content
+            # Get original HTML content
+            html_content = response.text
+            if use_page_cache:
+                page_cache.put(url, html_content, final_url=response.url,
+                               etag=response.headers.get("ETag"),
+                               last_modified=response.headers.get("Last-Modified"))
+            return html_content, None
 
         except Exception as e:
             retry_count += 1
@@ -83,7 +142,16 @@ def fetch_webpage_content(url, timeout=20, max_retries=3, existing_content=None,
                 logger.warning(f"Failed to get webpage content: {url}, error: {str(e)}, will add random delay on next retry...")
             else:
                 logger.error(f"Failed to get webpage content: {url}, error: {str(e)}")
-                return "", ""
+    return "", None
+
+def extract_webpage_text(html_content, url, use_page_cache=True):
+    """
+    Extract the article text from downloaded HTML (CPU only) and store it in the page cache
+    """
+    processed_content = extract_content_with_multiple_methods(html_content, url)
+    if use_page_cache:
+        page_cache.store_text(url, html_content, processed_content)
+    return processed_content
 
 def extract_content_with_multiple_methods(html_content, url):
     """
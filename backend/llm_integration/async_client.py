@@ -0,0 +1,126 @@
+import time
+import asyncio
+import logging
+
+import httpx
+
+from config.config import CONTENT_MODEL_ID, CONTENT_MODEL_BASE_URL, CONTENT_MODEL_TIMEOUT, LLM_MAX_INFLIGHT
+from utils.token_tracker import token_tracker
+
+logger = logging.getLogger(__name__)
+
+
+def chat_completions_url(base_url):
+    """
+    Chat completions endpoint for an OpenAI-compatible base URL (full endpoints are kept)
+    """
+    base_url = base_url.rstrip('/')
+    if base_url.endswith("/chat/completions"):
+        return base_url
+    return f"{base_url}/chat/completions"
+
+
+def response_text(result):
+    """
+    Message text of a chat completions response
+    """
+    return (result["choices"][0]["message"].get("content") or "").strip()
+
+
+class AsyncLLMClient:
+    """
+    asyncio client for an OpenAI-compatible chat completions endpoint
+
+    At most max_inflight requests are sent at the same time; size it to the parallel
+    slots of the model server (e.g. OLLAMA_NUM_PARALLEL), further callers wait without
+    holding a thread. The HTTP connection pool and the limit belong to one event loop
+    and are recreated when the client is used from another one; call aclose() (or use
+    the client with async with) before the loop ends.
+    """
+
+    def __init__(self, url, model, api_key=None, timeout=CONTENT_MODEL_TIMEOUT, max_inflight=LLM_MAX_INFLIGHT,
+                 verify=True):
+        self.url = url
+        self.model = model
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_inflight = max_inflight
+        self.verify = verify
+        self._loop = None
+        self._http_client = None
+        self._slots = None
+
+    async def _bind(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._http_client is not None:
+                # Left open by a previous event loop, its connections cannot be reused here
+                logger.warning("LLM client was not closed before its event loop ended, closing it now")
+                await self._close_stale_client()
+            self._loop = loop
+            self._http_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                verify=self.verify,
+                limits=httpx.Limits(max_connections=self.max_inflight, max_keepalive_connections=self.max_inflight),
+            )
+            self._slots = asyncio.Semaphore(self.max_inflight)
+        return self._http_client, self._slots
+
+    async def chat(self, messages, api_key=None, temperature=0.3, stage=None, source=None, **params):
+        """
+        Send one chat completions request and return the decoded JSON response
+        Raises on HTTP errors and responses without choices. Token usage (reported by the
+        API or estimated) and the request latency are recorded in token_tracker under
+        stage and source (see TokenTracker.add_usage).
+        """
+        http_client, slots = await self._bind()
+        payload = {"model": self.model, "messages": messages, "temperature": temperature, **params}
+        headers = {"Authorization": f"Bearer {api_key or self.api_key or 'ollama'}"}
+        async with slots:
+            # Measured inside the slot so time spent waiting for it is not counted
+            started = time.monotonic()
+            response = await http_client.post(self.url, json=payload, headers=headers)
+            latency = time.monotonic() - started
+        response.raise_for_status()
+        result = response.json()
+        if not result.get("choices"):
+            raise ValueError(f"API响应格式不正确: {response.text[:200]}...")
+        token_tracker.record_response(
+            self.model, "\n".join(message["content"] for message in messages), response_text(result),
+            result.get("usage"), stage=stage, source=source, latency=latency
+        )
+        return result
+
+    async def complete(self, prompt, api_key=None, system=None, temperature=0.3, stage=None, source=None):
+        """
+        Send a single user prompt, return (text, usage) where usage may be None
+        """
+        messages = [{"role": "system", "content": system}] if system else []
+        messages.append({"role": "user", "content": prompt})
+        result = await self.chat(messages, api_key=api_key, temperature=temperature, stage=stage, source=source)
+        return response_text(result), result.get("usage")
+
+    async def _close_stale_client(self):
+        http_client, self._http_client = self._http_client, None
+        try:
+            await http_client.aclose()
+        except Exception as e:
+            # Transports of a closed loop may fail to close, they are dropped either way
+            logger.debug(f"Failed to close stale LLM client: {str(e)}")
+
+    async def aclose(self):
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+            self._loop = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+# Global content model client instance, shared by all per-article summary requests
+content_client = AsyncLLMClient(chat_completions_url(CONTENT_MODEL_BASE_URL), CONTENT_MODEL_ID,
+                                timeout=CONTENT_MODEL_TIMEOUT)
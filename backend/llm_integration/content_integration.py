@@ -1,53 +1,30 @@
+import re
 import json
+import asyncio
 import logging
-import time
-from langchain.chains import LLMChain
 from langchain_core.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
 
-from utils.utils import get_content_hash, load_summary_cache, save_summary_cache
-from utils.token_tracker import token_tracker
-from config.config import CONTENT_MODEL_ID
+from utils.utils import get_content_hash
+from utils.summary_store import summary_store
+from utils.single_flight import AsyncSingleFlight
+from utils.token_tracker import estimate_tokens
+from utils.extractive_summary import split_sentences, sentence_separator, extract_summary
+from llm_integration.async_client import content_client
+from config.config import (
+    CONTENT_MODEL_ID, CONTENT_BATCH_TOKEN_BUDGET, CONTENT_BATCH_MAX_ITEMS, CONTENT_SINGLE_PASS_TOKENS,
+    CONTENT_CHUNK_TOKENS, CONTENT_MAX_CHUNKS, CONTENT_COMPRESS_TOKENS
+)
 
 logger = logging.getLogger(__name__)
 
-def summarize_with_content_model(content, api_key, title="", max_retries=3, use_cache=True):
-    """
-    使用内容处理模型对内容进行概述总结
-    返回JSON格式，包含摘要和科技相关性判断
-    支持缓存机制，避免重复处理相同内容
-    """
-    if not content or len(content.strip()) < 50:
-        logger.warning(f"内容过短或为空，跳过摘要生成: {content[:50]}...")
-        return {"summary": "", "is_tech": False}
-    
-    content_hash = get_content_hash(content[:2000])  # 只对前2000字符计算哈希
-    
-    if use_cache and content_hash:
-        # 加载缓存
-        summary_cache = load_summary_cache()
-        
-        if content_hash in summary_cache:
-            cached_result = summary_cache[content_hash]
-            logger.info(f"从缓存中获取摘要: {cached_result['summary'][:30]}...")
-            return cached_result
-    
-    retry_count = 0
-    while retry_count < max_retries:
-        try:
-            logger.info(f"发送至内容处理模型的内容长度: {len(content[:2000])} 字符")
-            
-            llm = ChatOpenAI(
-                model=CONTENT_MODEL_ID,  
-                temperature=0.3,
-                api_key='ollama',
-                # max_tokens=150,
-                base_url="http://127.0.0.1:11434/v1/"  
-            )
-            
-            prompt = PromptTemplate(
-                input_variables=["content", "title"],
-                template="""请对以下新闻内容进行简洁概述，并判断是否与科技相关（包括AI、人工智能、互联网、软件、硬件、电子产品等）。请优先通过新闻标题来判断是否与科技相关，如果标题中没有科技相关的关键词，请通过新闻内容来判断。
+# Part of the summary cache key, bump it whenever a prompt or the result format changes
+# (single and batch results are interchangeable and share the cache)
+SUMMARY_PROMPT_VERSION = "2"
+
+# Compiled once at import, shared by all calls
+SUMMARY_PROMPT = PromptTemplate(
+    input_variables=["content", "title"],
+    template="""请对以下新闻内容进行简洁概述，并判断是否与科技相关（包括AI、人工智能、互联网、软件、硬件、电子产品等）。请优先通过新闻标题来判断是否与科技相关，如果标题中没有科技相关的关键词，请通过新闻内容来判断。
                     
                     新闻标题：{title}
                     新闻内容：
@@ -60,61 +37,388 @@ def summarize_with_content_model(content, api_key, title="", max_retries=3, use_
                     只返回JSON格式，不要有任何额外说明。
                     /no_think
                     """
-            )
-            
-            chain = LLMChain(llm=llm, prompt=prompt)
-            
-            response = chain.invoke({"content": content[:2000], "title": title})  # 限制输入长度
-            
-            result_text = response.get("text", "").strip()
-            
-            try:
-                if not result_text.startswith("{"):
-                    import re
-                    json_match = re.search(r'({.*})', result_text, re.DOTALL)
-                    if json_match:
-                        result_text = json_match.group(1)
-                
-                result = json.loads(result_text)
-                
-                if "summary" not in result:
-                    result["summary"] = ""
-                if "is_tech" not in result:
-                    result["is_tech"] = False
-                
-                # Track token usage for content model
-                token_tracker.add_usage(
-                    CONTENT_MODEL_ID,
-                    prompt_tokens=len(content[:2000]) // 4,  # Rough estimate
-                    completion_tokens=len(result_text) // 4   # Rough estimate
-                )
-                
-                logger.info(f"生成的摘要: {result['summary']}, 科技相关: {result['is_tech']}")
-                
-                if use_cache and content_hash:
-                    summary_cache = load_summary_cache()
-                    summary_cache[content_hash] = result
-                    save_summary_cache(summary_cache)
-                
-                return result
-            except json.JSONDecodeError:
-                logger.warning(f"JSON解析失败，使用原始文本: {result_text}")
-                result = {"summary": result_text[:80], "is_tech": False}
-                
-                if use_cache and content_hash:
-                    summary_cache = load_summary_cache()
-                    summary_cache[content_hash] = result
-                    save_summary_cache(summary_cache)
-                
-                return result
-        
+)
+
+BATCH_SUMMARY_PROMPT = PromptTemplate(
+    input_variables=["articles"],
+    template="""以下是多篇新闻（JSON数组，每篇包含id、title、content）。请对每篇新闻分别进行简洁概述，并判断是否与科技相关（包括AI、人工智能、互联网、软件、硬件、电子产品等）。请优先通过新闻标题来判断是否与科技相关，如果标题中没有科技相关的关键词，请通过新闻内容来判断。
+
+                    {articles}
+
+                    请以JSON数组格式返回，每篇新闻对应一个对象，包含以下字段：
+                    1. id: 与输入相同的id
+                    2. summary: 新闻摘要，不超过150个字
+                    3. is_tech: 布尔值，表示是否与科技相关
+
+                    必须覆盖所有输入的id，只返回JSON数组，不要有任何额外说明。
+                    /no_think
+                    """
+)
+# Rough token cost of the batch instructions and of one summary in the output
+BATCH_PROMPT_TOKENS = 200
+BATCH_OUTPUT_TOKENS_PER_ITEM = 120
+
+# Map step for long content: one section at a time, plain text notes
+CHUNK_SUMMARY_PROMPT = PromptTemplate(
+    input_variables=["title", "index", "total", "content"],
+    template="""以下是新闻《{title}》全文的第{index}/{total}部分。请提炼这一部分的关键信息（事实、数据、观点），不超过200个字，只返回要点文本，不要有任何额外说明。
+
+                    {content}
+                    /no_think
+                    """
+)
+# Reduce step: the section notes go through SUMMARY_PROMPT as the article content
+REDUCE_CONTENT_HEADER = "（以下为长文各部分的要点）"
+
+_WHITESPACE_PATTERN = re.compile(r'[ \t\r\f\v]+')
+_BLANK_LINES_PATTERN = re.compile(r'\n\s*\n+')
+
+
+# Identical inputs summarized at the same time share one request (keyed like the summary cache)
+_async_summary_flight = AsyncSingleFlight()
+
+
+def normalize_content(content):
+    """
+    Collapse runs of spaces and blank lines so formatting differences do not change the cache key
+    """
+    lines = _WHITESPACE_PATTERN.sub(' ', content or "").split('\n')
+    return _BLANK_LINES_PATTERN.sub('\n\n', '\n'.join(line.strip() for line in lines)).strip()
+
+
+def _split_long_text(text, max_tokens):
+    # Hard split for a sentence longer than a chunk (no punctuation, e.g. scraped tables)
+    pieces = []
+    piece = ""
+    for char in text:
+        if piece and estimate_tokens(piece + char) > max_tokens:
+            pieces.append(piece)
+            piece = ""
+        piece += char
+    if piece:
+        pieces.append(piece)
+    return pieces
+
+
+def chunk_text(text, max_tokens=CONTENT_CHUNK_TOKENS):
+    """
+    Split text into chunks of at most max_tokens estimated tokens, breaking between
+    paragraphs, then between sentences, and only inside a sentence when it is too long
+    """
+    chunks = []
+    chunk = []
+    chunk_tokens = 0
+    for paragraph in text.split('\n'):
+        sentences = split_sentences(paragraph)
+        for index, sentence in enumerate(sentences):
+            # Keep the paragraph break with the paragraph's last sentence
+            sentence += '\n' if index == len(sentences) - 1 else sentence_separator(sentence)
+            tokens = estimate_tokens(sentence)
+            parts = [sentence] if tokens <= max_tokens else _split_long_text(sentence, max_tokens)
+            for part in parts:
+                part_tokens = tokens if len(parts) == 1 else estimate_tokens(part)
+                if chunk and chunk_tokens + part_tokens > max_tokens:
+                    chunks.append("".join(chunk).strip())
+                    chunk = []
+                    chunk_tokens = 0
+                chunk.append(part)
+                chunk_tokens += part_tokens
+    if chunk:
+        chunks.append("".join(chunk).strip())
+    return [c for c in chunks if c]
+
+
+def _summary_key(content_hash):
+    return (content_hash, CONTENT_MODEL_ID, SUMMARY_PROMPT_VERSION)
+
+
+def _lookup_cached_summary(content, use_cache):
+    """
+    Return (content_hash, cached result or None)
+    The hash covers the whole normalized content, not just the part a single request sees
+    """
+    content_hash = get_content_hash(normalize_content(content))
+    if use_cache and content_hash:
+        # 缓存按模型和提示词版本区分，更换模型后不会返回旧摘要
+        cached_result = summary_store.get(content_hash, CONTENT_MODEL_ID, SUMMARY_PROMPT_VERSION)
+        if cached_result is not None:
+            logger.info(f"从缓存中获取摘要: {cached_result['summary'][:30]}...")
+            return content_hash, cached_result
+    return content_hash, None
+
+
+def parse_summary_response(result_text):
+    """
+    Parse the content model answer into {summary, is_tech}, using the raw text if it is not JSON
+    """
+    try:
+        if not result_text.startswith("{"):
+            json_match = re.search(r'({.*})', result_text, re.DOTALL)
+            if json_match:
+                result_text = json_match.group(1)
+        result = json.loads(result_text)
+        if "summary" not in result:
+            result["summary"] = ""
+        if "is_tech" not in result:
+            result["is_tech"] = False
+        return result
+    except json.JSONDecodeError:
+        logger.warning(f"JSON解析失败，使用原始文本: {result_text}")
+        return {"summary": result_text[:80], "is_tech": False}
+
+
+def _store_summary(content_hash, result, use_cache):
+    logger.info(f"生成的摘要: {result['summary']}, 科技相关: {result['is_tech']}")
+    if use_cache and content_hash:
+        summary_store.put(content_hash, CONTENT_MODEL_ID, SUMMARY_PROMPT_VERSION, result)
+    return result
+
+
+def summarize_with_content_model(content, api_key, title="", max_retries=3, use_cache=True, source=None):
+    """
+    使用内容处理模型对内容进行概述总结
+    返回JSON格式，包含摘要和科技相关性判断
+    支持缓存机制，避免重复处理相同内容
+    同步调用 summarize_with_content_model_async，只能在没有运行中事件循环的代码中使用
+    """
+    async def summarize():
+        try:
+            return await summarize_with_content_model_async(content, api_key, title=title, max_retries=max_retries,
+                                                            use_cache=use_cache, source=source)
+        finally:
+            # The client's connections belong to this event loop
+            await content_client.aclose()
+
+    return asyncio.run(summarize())
+
+
+async def summarize_with_content_model_async(content, api_key, title="", max_retries=3, use_cache=True, source=None):
+    """
+    通过异步客户端请求内容处理模型生成摘要，等待期间不占用线程
+    同时发送的请求数受 LLM_MAX_INFLIGHT 限制，token用量按条目来源 source 统计
+    """
+    if not content or len(content.strip()) < 50:
+        logger.warning(f"内容过短或为空，跳过摘要生成: {content[:50]}...")
+        return {"summary": "", "is_tech": False}
+
+    content_hash, cached_result = _lookup_cached_summary(content, use_cache)
+    if cached_result is not None:
+        return cached_result
+
+    # 相同内容正在生成摘要时等待其结果，不重复请求
+    return await _async_summary_flight.do(_summary_key(content_hash), _generate_summary_async, content, api_key,
+                                          title, max_retries, use_cache, content_hash, source)
+
+
+async def _complete_with_retries(prompt, api_key, max_retries, stage, source):
+    """
+    Send prompt to the content model, retrying failures; returns the answer text or None
+    """
+    for attempt in range(1, max_retries + 1):
+        try:
+            result_text, _ = await content_client.complete(prompt, api_key=api_key, stage=stage, source=source)
+            return result_text
         except Exception as e:
             logger.error(f"调用内容处理模型失败: {str(e)}")
-            retry_count += 1
-            if retry_count < max_retries:
-                logger.warning(f"5秒后重试 ({retry_count}/{max_retries})...")
-                time.sleep(5)
-            else:
-                break
-    
-    return {"summary": "", "is_tech": False}
+            if attempt < max_retries:
+                logger.warning(f"5秒后重试 ({attempt}/{max_retries})...")
+                await asyncio.sleep(5)
+    return None
+
+
+async def _map_chunks(content, api_key, title, max_retries, source):
+    """
+    Map step of long content: summarize the chunks in parallel, return the notes of the
+    chunks that succeeded joined as the content for the reduce request (empty if none did)
+    """
+    chunks = chunk_text(content)
+    if len(chunks) > CONTENT_MAX_CHUNKS:
+        logger.warning(f"内容过长，只使用前 {CONTENT_MAX_CHUNKS}/{len(chunks)} 段: {title}")
+        chunks = chunks[:CONTENT_MAX_CHUNKS]
+    logger.info(f"长文分为 {len(chunks)} 段分别摘要后合并, 约 {estimate_tokens(content)} tokens: {title}")
+    notes = await asyncio.gather(*(
+        _complete_with_retries(
+            CHUNK_SUMMARY_PROMPT.format(title=title, index=index, total=len(chunks), content=chunk),
+            api_key, max_retries, "chunk_summary", source
+        )
+        for index, chunk in enumerate(chunks, 1)
+    ))
+    notes = [f"{index}. {note.strip()}" for index, note in enumerate(notes, 1) if note and note.strip()]
+    if len(notes) < len(chunks):
+        logger.warning(f"{len(chunks) - len(notes)}/{len(chunks)} 段摘要失败: {title}")
+    return "\n".join([REDUCE_CONTENT_HEADER] + notes) if notes else ""
+
+
+async def _generate_summary_async(content, api_key, title, max_retries, use_cache, content_hash, source=None):
+    """
+    Content within CONTENT_SINGLE_PASS_TOKENS is summarized in one request; longer content is
+    split into chunks summarized in parallel (map) and the notes are summarized again (reduce).
+    Content over CONTENT_COMPRESS_TOKENS is first reduced locally to its most informative
+    sentences (the cache key still covers the original content).
+    """
+    content = normalize_content(content)
+    content_tokens = estimate_tokens(content)
+    if CONTENT_COMPRESS_TOKENS and content_tokens > CONTENT_COMPRESS_TOKENS:
+        compressed = extract_summary(content, max_tokens=CONTENT_COMPRESS_TOKENS)
+        if compressed:
+            logger.info(f"抽取关键句压缩内容: 约 {content_tokens} -> {estimate_tokens(compressed)} tokens: {title}")
+            content = compressed
+    stage = "summary"
+    if estimate_tokens(content) > CONTENT_SINGLE_PASS_TOKENS:
+        content = await _map_chunks(content, api_key, title, max_retries, source)
+        if not content:
+            return {"summary": "", "is_tech": False}
+        stage = "reduce_summary"
+
+    logger.info(f"发送至内容处理模型的内容长度: {len(content)} 字符")
+    result_text = await _complete_with_retries(SUMMARY_PROMPT.format(content=content, title=title),
+                                               api_key, max_retries, stage, source)
+    if result_text is None:
+        return {"summary": "", "is_tech": False}
+    return _store_summary(content_hash, parse_summary_response(result_text), use_cache)
+
+
+def article_tokens(title, content):
+    """
+    Estimated tokens an article adds to a batch request, including its summary in the output
+    """
+    return estimate_tokens(title) + estimate_tokens(content) + BATCH_OUTPUT_TOKENS_PER_ITEM
+
+
+def plan_batches(articles, token_budget=CONTENT_BATCH_TOKEN_BUDGET, max_items=CONTENT_BATCH_MAX_ITEMS):
+    """
+    Group articles ({id, title, content}) into batches whose estimated prompt plus output
+    tokens stay within token_budget, at most max_items per batch. Keeps the input order.
+    """
+    batches = []
+    batch = []
+    batch_tokens = BATCH_PROMPT_TOKENS
+    for article in articles:
+        tokens = article_tokens(article["title"], article["content"])
+        if batch and (batch_tokens + tokens > token_budget or len(batch) >= max_items):
+            batches.append(batch)
+            batch = []
+            batch_tokens = BATCH_PROMPT_TOKENS
+        batch.append(article)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def parse_batch_response(result_text, ids):
+    """
+    Parse the JSON array returned for a batch into {id: {summary, is_tech}}
+
+    Entries with unknown ids or without a summary are ignored, so the caller can tell
+    which articles are still missing. Raises ValueError if there is no JSON array.
+    """
+    json_match = re.search(r'\[.*\]', result_text, re.DOTALL)
+    if not json_match:
+        raise ValueError("no JSON array in response")
+    entries = json.loads(json_match.group(0))
+    if not isinstance(entries, list):
+        raise ValueError("response is not a JSON array")
+    results = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        article_id = str(entry.get("id", ""))
+        summary = entry.get("summary")
+        if article_id in ids and isinstance(summary, str) and summary.strip():
+            results[article_id] = {"summary": summary.strip(), "is_tech": bool(entry.get("is_tech", False))}
+    return results
+
+
+async def _summarize_batch(batch, api_key, use_cache):
+    """
+    Summarize one batch with a single request; malformed or incomplete output is retried
+    by splitting the missing articles in two, single articles use the single-article prompt
+
+    The caller holds the in-flight claims of the batch's articles, so nothing here may go
+    through _async_summary_flight again (it would wait for its own claim).
+    """
+    if len(batch) == 1:
+        article = batch[0]
+        return {article["id"]: await _generate_summary_async(
+            article["content"], api_key, article["title"], 3, use_cache, article["hash"], article.get("source"))}
+
+    contents = {article["id"]: article["content"] for article in batch}
+    article_hashes = {article["id"]: article["hash"] for article in batch}
+    results = {}
+    try:
+        payload = json.dumps([{"id": article["id"], "title": article["title"], "content": article["content"]}
+                              for article in batch], ensure_ascii=False)
+        prompt = BATCH_SUMMARY_PROMPT.format(articles=payload)
+        logger.info(f"批量发送 {len(batch)} 篇内容至内容处理模型, 约 {estimate_tokens(prompt)} tokens")
+        # 批量请求的token按各篇估算的token数分摊到来源
+        sources = {}
+        for article in batch:
+            source = article.get("source") or "unknown"
+            sources[source] = sources.get(source, 0) + article_tokens(article["title"], article["content"])
+        result_text, _ = await content_client.complete(prompt, api_key=api_key, stage="batch_summary",
+                                                       source=sources)
+        results = parse_batch_response(result_text, contents)
+    except Exception as e:
+        logger.warning(f"批量摘要失败 ({len(batch)} 篇): {str(e)}")
+
+    for article_id, result in results.items():
+        _store_summary(article_hashes[article_id], result, use_cache)
+
+    missing = [article for article in batch if article["id"] not in results]
+    if missing:
+        logger.warning(f"批量摘要缺少 {len(missing)}/{len(batch)} 篇结果，拆分后重试")
+        middle = (len(missing) + 1) // 2
+        for part_results in await asyncio.gather(*(
+            _summarize_batch(part, api_key, use_cache) for part in (missing[:middle], missing[middle:]) if part
+        )):
+            results.update(part_results)
+    return results
+
+
+async def summarize_batch_with_content_model(articles, api_key, use_cache=True):
+    """
+    批量生成多篇内容的摘要和科技相关性判断，减少请求次数和重复的提示词
+    articles: [{"id", "title", "content", "source"(可选)}]，id为字符串，返回 {id: {"summary", "is_tech"}}
+    已缓存的内容直接返回，其余按token预算分批，每批一次请求；超过预算的长文单独请求（分段摘要）
+    """
+    results = {}
+    pending = []
+    # Articles whose content is already being summarized (elsewhere or earlier in this list)
+    waiting = {}
+    claimed = {}
+    for article in articles:
+        content = normalize_content(article.get("content"))
+        if len(content) < 50:
+            results[article["id"]] = {"summary": "", "is_tech": False}
+            continue
+        content_hash, cached_result = _lookup_cached_summary(content, use_cache)
+        if cached_result is not None:
+            results[article["id"]] = cached_result
+            continue
+        key = _summary_key(content_hash)
+        future, leader = _async_summary_flight.claim(key)
+        if not leader:
+            waiting[article["id"]] = future
+            continue
+        claimed[article["id"]] = key
+        pending.append({"id": article["id"], "title": article.get("title", ""), "content": content,
+                        "source": article.get("source"), "hash": content_hash})
+
+    try:
+        for batch_results in await asyncio.gather(*(
+            _summarize_batch(batch, api_key, use_cache) for batch in plan_batches(pending)
+        )):
+            results.update(batch_results)
+    finally:
+        for article_id, key in claimed.items():
+            _async_summary_flight.release(key, results.get(article_id, {"summary": "", "is_tech": False}))
+
+    if waiting:
+        logger.info(f"{len(waiting)} 篇内容与正在生成的摘要相同，等待其结果")
+    for article_id, future in waiting.items():
+        try:
+            results[article_id] = await asyncio.shield(future)
+        except Exception as e:
+            logger.warning(f"等待相同内容的摘要失败: {str(e)}")
+    return results
@@ -2,14 +2,24 @@ import os
 import json
 import time
 import logging
+import asyncio
 import requests
 from datetime import datetime
-from config.config import SOURCE_NAME_MAP, DEEPSEEK_MODEL_ID
+from config.config import SOURCE_NAME_MAP, DEEPSEEK_MODEL_ID, DIGEST_MODEL_TIMEOUT
+from llm_integration.async_client import AsyncLLMClient
 from utils.utils import format_title_for_display, get_project_root
-from utils.token_tracker import token_tracker
 
 logger = logging.getLogger(__name__)
 
+async def _request_digest(api_url, model_id, api_key, messages):
+    """
+    Send the digest request with the async client and return the decoded response
+    """
+    # The request used to go through `curl --insecure`, certificate checks stay disabled
+    async with AsyncLLMClient(api_url, model_id, api_key=api_key, timeout=DIGEST_MODEL_TIMEOUT,
+                              verify=False) as client:
+        return await client.chat(messages, temperature=0.3, stage="digest")
+
 def summarize_with_deepseek(hotspots, api_key, api_url=None, model_id=None, max_retries=3, tech_only=False):
     """
     使用Deepseek API对热点进行汇总归类，支持重试
@@ -129,59 +139,10 @@ def summarize_with_deepseek(hotspots, api_key, api_url=None, model_id=None, max_
                     # "max_tokens": 1000
                 }
                 
-                import subprocess
-                import tempfile
-                
-                payload_json = json.dumps(payload, ensure_ascii=False)
+                # Token usage is recorded by the client under the "digest" stage
+                result = asyncio.run(_request_digest(api_url, model_id, api_key, payload["messages"]))
                 
-                with tempfile.NamedTemporaryFile(mode='w+', encoding='utf-8', suffix='.json', delete=False) as temp:
-                    temp_path = temp.name
-                    temp.write(payload_json)
-                
-                try:
-                    curl_cmd = [
-                        'curl', '-s', '-X', 'POST',
-                        '-H', f'Authorization: Bearer {api_key}',
-                        '-H', 'Content-Type: application/json',
-                        '-d', f'@{temp_path}',
-                        '--insecure',  
-                        api_url
-                    ]
-                    
-                    logger.info(f"执行curl命令: {' '.join(curl_cmd).replace(api_key, '***')}")
-                    
-                    process = subprocess.run(
-                        curl_cmd,
-                        check=True,
-                        capture_output=True,
-                        text=True,
-                        encoding='utf-8'
-                    )
-                    
-                    if process.returncode != 0:
-                        raise Exception(f"curl命令执行失败，返回码: {process.returncode}, 错误: {process.stderr}")
-                    
-                    result = json.loads(process.stdout)
-                    
-                    if "choices" not in result or len(result["choices"]) == 0:
-                        raise Exception(f"API响应格式不正确: {process.stdout[:200]}...")
-                    
-                    # Track token usage for Deepseek model
-                    if "usage" in result:
-                        usage = result["usage"]
-                        token_tracker.add_usage(
-                            model_id,
-                            prompt_tokens=usage.get("prompt_tokens", 0),
-                            completion_tokens=usage.get("completion_tokens", 0)
-                        )
-                    
-                    logger.info("API调用成功!")
-                    
-                finally:
-                    try:
-                        os.unlink(temp_path)
-                    except:
-                        pass
+                logger.info("API调用成功!")
                 
             except Exception as e:
                 logger.error(f"调用Deepseek API时发生错误: {str(e)}")
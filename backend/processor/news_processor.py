@@ -1,38 +1,102 @@
-import asyncio
 import logging
-import json
-import time
 import os
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
-from bs4 import BeautifulSoup
 
-from utils.utils import get_content_hash, load_summary_cache, save_summary_cache, get_project_root
-from crawler.web_crawler import fetch_webpage_content, extract_publish_time_from_html
-from llm_integration.content_integration import summarize_with_content_model
+from config.config import RETRY_FAILED_ITEMS
+from utils.utils import get_project_root, get_sidecar_path, append_jsonl, get_record_key
+from utils.url_utils import get_item_id
+from utils.item_store import item_store
+from utils.news_item import drop_field, without_fields
+from processor.pipeline import run_pipeline, retry_failed_items, needs_retry
+from processor.priority import prioritize_groups
+from processor.summary_policy import TIER_SUMMARY_SOURCES
+from llm_integration.async_client import content_client
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Define constants for summary length control
-FINAL_DESC_MAX_LENGTH = 150
-FALLBACK_DESC_LENGTH = 150
-MIN_CONTENT_LENGTH_FOR_SUMMARY = 50 # Min content length to attempt summary
+# Fields produced by processing that are shared by all occurrences of the same article
+SHARED_RESULT_FIELDS = ("content", "summary", "is_tech", "summary_source", "is_processed")
+SHARED_TIME_FIELDS = ("extracted_time", "timestamp")
+# Summaries made from the content; once stored and written, the full content is not needed anymore
+CONTENT_RELEASE_SUMMARY_SOURCES = {"AI生成", "内容截断(AI失败)", "超时降级", *TIER_SUMMARY_SOURCES.values()}
 
-async def process_hotspot_with_summary(hotspots, content_model_api_key, max_workers=5, tech_only=False, use_cache=True):
+def group_duplicate_items(hotspots):
+    """
+    Group items that point to the same canonical URL
+    Returns an ordered dict item_id -> list of items; the first item of each group is the
+    representative that gets processed (the one with the most pre-extracted content)
+    """
+    groups = {}
+    for item in hotspots:
+        if not item.get("item_id"):
+            item["item_id"] = get_item_id(item)
+        groups.setdefault(item["item_id"], []).append(item)
+    for item_id, items in groups.items():
+        if len(items) > 1:
+            items.sort(key=lambda i: len(i.get("content") or ""), reverse=True)
+    return groups
+
+def _shared_fields(result, target):
+    """
+    Processing output of result that should be copied onto target (another occurrence of the same article)
+    """
+    shared = {k: result[k] for k in SHARED_RESULT_FIELDS if k in result}
+    # Keep target's own timestamp, only fill in what it was missing
+    for k in SHARED_TIME_FIELDS:
+        if not target.get(k) and result.get(k):
+            shared[k] = result[k]
+    return shared
+
+def restore_memoized_result(item, record):
+    """
+    Build a processed result from a record stored by an earlier run
+    The item's own fields (hot value, saved_at, ...) are kept, processing output is taken from the record
+    """
+    result = item.copy()
+    result.update(_shared_fields(record, item))
+    result["content"] = item.get("content", "")
+    result["is_processed"] = True
+    return result
+
+def release_content(items):
+    """
+    Drop the full content of items whose summary has been made from it, only the summary is used downstream
+    """
+    for item in items:
+        if item.get("summary_source") in CONTENT_RELEASE_SUMMARY_SOURCES:
+            drop_field(item, "content")
+
+def share_group_result(result, group):
+    """
+    Build the results for every occurrence in a duplicate group from the representative's result
+    """
+    results = [result]
+    for duplicate in group[1:]:
+        shared = duplicate.copy()
+        shared.update(_shared_fields(result, duplicate))
+        results.append(shared)
+    return results
+
+async def process_hotspot_with_summary(hotspots, content_model_api_key, max_workers=5, tech_only=False, use_cache=True,
+                                      merged_file_path=None, completed_records=None, incremental=False):
     """
     Process hotspot data asynchronously, get webpage content and generate summaries
     Prioritize using API returned summaries, only call content model when no summary exists
+    (short texts and adequate source descriptions are used as-is, see processor.summary_policy)
     Also try to extract publish time from webpage content
+    Fetching, extraction and summarization run as separate concurrent stages (see processor.pipeline)
     If tech_only is True, only keep tech-related content
     Support cache mechanism to avoid processing same content repeatedly
-    Update merged file directly after processing
+    Each result is appended to the merged file's sidecar (see utils.get_sidecar_path) as soon as it completes
+    completed_records are sidecar records of an interrupted run, items found there are not processed again
+    In incremental mode every item already processed by an earlier run is reused even if its source data changed,
+    also when use_cache is False
     """
     enhanced_hotspots = []
     
     # Get original merged file path
-    merged_file_path = None
-    if hotspots and len(hotspots) > 0 and "saved_at" in hotspots[0]:
+    if not merged_file_path and hotspots and len(hotspots) > 0 and "saved_at" in hotspots[0]:
         saved_time = hotspots[0]["saved_at"]
         try:
             # Extract timestamp from saved_at field
@@ -47,156 +111,91 @@ async def process_hotspot_with_summary(hotspots, content_model_api_key, max_work
         except Exception as e:
             logger.warning(f"Could not extract timestamp from saved_at: {str(e)}")
     
-    def process_single_item(item):
-        url = item["url"]
-        title = item.get("title", "未知标题")
-        source = item.get("source", "未知来源")
-        content = item.get("content", "")  # 可能从RSS预提取的内容
-        
-        # 初始化标记
-        has_content = bool(content and len(content.strip()) > MIN_CONTENT_LENGTH_FOR_SUMMARY)
-        has_timestamp = bool(item.get("timestamp") or item.get("time") or item.get("extracted_time"))
-        
-        # --- 1. 确定是否需要抓取网页 ---
-        needs_content = True  # 总是需要获取内容用于生成摘要
-        needs_timestamp = not has_timestamp
-        needs_fetching = needs_content or needs_timestamp
-        
-        # --- 2. Twitter源特殊处理 ---
-        # Get the source safely
-        if source.startswith("Twitter"):
-            if needs_fetching: # Log only if it *would* have fetched
-                logger.info(f"强制跳过抓取，来源为 Twitter: {title}")
-            needs_fetching = False # Override: Twitter posts never need fetching
-        
-        # --- 3. Fetch Web Content (HTML and potentially Content) if Necessary ---
-        fetched_content = None # Store content specifically from fetching
-        if needs_fetching:
-            log_reason = []
-            if needs_content: log_reason.append("需要获取内容用于生成摘要")
-            if needs_timestamp: log_reason.append("缺少时间戳")
-            logger.info(f"需要抓取网页 ({', '.join(log_reason)}): {title}")
-            # Fetch both content and HTML if needed. 
-            # If fetch fails, content might remain original, html_content might be None.
-            try:
-                fetched_content, html_content = fetch_webpage_content(url, existing_content=content)
-                if fetched_content and fetched_content != content: # Update content only if fetch provided new content
-                    logger.info(f"网页抓取成功，获取到新内容: {title}")
-                    content = fetched_content 
-                    has_content = bool(content and len(content.strip()) > MIN_CONTENT_LENGTH_FOR_SUMMARY)
-                elif html_content:
-                    logger.info(f"网页抓取成功，获取到HTML (内容未变或抓取失败): {title}")
-                else:
-                     logger.warning(f"网页抓取未能获取到有效内容或HTML: {title}")
-            except Exception as fetch_err:
-                 logger.error(f"抓取网页时发生错误: {fetch_err}, URL: {url}")
-                 # Keep original content, html_content remains None
-
-        # ---> 在这里重新计算 has_content <--- 
-        has_content = bool(content and len(content.strip()) > MIN_CONTENT_LENGTH_FOR_SUMMARY)
-        logger.info(f"抓取尝试后(如果需要)，内容状态: has_content={has_content}, 长度={len(content.strip() if content else '')} for {title}")
-
-        # --- 4. Extract Timestamp if Necessary (using potentially fetched HTML) ---
-        if needs_timestamp: # Check if we *needed* it, even if fetch failed
-            if html_content: # Proceed only if we successfully got html
-                publish_time = extract_publish_time_from_html(html_content, url)
-                if publish_time:
-                    logger.info(f"从HTML中提取到发布时间: {publish_time}, 标题: {title}")
-                    item["extracted_time"] = publish_time.isoformat()
-                    item["timestamp"] = int(publish_time.timestamp() * 1000)
-                    has_timestamp = True # Mark timestamp as now available
-                else:
-                     logger.info(f"未能在HTML中找到发布时间: {title}")
-            else:
-                 # Log only if we NEEDED the timestamp but couldn't get HTML
-                 logger.warning(f"需要时间戳但无法获取HTML内容: {title}")
-        
-        # --- 5. Generate AI Summary ---
-        summary_result_ai = {"summary": "", "is_tech": False} # For AI result
-        final_summary = "" # Initialize empty final summary
-        is_tech_final = item.get("is_tech", tech_only) # Default tech status
-        summary_source = "未知" # Track the source of our summary
-
-        # 尝试使用AI生成摘要
-        if has_content:
+    sidecar_path = get_sidecar_path(merged_file_path) if merged_file_path else None
+    if sidecar_path:
+        logger.info(f"处理结果将逐条追加到: {sidecar_path}")
+    
+    def write_results(results):
+        # 逐条追加，不包括content等大字段；写入后释放已生成摘要的条目的content
+        if sidecar_path:
             try:
-                # 使用腾讯混元生成摘要
-                summary_result_ai = summarize_with_content_model(
-                    content, content_model_api_key, title=title, use_cache=use_cache
-                )
-                
-                if summary_result_ai and summary_result_ai.get("summary"):
-                    final_summary = summary_result_ai["summary"]
-                    is_tech_final = summary_result_ai.get("is_tech", tech_only)
-                    summary_source = "AI生成"
-                    logger.info(f"成功使用AI生成摘要: {title}")
-                else:
-                    logger.warning(f"AI未能生成有效摘要: {title}")
-                    # 使用内容截断作为备选
-                    try:
-                        soup = BeautifulSoup(content, 'html.parser')
-                        plain_text = soup.get_text(strip=True)
-                        if len(plain_text) > FALLBACK_DESC_LENGTH:
-                            final_summary = plain_text[:FALLBACK_DESC_LENGTH] + "..."
-                        else:
-                            final_summary = plain_text
-                            summary_source = "内容截断(AI失败)"
-                            logger.info(f"使用内容截断作为备选摘要: {title}")
-                    except Exception as fallback_e:
-                        logger.error(f"内容截断备选方案失败: {fallback_e}, 标题: {title}")
-                        final_summary = "[摘要生成失败]"
-                        summary_source = "处理失败"
+                append_jsonl(sidecar_path, [without_fields(r, "content") for r in results])
             except Exception as e:
-                logger.error(f"内容模型摘要生成失败: {e}, 标题: {title}. 将使用内容截断作为备选。")
-                # 使用内容截断作为备选
-                try:
-                    soup = BeautifulSoup(content, 'html.parser')
-                    plain_text = soup.get_text(strip=True)
-                    if len(plain_text) > FALLBACK_DESC_LENGTH:
-                        final_summary = plain_text[:FALLBACK_DESC_LENGTH] + "..."
-                    else:
-                        final_summary = plain_text
-                        summary_source = "内容截断(AI失败)"
-                        logger.info(f"使用内容截断作为备选摘要: {title}")
-                except Exception as fallback_e:
-                    logger.error(f"内容截断备选方案失败: {fallback_e}, 标题: {title}")
-                    final_summary = "[摘要生成失败]"
-                    summary_source = "处理失败"
-        else:
-            logger.warning(f"没有足够的内容生成摘要: {title}")
-            final_summary = "[摘要无法生成：无内容或来源信息不足]"
-            summary_source = "无内容"
-
-        # --- 6. Assemble Final Result ---
-        result = {
-            **item,
-            "content": content, # Keep potentially updated content
-            "summary": final_summary, # Use the final determined summary
-            "is_tech": is_tech_final,
-            "summary_source": summary_source, # Track the final source
-            "is_processed": True
-        }
-        
-        logger.info(f"处理完成: {title}, 摘要来源: {summary_source}, 摘要长度: {len(final_summary)}, 科技相关: {is_tech_final}")
-        return result
+                logger.error(f"追加处理结果失败: {str(e)}")
+        release_content(results)
+    
+    # 按规范化URL分组，同一文章只抓取和摘要一次
+    groups = group_duplicate_items(hotspots)
+    duplicate_count = len(hotspots) - len(groups)
+    if duplicate_count:
+        logger.info(f"规范化URL去重: {len(hotspots)} 条中有 {duplicate_count} 条重复, 实际处理 {len(groups)} 条")
     
-    # 使用线程池执行网页内容获取和摘要生成
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        loop = asyncio.get_event_loop()
-        tasks = [
-            loop.run_in_executor(
-                executor,
-                lambda i=i: process_single_item(i)
-            )
-            for i in hotspots
-        ]
+    group_results = {}
+    
+    # 恢复中断运行时，已写入侧车文件的条目直接使用
+    if completed_records:
+        completed = {get_record_key(record): record for record in completed_records}
+        for item_id, group in groups.items():
+            records = [completed.get(get_record_key(item)) for item in group]
+            if all(records):
+                group_results[item_id] = records
+        logger.info(f"从中断的运行中恢复 {len(group_results)}/{len(groups)} 条已完成结果")
+    
+    # 复用之前运行中已完整处理过、且源数据未变化的条目，跳过抓取和摘要
+    # 增量模式只处理新条目，不受use_cache影响（NO_CACHE只跳过摘要和网页缓存）
+    if use_cache or incremental:
+        memoized_count = 0
+        for item_id, group in groups.items():
+            if item_id in group_results:
+                continue
+            record = item_store.lookup(group[0], match_fingerprint=not incremental)
+            if record:
+                group_results[item_id] = share_group_result(restore_memoized_result(group[0], record), group)
+                write_results(group_results[item_id])
+                memoized_count += 1
+        if memoized_count:
+            logger.info(f"从已处理条目存储中复用 {memoized_count}/{len(groups)} 条结果")
+    # 按优先级处理，时间或token预算不足时最有价值的条目先完成摘要
+    pending_groups = prioritize_groups({item_id: group for item_id, group in groups.items() if item_id not in group_results})
+    
+    def on_result(index, result):
+        # 按完成顺序处理: 记录、共享给重复条目并立即落盘
+        group = pending_groups[index]
+        item_store.store(group[0], result)
+        group_results[group[0]["item_id"]] = share_group_result(result, group)
+        write_results(group_results[group[0]["item_id"]])
+    
+    # 抓取、提取、摘要分阶段并发执行
+    try:
+        results = await run_pipeline(
+            [group[0] for group in pending_groups], content_model_api_key,
+            tech_only=tech_only, use_cache=use_cache, max_workers=max_workers, on_result=on_result
+        )
         
-        # 直接使用gather的结果
-        completed_results = await asyncio.gather(*tasks)
-        for result in completed_results:
+        # 主流程结束后，在预算允许时以更长超时、更低并发重试失败的条目
+        if RETRY_FAILED_ITEMS:
+            failed_indexes = [index for index, result in enumerate(results) if needs_retry(result)]
+            if failed_indexes:
+                await retry_failed_items(
+                    [pending_groups[index][0] for index in failed_indexes],
+                    [results[index] for index in failed_indexes],
+                    content_model_api_key, tech_only=tech_only, use_cache=use_cache,
+                    on_result=lambda retry_index, result: on_result(failed_indexes[retry_index], result)
+                )
+    finally:
+        item_store.save()
+        # 连接池属于当前事件循环，结束前关闭
+        await content_client.aclose()
+    
+    for item_id, group in groups.items():
+        # 重试结束后原始条目的content也不再需要
+        if group_results[item_id][0].get("summary_source") in CONTENT_RELEASE_SUMMARY_SOURCES:
+            for item in group:
+                drop_field(item, "content")
+        for shared_result in group_results[item_id]:
             # 如果tech_only为True，只保留科技相关的内容
-            if not tech_only or result.get("is_tech", False):
-                enhanced_hotspots.append(result)
+            if not tech_only or shared_result.get("is_tech", False):
+                enhanced_hotspots.append(shared_result)
     
     # 记录处理结果统计
     with_summary = sum(1 for item in enhanced_hotspots if item.get("summary"))
@@ -205,37 +204,4 @@ async def process_hotspot_with_summary(hotspots, content_model_api_key, max_work
     
     logger.info(f"热点处理完成: 总计 {len(enhanced_hotspots)} 条, 成功生成摘要 {with_summary} 条, 有时间戳 {with_timestamp} 条, 科技相关 {tech_related} 条")
     
-    # 如果找到了原始merged文件，直接更新
-    if merged_file_path and os.path.exists(merged_file_path):
-        try:
-            # 创建一个ID到处理结果的映射
-            processed_items = {item["url"]: item for item in enhanced_hotspots}
-            
-            # 读取原始文件并更新
-            updated_lines = []
-            with open(merged_file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    if line.strip():
-                        item = json.loads(line)
-                        url = item.get("url", "")
-                        if url in processed_items:
-                            # 更新已处理的项目
-                            updated_item = processed_items[url]
-                            # 只保留需要的字段，不包括content等大字段
-                            updated_item_clean = {k: v for k, v in updated_item.items() 
-                                               if k not in ["content"]}
-                            updated_lines.append(json.dumps(updated_item_clean, ensure_ascii=False))
-                        else:
-                            # 保持原有项目不变
-                            updated_lines.append(line.strip())
-            
-            # 写回文件
-            with open(merged_file_path, 'w', encoding='utf-8') as f:
-                for line in updated_lines:
-                    f.write(line + '\n')
-            
-            logger.info(f"已更新merged文件: {merged_file_path}")
-        except Exception as e:
-            logger.error(f"更新merged文件失败: {str(e)}")
-    
-    return enhanced_hotspots
\ No newline at end of file
+    return enhanced_hotspots
@@ -0,0 +1,652 @@
+import time
+import asyncio
+import logging
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+from config.config import (
+    FETCH_WORKERS, EXTRACT_WORKERS, SUMMARY_WORKERS, PIPELINE_QUEUE_SIZE, RETRY_WORKERS, RETRY_FETCH_TIMEOUT,
+    CONTENT_BATCH_ENABLED, CONTENT_BATCH_TOKEN_BUDGET, CONTENT_BATCH_MAX_ITEMS, CONTENT_BATCH_ITEM_MAX_TOKENS,
+    CONTENT_BATCH_WAIT_SECONDS, LLM_MAX_INFLIGHT
+)
+from utils.html_text import html_to_text
+from utils.extractive_summary import extract_summary
+from utils.run_budget import run_budget
+from processor.summary_policy import plan_summary, LLM_TIER, TIER_SUMMARY_SOURCES
+from processor.tech_classifier import tech_classifier
+from crawler.web_crawler import fetch_webpage_html, extract_webpage_text, extract_publish_time_from_html
+from llm_integration.content_integration import (
+    summarize_with_content_model_async, summarize_batch_with_content_model, estimate_tokens, article_tokens,
+    BATCH_PROMPT_TOKENS
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Define constants for summary length control
+FALLBACK_DESC_LENGTH = 150
+MIN_CONTENT_LENGTH_FOR_SUMMARY = 50 # Min content length to attempt summary
+MIN_EXISTING_CONTENT_LENGTH = 10 # Pre-extracted content longer than this is used without fetching
+
+# Marks the end of a stage queue
+_STOP = object()
+
+# summary_source of items summarized without the content model because of the run deadline
+DEGRADED_SUMMARY_SOURCE = "超时降级"
+# summary_source of tech_only items the local classifier dropped as clearly not tech-related
+PREFILTERED_SUMMARY_SOURCE = "本地过滤"
+PREFILTER_TIER = "prefiltered"
+# Results worth a second attempt after the main pass (fetch or content model failures)
+RETRYABLE_SUMMARY_SOURCES = {"内容截断(AI失败)", "处理失败", "无内容"}
+# Higher is better, a retry result only replaces the first one if it ranks higher
+SUMMARY_SOURCE_RANK = {"AI生成": 2, "内容截断(AI失败)": 1, DEGRADED_SUMMARY_SOURCE: 1,
+                       **{source: 2 for source in TIER_SUMMARY_SOURCES.values()}}
+
+def _has_summary_content(content):
+    return bool(content and len(content.strip()) > MIN_CONTENT_LENGTH_FOR_SUMMARY)
+
+def new_item_state(item, index=0, fetch_options=None, tech_only=False):
+    """
+    Per-item state passed between the pipeline stages
+    fetch_options are extra keyword arguments for fetch_webpage_html (e.g. a longer timeout)
+    planned is (summary, tier) if the summary policy needs no content model call for the item
+    is_tech is the local classifier's decision in tech_only mode (None: not confident or not tech_only)
+    """
+    content = item.get("content", "") or ""  # 可能从RSS预提取的内容
+    is_tech = tech_classifier.classify(item) if tech_only else None
+    return {
+        "index": index,
+        "item": item,
+        "fetch_options": fetch_options or {},
+        "content": content,
+        "is_tech": is_tech,
+        # tech_only needs an is_tech decision: the classifier's if confident, else the content model's
+        "planned": plan_summary(item, content) if not tech_only or is_tech else None,
+        "html_content": None,
+        "cached_text": None,
+        "needs_timestamp": not bool(item.get("timestamp") or item.get("time") or item.get("extracted_time")),
+        "result": None,
+    }
+
+def fetch_stage(state):
+    """
+    Stage 1 (network): download the webpage HTML if the item needs content or a timestamp
+    """
+    item = state["item"]
+    url = item.get("url", "")
+    title = item.get("title", "未知标题")
+    source = item.get("source", "未知来源")
+    content = state["content"]
+
+    # --- 1. 确定是否需要抓取网页 ---
+    needs_content = state["planned"] is None  # 已有可用摘要时只在缺少时间戳时抓取
+    needs_timestamp = state["needs_timestamp"]
+    needs_fetching = needs_content or needs_timestamp
+
+    # --- 2. Twitter源特殊处理 ---
+    if source.startswith("Twitter"):
+        if needs_fetching: # Log only if it *would* have fetched
+            logger.info(f"强制跳过抓取，来源为 Twitter: {title}")
+        needs_fetching = False # Override: Twitter posts never need fetching
+
+    if not needs_fetching:
+        return state
+
+    # 已有足够的预提取内容时不抓取网页
+    if len(content.strip()) > MIN_EXISTING_CONTENT_LENGTH:
+        logger.info(f"已有预提取内容 ({len(content)} 字符)，跳过抓取: {title}")
+        return state
+
+    # 接近运行截止时间时不再启动新的抓取
+    if not run_budget.can_fetch():
+        logger.warning(f"接近运行截止时间，跳过抓取: {title}")
+        run_budget.record_degraded("fetch_skipped")
+        return state
+
+    log_reason = []
+    if needs_content: log_reason.append("需要获取内容用于生成摘要")
+    if needs_timestamp: log_reason.append("缺少时间戳")
+    logger.info(f"需要抓取网页 ({', '.join(log_reason)}): {title}")
+    try:
+        html_content, cached_text = fetch_webpage_html(url, **state["fetch_options"])
+        state["html_content"] = html_content or None
+        state["cached_text"] = cached_text
+        if not html_content:
+            logger.warning(f"网页抓取未能获取到有效内容或HTML: {title}")
+    except Exception as fetch_err:
+        logger.error(f"抓取网页时发生错误: {fetch_err}, URL: {url}")
+    return state
+
+def extract_stage(state):
+    """
+    Stage 2 (CPU): extract article text and publish time from the downloaded HTML
+    """
+    item = state["item"]
+    url = item.get("url", "")
+    title = item.get("title", "未知标题")
+    html_content = state["html_content"]
+
+    # --- 3. Extract content from fetched HTML ---
+    if html_content:
+        fetched_content = state["cached_text"]
+        if fetched_content is None:
+            try:
+                fetched_content = extract_webpage_text(html_content, url)
+            except Exception as extract_err:
+                logger.error(f"提取网页正文时发生错误: {extract_err}, URL: {url}")
+                fetched_content = ""
+        if fetched_content and fetched_content != state["content"]: # Update content only if fetch provided new content
+            logger.info(f"网页抓取成功，获取到新内容: {title}")
+            state["content"] = fetched_content
+        else:
+            logger.info(f"网页抓取成功，获取到HTML (内容未变或抓取失败): {title}")
+
+    content = state["content"]
+    logger.info(f"抓取尝试后(如果需要)，内容状态: has_content={_has_summary_content(content)}, 长度={len(content.strip())} for {title}")
+
+    # --- 4. Extract Timestamp if Necessary (using potentially fetched HTML) ---
+    if state["needs_timestamp"]: # Check if we *needed* it, even if fetch failed
+        if html_content: # Proceed only if we successfully got html
+            publish_time = extract_publish_time_from_html(html_content, url)
+            if publish_time:
+                logger.info(f"从HTML中提取到发布时间: {publish_time}, 标题: {title}")
+                item["extracted_time"] = publish_time.isoformat()
+                item["timestamp"] = int(publish_time.timestamp() * 1000)
+            else:
+                logger.info(f"未能在HTML中找到发布时间: {title}")
+        else:
+            # Log only if we NEEDED the timestamp but couldn't get HTML
+            logger.warning(f"需要时间戳但无法获取HTML内容: {title}")
+
+    # The raw HTML is not needed by later stages
+    state["html_content"] = None
+    state["cached_text"] = None
+    return state
+
+def fallback_summary(content, title):
+    """
+    Summary used when the content model fails: the most informative sentences of the content
+    (truncated text if no sentence fits), returns (summary, summary_source)
+    """
+    try:
+        plain_text = html_to_text(content)
+        logger.info(f"使用抽取的关键句作为备选摘要: {title}")
+        summary = extract_summary(plain_text, max_chars=FALLBACK_DESC_LENGTH)
+        if summary:
+            return summary, "内容截断(AI失败)"
+        plain_text = " ".join(plain_text.split())
+        return plain_text[:FALLBACK_DESC_LENGTH] + "...", "内容截断(AI失败)"
+    except Exception as fallback_e:
+        logger.error(f"内容截断备选方案失败: {fallback_e}, 标题: {title}")
+        return "[摘要生成失败]", "处理失败"
+
+def degraded_summary(item, content):
+    """
+    Summary used when the run deadline leaves no time for the content model:
+    the source description if there is one, else truncated content.
+    Returns (summary, summary_source)
+    """
+    title = item.get("title", "未知标题")
+    desc = html_to_text(item.get("desc") or "", keep_line_breaks=False)
+    if desc:
+        summary = desc[:FALLBACK_DESC_LENGTH] + "..." if len(desc) > FALLBACK_DESC_LENGTH else desc
+        return summary, DEGRADED_SUMMARY_SOURCE
+    if _has_summary_content(content):
+        summary, summary_source = fallback_summary(content, title)
+        return summary, DEGRADED_SUMMARY_SOURCE if summary_source != "处理失败" else summary_source
+    return "[摘要无法生成：无内容或来源信息不足]", "无内容"
+
+def degraded_result(item, content=None):
+    """
+    Final result of an item that was not summarized before the run deadline
+    """
+    if content is None:
+        content = item.get("content", "") or ""
+    summary, summary_source = degraded_summary(item, content)
+    result = item.copy()
+    result.update(
+        content=content,
+        summary=summary,
+        is_tech=item.get("is_tech", False),
+        summary_source=summary_source,
+        is_processed=True
+    )
+    return result
+
+def _deadline_reached(state):
+    """
+    True (with a degraded result set) if the run deadline leaves no time for the content model
+    """
+    if run_budget.can_summarize():
+        return False
+    logger.warning(f"已到运行截止时间，使用描述或内容截断作为摘要: {state['item'].get('title', '未知标题')}")
+    run_budget.record_degraded("summary_skipped")
+    state["result"] = degraded_result(state["item"], state["content"])
+    return True
+
+def complete_summary(state, summary_result_ai, tech_only=False):
+    """
+    Assemble the final result from the content model output (None if the call failed),
+    falling back to truncated content
+    """
+    item = state["item"]
+    title = item.get("title", "未知标题")
+    content = state["content"]
+
+    # --- 5. Generate AI Summary ---
+    final_summary = "" # Initialize empty final summary
+    is_tech_final = item.get("is_tech", tech_only) # Default tech status
+    summary_source = "未知" # Track the source of our summary
+
+    if _has_summary_content(content):
+        if summary_result_ai and summary_result_ai.get("summary"):
+            final_summary = summary_result_ai["summary"]
+            is_tech_final = summary_result_ai.get("is_tech", tech_only)
+            summary_source = "AI生成"
+            logger.info(f"成功使用AI生成摘要: {title}")
+        else:
+            logger.warning(f"AI未能生成有效摘要: {title}")
+            final_summary, summary_source = fallback_summary(content, title)
+    else:
+        logger.warning(f"没有足够的内容生成摘要: {title}")
+        final_summary = "[摘要无法生成：无内容或来源信息不足]"
+        summary_source = "无内容"
+
+    # --- 6. Assemble Final Result ---
+    # copy() keeps the item's type (NewsItem or dict)
+    result = item.copy()
+    result.update(
+        content=content, # Keep potentially updated content
+        summary=final_summary, # Use the final determined summary
+        is_tech=is_tech_final,
+        summary_source=summary_source, # Track the final source
+        is_processed=True
+    )
+    state["result"] = result
+
+    logger.info(f"处理完成: {title}, 摘要来源: {summary_source}, 摘要长度: {len(final_summary)}, 科技相关: {is_tech_final}")
+    return state
+
+def prefiltered_result(state):
+    """
+    Final result of a tech_only item the local classifier dropped before fetching
+    """
+    run_budget.record_summary_tier(PREFILTER_TIER)
+    result = state["item"].copy()
+    result.update(
+        content=state["content"],
+        summary="",
+        is_tech=False,
+        summary_source=PREFILTERED_SUMMARY_SOURCE,
+        is_processed=True
+    )
+    logger.info(f"本地分类器判断为非科技内容，跳过抓取和摘要: {state['item'].get('title', '未知标题')}")
+    return result
+
+def complete_planned_summary(state, tech_only=False):
+    """
+    Assemble the final result of an item the summary policy summarized without the content model
+    """
+    item = state["item"]
+    summary, tier = state["planned"]
+    run_budget.record_summary_tier(tier)
+    result = item.copy()
+    result.update(
+        content=state["content"],
+        summary=summary,
+        is_tech=item.get("is_tech", tech_only) if state["is_tech"] is None else state["is_tech"],
+        summary_source=TIER_SUMMARY_SOURCES[tier],
+        is_processed=True
+    )
+    state["result"] = result
+    logger.info(f"处理完成: {item.get('title', '未知标题')}, 摘要来源: {result['summary_source']}, 无需调用内容模型")
+    return state
+
+async def summarize_stage(state, content_model_api_key, tech_only=False, use_cache=True):
+    """
+    Stage 3 (LLM): generate the summary and assemble the final result
+    Awaits the async content model client, so no thread is held during generation
+    """
+    if state["planned"]:
+        return complete_planned_summary(state, tech_only)
+    if _deadline_reached(state):
+        return state
+
+    title = state["item"].get("title", "未知标题")
+    content = state["content"]
+    summary_result_ai = None
+    # 尝试使用AI生成摘要
+    if _has_summary_content(content):
+        run_budget.record_summary_tier(LLM_TIER)
+        try:
+            summary_result_ai = await summarize_with_content_model_async(
+                content, content_model_api_key, title=title, use_cache=use_cache, source=state["item"].get("source")
+            )
+        except Exception as e:
+            logger.error(f"内容模型摘要生成失败: {e}, 标题: {title}. 将使用内容截断作为备选。")
+    return complete_summary(state, summary_result_ai, tech_only)
+
+def is_batchable(state):
+    """
+    True if the item is short enough to share a content model request with others
+    """
+    content = state["content"]
+    return (not state["planned"]
+            and _has_summary_content(content)
+            and estimate_tokens(content) <= CONTENT_BATCH_ITEM_MAX_TOKENS)
+
+def _batch_tokens(state):
+    return article_tokens(state["item"].get("title", ""), state["content"])
+
+async def summarize_batch_stage(states, content_model_api_key, tech_only=False, use_cache=True):
+    """
+    Stage 3 for several short items: one content model request for the whole batch
+    """
+    active = [state for state in states if not _deadline_reached(state)]
+    if not active:
+        return states
+    for _ in active:
+        run_budget.record_summary_tier(LLM_TIER)
+    articles = [
+        {"id": str(state["index"]), "title": state["item"].get("title", ""), "content": state["content"],
+         "source": state["item"].get("source")}
+        for state in active
+    ]
+    summary_results = {}
+    try:
+        summary_results = await summarize_batch_with_content_model(articles, content_model_api_key, use_cache=use_cache)
+    except Exception as e:
+        logger.error(f"批量摘要生成失败: {e}, 共 {len(active)} 条. 将使用内容截断作为备选。")
+    for state in active:
+        complete_summary(state, summary_results.get(str(state["index"])), tech_only)
+    return states
+
+async def process_single_item(item, content_model_api_key, tech_only=False, use_cache=True, fetch_options=None,
+                              executor=None):
+    """
+    Run all stages for one item sequentially and return the processed result
+    Fetch and extraction run in executor (the default executor if None)
+    """
+    loop = asyncio.get_event_loop()
+    state = new_item_state(item, fetch_options=fetch_options, tech_only=tech_only)
+    if state["is_tech"] is False:
+        return prefiltered_result(state)
+    state = await loop.run_in_executor(executor, fetch_stage, state)
+    state = await loop.run_in_executor(executor, extract_stage, state)
+    state = await summarize_stage(state, content_model_api_key, tech_only=tech_only, use_cache=use_cache)
+    return state["result"]
+
+def _failed_result(state):
+    item = state["item"]
+    result = item.copy()
+    result.update(
+        content=state["content"],
+        summary="[摘要生成失败]",
+        is_tech=item.get("is_tech", False),
+        summary_source="处理失败",
+        is_processed=True
+    )
+    return result
+
+async def _run_stage(name, func, executor, workers, in_queue, out_queue, next_workers):
+    """
+    Run `workers` consumers that take states from in_queue, apply func in executor (or await
+    it if executor is None, for async stages) and put the result on out_queue; signal the
+    next stage with one stop marker per consumer
+    """
+    loop = asyncio.get_event_loop()
+
+    async def worker():
+        while True:
+            state = await in_queue.get()
+            if state is _STOP:
+                return
+            start = time.monotonic()
+            try:
+                if executor is None:
+                    state = await func(state)
+                else:
+                    state = await loop.run_in_executor(executor, func, state)
+            except Exception as e:
+                title = state["item"].get("title", "未知标题")
+                logger.error(f"流水线阶段 {name} 处理失败: {e}, 标题: {title}")
+            # Busy time summed over the stage's workers
+            run_budget.add_stage_time(name, time.monotonic() - start)
+            await out_queue.put(state)
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    for _ in range(next_workers):
+        await out_queue.put(_STOP)
+
+async def _run_batch_summarize_stage(summarize, summarize_batch, workers, in_queue, out_queue):
+    """
+    Summarize stage with batching: short items (see is_batchable) are collected until the
+    batch reaches CONTENT_BATCH_TOKEN_BUDGET / CONTENT_BATCH_MAX_ITEMS or no new item arrived
+    for CONTENT_BATCH_WAIT_SECONDS, then summarized with one request; long items are
+    summarized one by one. At most `workers` batches or items are in the stage at the same time.
+    """
+    slots = asyncio.Semaphore(workers)
+    tasks = set()
+    pending = []
+    pending_tokens = BATCH_PROMPT_TOKENS
+
+    async def run(func, arg, states):
+        start = time.monotonic()
+        try:
+            await func(arg)
+        except Exception as e:
+            logger.error(f"流水线阶段 summarize 处理失败: {e}, 共 {len(states)} 条")
+        finally:
+            slots.release()
+            # Busy time summed over the concurrent requests
+            run_budget.add_stage_time("summarize", time.monotonic() - start)
+        for state in states:
+            await out_queue.put(state)
+
+    async def submit(func, arg, states):
+        await slots.acquire()
+        task = asyncio.ensure_future(run(func, arg, states))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    async def flush():
+        nonlocal pending, pending_tokens
+        if pending:
+            batch, pending, pending_tokens = pending, [], BATCH_PROMPT_TOKENS
+            await submit(summarize_batch, batch, batch)
+
+    getter = None
+    try:
+        while True:
+            # The same get() is awaited across timeouts so no item is lost
+            getter = getter or asyncio.ensure_future(in_queue.get())
+            done, _ = await asyncio.wait({getter}, timeout=CONTENT_BATCH_WAIT_SECONDS if pending else None)
+            if not done:
+                await flush()
+                continue
+            state, getter = getter.result(), None
+            if state is _STOP:
+                break
+            if not is_batchable(state):
+                await submit(summarize, state, [state])
+                continue
+            tokens = _batch_tokens(state)
+            if pending and (pending_tokens + tokens > CONTENT_BATCH_TOKEN_BUDGET or len(pending) >= CONTENT_BATCH_MAX_ITEMS):
+                await flush()
+            pending.append(state)
+            pending_tokens += tokens
+        await flush()
+        if tasks:
+            await asyncio.gather(*tasks)
+    finally:
+        # Cancelled by the run deadline: do not leave requests waiting on the loop
+        for task in list(tasks) + ([getter] if getter else []):
+            task.cancel()
+    await out_queue.put(_STOP)
+
+async def run_pipeline(items, content_model_api_key, tech_only=False, use_cache=True, max_workers=5, on_result=None):
+    """
+    Process items through fetch -> extract -> summarize stages running concurrently
+
+    Fetch and extraction have their own thread pools (FETCH_WORKERS / EXTRACT_WORKERS,
+    defaulting to max_workers); summaries are awaited on the async content model client with
+    SUMMARY_WORKERS consumers (default LLM_MAX_INFLIGHT). Bounded queues sit in between, so
+    downloads, extraction and LLM calls overlap. With CONTENT_BATCH_ENABLED short items share
+    content model requests. Items the summary policy can summarize without the content model
+    (see processor.summary_policy) skip it; with tech_only, items the local tech classifier
+    rejects skip every stage. on_result(index, result) is called in completion order as soon as an
+    item is done. When the run deadline is reached (see utils.run_budget), unfinished items
+    get a degraded result from their description or content instead of waiting.
+    Returns the processed results in input order.
+    """
+    if not items:
+        return []
+
+    fetch_workers = FETCH_WORKERS or max_workers
+    extract_workers = EXTRACT_WORKERS or max_workers
+    # Summaries are awaited on the event loop, not run in threads; requests are capped by LLM_MAX_INFLIGHT
+    summary_workers = SUMMARY_WORKERS or LLM_MAX_INFLIGHT
+    logger.info(f"启动处理流水线: {len(items)} 条, 抓取并发 {fetch_workers}, 提取并发 {extract_workers}, "
+                f"摘要并发 {summary_workers}, 模型请求上限 {LLM_MAX_INFLIGHT}")
+
+    fetch_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    extract_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    summary_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    # Unbounded: the collector below always drains it
+    done_queue = asyncio.Queue()
+
+    results = [None] * len(items)
+    summarize = partial(summarize_stage, content_model_api_key=content_model_api_key,
+                        tech_only=tech_only, use_cache=use_cache)
+    summarize_batch = partial(summarize_batch_stage, content_model_api_key=content_model_api_key,
+                              tech_only=tech_only, use_cache=use_cache)
+
+    async def produce():
+        for index, item in enumerate(items):
+            state = new_item_state(item, index, tech_only=tech_only)
+            if state["is_tech"] is False:
+                # Clear negatives skip every stage
+                state["result"] = prefiltered_result(state)
+                await done_queue.put(state)
+                continue
+            await fetch_queue.put(state)
+        for _ in range(fetch_workers):
+            await fetch_queue.put(_STOP)
+
+    def complete(index, result):
+        results[index] = result
+        if on_result:
+            try:
+                on_result(index, result)
+            except Exception as e:
+                logger.error(f"处理结果回调失败: {e}, 标题: {result.get('title', '未知标题')}")
+
+    async def collect():
+        while True:
+            state = await done_queue.get()
+            if state is _STOP:
+                return
+            complete(state["index"], state["result"] or _failed_result(state))
+
+    fetch_executor = ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix="fetch")
+    extract_executor = ThreadPoolExecutor(max_workers=extract_workers, thread_name_prefix="extract")
+    if CONTENT_BATCH_ENABLED:
+        # A single dispatcher reads the summary queue and needs a single stop marker
+        summary_consumers = 1
+        summary_stage = _run_batch_summarize_stage(summarize, summarize_batch, summary_workers,
+                                                   summary_queue, done_queue)
+    else:
+        summary_consumers = summary_workers
+        summary_stage = _run_stage("summarize", summarize, None, summary_workers, summary_queue, done_queue, 1)
+    timed_out = False
+    try:
+        await asyncio.wait_for(asyncio.gather(
+            produce(),
+            _run_stage("fetch", fetch_stage, fetch_executor, fetch_workers, fetch_queue, extract_queue, extract_workers),
+            _run_stage("extract", extract_stage, extract_executor, extract_workers, extract_queue, summary_queue, summary_consumers),
+            summary_stage,
+            collect(),
+        ), timeout=run_budget.processing_time_left())
+    except asyncio.TimeoutError:
+        timed_out = True
+        logger.warning("已到运行截止时间，停止等待未完成的条目")
+    finally:
+        # Hung calls are abandoned instead of delaying the digest
+        for executor in (fetch_executor, extract_executor):
+            executor.shutdown(wait=not timed_out, cancel_futures=timed_out)
+
+    for index, result in enumerate(results):
+        if result is None:
+            run_budget.record_degraded("unfinished")
+            complete(index, degraded_result(items[index]))
+
+    return results
+
+def needs_retry(result):
+    """
+    True if the first attempt failed in a way a second attempt may fix
+    """
+    if result.get("summary_source") not in RETRYABLE_SUMMARY_SOURCES:
+        return False
+    if result.get("summary_source") == "无内容":
+        # Only a failed fetch can be retried; tweets are never fetched
+        return bool(result.get("url")) and not result.get("source", "").startswith("Twitter")
+    return True
+
+async def _retry_item(item, content_model_api_key, tech_only, use_cache, executor):
+    # Checked when the item starts, not when it is queued
+    if not run_budget.can_retry():
+        run_budget.record_degraded("retry_skipped")
+        return None
+    return await process_single_item(item, content_model_api_key, tech_only=tech_only, use_cache=use_cache,
+                                     fetch_options={"timeout": RETRY_FETCH_TIMEOUT}, executor=executor)
+
+async def retry_failed_items(items, first_results, content_model_api_key, tech_only=False, use_cache=True, on_result=None):
+    """
+    Second pass over items whose first attempt failed (see needs_retry)
+
+    Runs after the main pass with RETRY_WORKERS threads and RETRY_FETCH_TIMEOUT, and only
+    while the run budget still has time and tokens left. on_result(index, result) is called
+    for every retry that improved on first_results[index]. Returns the improved count.
+    """
+    if not items:
+        return 0
+    if not run_budget.can_retry():
+        logger.info(f"运行时间或token预算不足，跳过 {len(items)} 条失败条目的重试")
+        return 0
+
+    logger.info(f"开始重试 {len(items)} 条失败条目, 并发 {RETRY_WORKERS}, 抓取超时 {RETRY_FETCH_TIMEOUT} 秒")
+    executor = ThreadPoolExecutor(max_workers=RETRY_WORKERS, thread_name_prefix="retry")
+    slots = asyncio.Semaphore(RETRY_WORKERS)
+    improved = 0
+
+    async def retry(index, item):
+        nonlocal improved
+        try:
+            async with slots:
+                result = await _retry_item(item, content_model_api_key, tech_only, use_cache, executor)
+        except Exception as e:
+            logger.error(f"重试失败: {e}, 标题: {item.get('title', '未知标题')}")
+            return
+        old_source = first_results[index].get("summary_source")
+        if result and SUMMARY_SOURCE_RANK.get(result["summary_source"], 0) > SUMMARY_SOURCE_RANK.get(old_source, 0):
+            improved += 1
+            logger.info(f"重试成功: {item.get('title', '未知标题')}, 摘要来源 {old_source} -> {result['summary_source']}")
+            if on_result:
+                on_result(index, result)
+
+    timed_out = False
+    with run_budget.stage("retry"):
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(retry(index, item) for index, item in enumerate(items))),
+                timeout=run_budget.processing_time_left()
+            )
+        except asyncio.TimeoutError:
+            timed_out = True
+            logger.warning("已到运行截止时间，停止重试")
+        finally:
+            executor.shutdown(wait=not timed_out, cancel_futures=timed_out)
+
+    logger.info(f"重试完成: {improved}/{len(items)} 条得到改善")
+    return improved
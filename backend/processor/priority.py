@@ -0,0 +1,137 @@
+import time
+import logging
+from bisect import bisect_left
+
+from utils.time_utils import item_epoch
+
+logger = logging.getLogger(__name__)
+
+# Weight of each source kind, matched against the item's source name in this order
+SOURCE_WEIGHTS = (
+    ("公众号", 1.0),    # 公众号精选 / <feed>-<author>, hand-picked articles
+    ("Twitter", 0.6),   # Short posts, mostly already readable from the tweet itself
+)
+# Hot lists fetched from the DailyHot API carry a hot value, RSS feeds don't
+HOT_LIST_SOURCE_WEIGHT = 0.5
+DEFAULT_SOURCE_WEIGHT = 0.8  # RSS feeds and blogs
+
+# Contribution of each signal to the score, every signal is normalized to [0, 1]
+PRIORITY_WEIGHTS = {
+    "source": 0.35,
+    "hot": 0.25,
+    "recency": 0.25,
+    "cluster": 0.15,
+}
+# Score of a signal that is unknown for an item (no hot value, no timestamp)
+NEUTRAL_SIGNAL = 0.5
+RECENCY_HALF_LIFE_HOURS = 12
+# Reported by this many sources the article gets the full cluster score
+CLUSTER_FULL_SIZE = 4
+
+_HOT_UNITS = {"万": 1e4, "w": 1e4, "亿": 1e8, "k": 1e3, "m": 1e6}
+
+
+def parse_hot_value(hot):
+    """
+    Parse a hot value such as 2412, "1.2万" or "3.4k" into a number, None if missing
+    """
+    if isinstance(hot, bool):
+        return None
+    if isinstance(hot, (int, float)):
+        return float(hot)
+    if not isinstance(hot, str):
+        return None
+    text = hot.strip().lower().replace(",", "")
+    for suffix in ("热度", "点赞", "浏览", "阅读", "次"):
+        text = text.replace(suffix, "").strip()
+    if not text:
+        return None
+    multiplier = 1
+    if text[-1] in _HOT_UNITS:
+        multiplier = _HOT_UNITS[text[-1]]
+        text = text[:-1]
+    try:
+        return float(text) * multiplier
+    except ValueError:
+        return None
+
+
+def get_source_weight(item):
+    source = item.get("source", "") or ""
+    for keyword, weight in SOURCE_WEIGHTS:
+        if keyword in source:
+            return weight
+    if parse_hot_value(item.get("hot")) is not None:
+        return HOT_LIST_SOURCE_WEIGHT
+    return DEFAULT_SOURCE_WEIGHT
+
+
+def _hot_percentiles(items):
+    """
+    Rank of each item's hot value within its own source (hot values of different sites
+    are not comparable), 1.0 for the hottest; items of sources without usable values are left out
+    """
+    by_source = {}
+    for index, item in enumerate(items):
+        value = parse_hot_value(item.get("hot"))
+        if value is not None:
+            by_source.setdefault(item.get("source", ""), []).append((value, index))
+    percentiles = {}
+    for values in by_source.values():
+        if len(values) < 2 or max(v for v, _ in values) <= 0:
+            continue
+        ordered = sorted(v for v, _ in values)
+        for value, index in values:
+            # Ties share the rank of their first occurrence
+            percentiles[index] = bisect_left(ordered, value) / (len(ordered) - 1)
+    return percentiles
+
+
+def score_groups(groups, now=None):
+    """
+    Score each group of duplicate items (item_id -> list of items, see group_duplicate_items)
+
+    The score combines the source weight, the hot value rank within the source, recency
+    of the publish time and how many sources reported the same article.
+    Returns a dict item_id -> score in [0, 1].
+    """
+    now = now or time.time()
+    item_ids = list(groups)
+    representatives = [groups[item_id][0] for item_id in item_ids]
+    percentiles = _hot_percentiles(representatives)
+
+    scores = {}
+    for index, item_id in enumerate(item_ids):
+        group = groups[item_id]
+        source_score = max(get_source_weight(item) for item in group)
+        hot_score = percentiles.get(index, NEUTRAL_SIGNAL)
+        epochs = [e for e in (item_epoch(item) for item in group) if e]
+        if epochs:
+            age_hours = max(0.0, now - max(epochs)) / 3600
+            recency_score = 0.5 ** (age_hours / RECENCY_HALF_LIFE_HOURS)
+        else:
+            recency_score = NEUTRAL_SIGNAL
+        sources = {item.get("source", "") for item in group}
+        cluster_score = min(1.0, (len(sources) - 1) / (CLUSTER_FULL_SIZE - 1))
+
+        scores[item_id] = (
+            PRIORITY_WEIGHTS["source"] * source_score
+            + PRIORITY_WEIGHTS["hot"] * hot_score
+            + PRIORITY_WEIGHTS["recency"] * recency_score
+            + PRIORITY_WEIGHTS["cluster"] * cluster_score
+        )
+    return scores
+
+
+def prioritize_groups(groups, now=None):
+    """
+    Return the groups (lists of duplicate items) sorted by descending priority score,
+    input order breaks ties so the ordering is stable
+    """
+    if not groups:
+        return []
+    scores = score_groups(groups, now=now)
+    ordered = sorted(groups, key=lambda item_id: scores[item_id], reverse=True)
+    top = ", ".join(f"{groups[i][0].get('title', '')[:20]}({scores[i]:.2f})" for i in ordered[:3])
+    logger.info(f"按优先级排序 {len(ordered)} 条待处理条目, 最高: {top}")
+    return [groups[item_id] for item_id in ordered]
@@ -0,0 +1,73 @@
+import re
+import logging
+
+from config.config import (
+    SUMMARY_POLICY_ENABLED, SUMMARY_SHORT_TEXT_MIN_CHARS, SUMMARY_SHORT_TEXT_MAX_CHARS,
+    SUMMARY_DESC_MIN_CHARS, SUMMARY_DESC_MAX_CHARS
+)
+from utils.html_text import html_to_text
+
+logger = logging.getLogger(__name__)
+
+# Summary tiers, cheapest first; the label is stored as the result's summary_source
+SHORT_TEXT_TIER = "short_text"    # The text itself is short enough to be the summary
+SOURCE_DESC_TIER = "source_desc"  # The feed or hot list already gives a summary
+LLM_TIER = "llm"                  # Everything else goes to the content model
+TIER_SUMMARY_SOURCES = {
+    SHORT_TEXT_TIER: "原文",
+    SOURCE_DESC_TIER: "来源摘要",
+}
+
+# Descriptions that are only a link to the article, not a summary of it
+DESC_BOILERPLATE_MARKERS = ("点击查看原文", "阅读原文", "查看全文", "Read more", "Continue reading")
+# A description cut off by the feed ("...", "…", "[…]") reads as a fragment
+_TRUNCATED_DESC_PATTERN = re.compile(r'(\.\.\.|…|\[\.\.\.\]|\[…\])\s*$')
+
+
+def _plain(text):
+    return " ".join(html_to_text(text or "").split())
+
+
+def short_text_summary(content):
+    """
+    The content itself if it is short enough to be read as the summary, else None
+    """
+    text = _plain(content)
+    if SUMMARY_SHORT_TEXT_MIN_CHARS <= len(text) <= SUMMARY_SHORT_TEXT_MAX_CHARS:
+        return text
+    return None
+
+
+def is_adequate_desc(desc, title=""):
+    """
+    True if a source description can be used as the summary: long enough to say more than
+    the title, short enough to be a summary, not cut off and not a "read more" link
+    """
+    if not SUMMARY_DESC_MIN_CHARS <= len(desc) <= SUMMARY_DESC_MAX_CHARS:
+        return False
+    if _TRUNCATED_DESC_PATTERN.search(desc):
+        return False
+    if any(marker.lower() in desc.lower() for marker in DESC_BOILERPLATE_MARKERS):
+        return False
+    title = _plain(title)
+    # A description that only repeats the title adds nothing
+    if title and (desc in title or (desc.startswith(title) and len(desc) - len(title) < SUMMARY_DESC_MIN_CHARS)):
+        return False
+    return True
+
+
+def plan_summary(item, content):
+    """
+    Choose how an item is summarized before anything is fetched
+    content is the item's pre-extracted content. Returns (summary, tier) for items that
+    need no content model call (see TIER_SUMMARY_SOURCES), None for the LLM tier.
+    """
+    if not SUMMARY_POLICY_ENABLED:
+        return None
+    summary = short_text_summary(content)
+    if summary:
+        return summary, SHORT_TEXT_TIER
+    desc = _plain(item.get("desc"))
+    if is_adequate_desc(desc, item.get("title", "")):
+        return desc, SOURCE_DESC_TIER
+    return None
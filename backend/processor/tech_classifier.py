@@ -0,0 +1,247 @@
+import os
+import re
+import json
+import glob
+import time
+import zlib
+import logging
+from threading import Lock
+
+import numpy as np
+
+from config.config import (
+    TECH_PREFILTER_ENABLED, TECH_PREFILTER_POSITIVE_THRESHOLD, TECH_PREFILTER_NEGATIVE_THRESHOLD,
+    TECH_CLASSIFIER_MIN_SAMPLES
+)
+from utils.utils import get_backend_dir
+from utils.html_text import html_to_text
+from utils.extractive_summary import text_terms
+
+logger = logging.getLogger(__name__)
+
+# Terms that make an item likely (or unlikely) to be about technology, matched in title and description.
+# Latin terms match whole words, CJK terms match anywhere.
+TECH_TERMS = (
+    "ai", "aigc", "llm", "gpt", "openai", "deepseek", "anthropic", "nvidia", "gpu", "cpu", "api", "sdk",
+    "github", "linux", "android", "ios", "python", "rust", "javascript", "kubernetes", "agent", "5g",
+    "人工智能", "大模型", "语言模型", "机器学习", "深度学习", "神经网络", "算法", "算力", "芯片", "半导体", "处理器",
+    "显卡", "开源", "编程", "程序员", "开发者", "代码", "软件", "操作系统", "云计算", "数据中心", "服务器",
+    "数据库", "网络安全", "漏洞", "黑客", "机器人", "自动驾驶", "智能体", "量子计算", "区块链", "互联网", "科技",
+)
+NON_TECH_TERMS = (
+    "nba", "cba",
+    "明星", "娱乐", "综艺", "电视剧", "电影", "票房", "演唱会", "偶像", "八卦", "恋情", "离婚", "婚礼",
+    "足球", "篮球", "球员", "球队", "比赛", "冠军", "奥运", "美食", "菜谱", "旅游", "景区", "星座",
+    "养生", "减肥", "彩票", "房价", "楼市", "高考", "天气", "车祸", "命案",
+)
+# Log-odds of one lexicon hit while no model has been trained: two hits are needed for a confident decision
+LEXICON_WEIGHT = 1.5
+
+# Terms are hashed into this many features, two lexicon hit counts follow them
+FEATURE_BUCKETS = 2 ** 14
+TECH_HITS_FEATURE = FEATURE_BUCKETS
+NON_TECH_HITS_FEATURE = FEATURE_BUCKETS + 1
+FEATURE_COUNT = FEATURE_BUCKETS + 2
+
+TRAIN_EPOCHS = 400
+LEARNING_RATE = 1.0
+L2_PENALTY = 1e-4
+# Only the content model's decisions are used as labels
+LABEL_SUMMARY_SOURCE = "AI生成"
+PROCESSED_OUTPUT_PATTERN = "processed_news_*.json"
+
+_LATIN_WORD_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#]*')
+_LATIN_TERM_PATTERN = re.compile(r'^[a-z0-9+#]+$')
+
+
+def item_text(item):
+    """
+    The text the classifier looks at: title and description, no fetched content is needed
+    """
+    desc = html_to_text(item.get("desc") or "", keep_line_breaks=False)
+    return f"{item.get('title') or ''}\n{desc}".strip()
+
+
+def _count_hits(text, words, terms):
+    return sum(1 for term in terms if (term in words if _LATIN_TERM_PATTERN.match(term) else term in text))
+
+
+def lexicon_hits(text):
+    """
+    Number of tech and non-tech lexicon terms found in text
+    """
+    text = text.lower()
+    words = set(_LATIN_WORD_PATTERN.findall(text))
+    return _count_hits(text, words, TECH_TERMS), _count_hits(text, words, NON_TECH_TERMS)
+
+
+def item_features(item):
+    """
+    Sparse feature vector of an item as (indices, values): hashed terms of title and
+    description (present or not) and the two lexicon hit counts
+    """
+    text = item_text(item)
+    indices = sorted({zlib.crc32(term.encode('utf-8')) % FEATURE_BUCKETS for term in text_terms(text)})
+    values = [1.0] * len(indices)
+    tech_hits, non_tech_hits = lexicon_hits(text)
+    for index, hits in ((TECH_HITS_FEATURE, tech_hits), (NON_TECH_HITS_FEATURE, non_tech_hits)):
+        if hits:
+            indices.append(index)
+            values.append(float(hits))
+    return np.array(indices, dtype=np.int64), np.array(values)
+
+
+def _sigmoid(logits):
+    return 1 / (1 + np.exp(-np.clip(logits, -30, 30)))
+
+
+class TechClassifier:
+    """
+    Fast local tech-relevance classifier over an item's title and description
+
+    A logistic regression over hashed terms and lexicon hits, trained from the content
+    model's is_tech decisions of earlier runs (see ensure_trained). Until there is enough
+    history it scores with the lexicon alone. classify() only decides clear cases, ambiguous
+    items are left to the content model.
+    """
+
+    def __init__(self, cache_dir="cache/models", positive_threshold=TECH_PREFILTER_POSITIVE_THRESHOLD,
+                 negative_threshold=TECH_PREFILTER_NEGATIVE_THRESHOLD, enabled=TECH_PREFILTER_ENABLED):
+        self.model_path = os.path.join(get_backend_dir(), cache_dir, "tech_classifier.json")
+        self.positive_threshold = positive_threshold
+        self.negative_threshold = negative_threshold
+        self.enabled = enabled
+        self._weights = None
+        self._bias = 0.0
+        self._loaded = False
+        self._lock = Lock()
+
+    def _load(self):
+        # Caller holds the lock
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self.model_path):
+            return
+        try:
+            with open(self.model_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            weights = np.zeros(FEATURE_COUNT)
+            for index, weight in data["weights"].items():
+                weights[int(index)] = weight
+            self._weights, self._bias = weights, data["bias"]
+            logger.info(f"Loaded tech classifier trained on {data.get('samples', 0)} items")
+        except Exception as e:
+            logger.warning(f"Failed to load tech classifier, using the lexicon only: {str(e)}")
+
+    def score(self, item):
+        """
+        Probability that the item is about technology
+        """
+        with self._lock:
+            self._load()
+            weights, bias = self._weights, self._bias
+        if weights is None:
+            tech_hits, non_tech_hits = lexicon_hits(item_text(item))
+            return float(_sigmoid(LEXICON_WEIGHT * (tech_hits - non_tech_hits)))
+        indices, values = item_features(item)
+        return float(_sigmoid(bias + weights[indices] @ values))
+
+    def classify(self, item):
+        """
+        True or False for items the classifier is confident about, None if the content model should decide
+        """
+        if not self.enabled:
+            return None
+        probability = self.score(item)
+        if probability >= self.positive_threshold:
+            return True
+        if probability <= self.negative_threshold:
+            return False
+        return None
+
+    def train(self, records):
+        """
+        Fit the model on processed records labelled by the content model and save it
+        Returns False (keeping the current model) if either class has fewer than
+        TECH_CLASSIFIER_MIN_SAMPLES records
+        """
+        labelled = [r for r in records if r.get("summary_source") == LABEL_SUMMARY_SOURCE and "is_tech" in r]
+        labels = np.array([1.0 if r["is_tech"] else 0.0 for r in labelled])
+        positives = int(labels.sum())
+        negatives = len(labels) - positives
+        if min(positives, negatives) < TECH_CLASSIFIER_MIN_SAMPLES:
+            logger.info(f"Not enough labelled items to train the tech classifier "
+                        f"({positives} tech, {negatives} non-tech, {TECH_CLASSIFIER_MIN_SAMPLES} of each needed)")
+            return False
+
+        features = [item_features(r) for r in labelled]
+        count = len(labelled)
+        rows = np.repeat(np.arange(count), [len(indices) for indices, _ in features])
+        indices = np.concatenate([indices for indices, _ in features])
+        values = np.concatenate([values for _, values in features])
+        # Both classes weigh the same however unbalanced the history is
+        sample_weights = np.where(labels == 1, count / (2 * positives), count / (2 * negatives))
+
+        weights = np.zeros(FEATURE_COUNT)
+        bias = 0.0
+        for _ in range(TRAIN_EPOCHS):
+            logits = np.bincount(rows, weights=weights[indices] * values, minlength=count) + bias
+            errors = (_sigmoid(logits) - labels) * sample_weights / count
+            gradient = np.bincount(indices, weights=errors[rows] * values, minlength=FEATURE_COUNT)
+            weights -= LEARNING_RATE * (gradient + L2_PENALTY * weights)
+            bias -= LEARNING_RATE * errors.sum()
+
+        with self._lock:
+            self._weights, self._bias, self._loaded = weights, float(bias), True
+        self._save(weights, float(bias), count)
+        logger.info(f"Trained tech classifier on {count} items ({positives} tech, {negatives} non-tech)")
+        return True
+
+    def _save(self, weights, bias, samples):
+        try:
+            os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
+            data = {
+                "trained_at": time.time(),
+                "samples": samples,
+                "bias": bias,
+                "weights": {str(i): round(float(weights[i]), 6) for i in np.flatnonzero(np.abs(weights) > 1e-6)},
+            }
+            tmp_path = f"{self.model_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.model_path)
+        except Exception as e:
+            logger.warning(f"Failed to save tech classifier: {str(e)}")
+
+    def ensure_trained(self, processed_output_dir, extra_records=()):
+        """
+        Retrain from the processed output files in processed_output_dir (and extra_records,
+        e.g. the processed item store) if any file is newer than the saved model
+        """
+        paths = glob.glob(os.path.join(processed_output_dir, PROCESSED_OUTPUT_PATTERN))
+        if not paths:
+            return False
+        if os.path.exists(self.model_path) and os.path.getmtime(self.model_path) >= max(map(os.path.getmtime, paths)):
+            return False
+        records = {}
+        for path in paths:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    items = json.load(f)
+            except Exception as e:
+                logger.warning(f"Failed to read processed output {path}: {str(e)}")
+                continue
+            for item in items:
+                records[item.get("item_id") or item.get("title")] = item
+        for record in extra_records:
+            records.setdefault(record.get("item_id") or record.get("title"), record)
+        try:
+            return self.train(list(records.values()))
+        except Exception as e:
+            logger.warning(f"Failed to train tech classifier: {str(e)}")
+            return False
+
+
+# Global tech classifier instance
+tech_classifier = TechClassifier()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试异步模型客户端（并发上限、响应校验、事件循环切换）和使用它的汇总请求
+"""
+
+import os
+import sys
+import json
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import DIGEST_MODEL_TIMEOUT
+from llm_integration.async_client import AsyncLLMClient, chat_completions_url
+from llm_integration.summary_integration import summarize_with_deepseek
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+        self.text = json.dumps(data, ensure_ascii=False)
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class FakeAsyncClient:
+    """记录创建参数和同时进行的请求数，返回 answer 的内容"""
+    instances = []
+    answer = "回答"
+    inflight = 0
+    max_inflight = 0
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.closed = False
+        self.requests = []
+        FakeAsyncClient.instances.append(self)
+
+    async def post(self, url, json=None, headers=None):
+        self.requests.append((url, json))
+        FakeAsyncClient.inflight += 1
+        FakeAsyncClient.max_inflight = max(FakeAsyncClient.max_inflight, FakeAsyncClient.inflight)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            FakeAsyncClient.inflight -= 1
+        if FakeAsyncClient.answer is None:
+            return FakeResponse({"error": "overloaded"})
+        return FakeResponse({"choices": [{"message": {"content": FakeAsyncClient.answer}}],
+                             "usage": {"prompt_tokens": 10, "completion_tokens": 5}})
+
+    async def aclose(self):
+        self.closed = True
+
+
+@patch('llm_integration.async_client.httpx.AsyncClient', FakeAsyncClient)
+class TestAsyncLLMClient(unittest.TestCase):
+    """测试 AsyncLLMClient"""
+
+    def setUp(self):
+        FakeAsyncClient.instances = []
+        FakeAsyncClient.answer = "回答"
+        FakeAsyncClient.max_inflight = 0
+
+    def test_chat_completions_url(self):
+        """补全chat completions路径，已是完整地址时保持不变"""
+        self.assertEqual(chat_completions_url("http://127.0.0.1:11434/v1/"),
+                         "http://127.0.0.1:11434/v1/chat/completions")
+        self.assertEqual(chat_completions_url("https://api.example.com/v3/chat/completions"),
+                         "https://api.example.com/v3/chat/completions")
+
+    def test_max_inflight_limits_concurrent_requests(self):
+        """同时发送的请求数不超过max_inflight"""
+        client = AsyncLLMClient("http://model/v1/chat/completions", "model", max_inflight=2)
+
+        async def run():
+            async with client:
+                return await asyncio.gather(*(client.complete(f"问题{i}") for i in range(6)))
+
+        results = asyncio.run(run())
+
+        self.assertEqual(results, [("回答", {"prompt_tokens": 10, "completion_tokens": 5})] * 6)
+        self.assertEqual(FakeAsyncClient.max_inflight, 2)
+        self.assertEqual(len(FakeAsyncClient.instances), 1)
+        self.assertTrue(FakeAsyncClient.instances[0].closed)
+
+    @patch('llm_integration.async_client.token_tracker')
+    def test_usage_is_recorded(self, mock_tracker):
+        """记录API返回的用量、阶段、来源和请求耗时"""
+        client = AsyncLLMClient("http://model/v1/chat/completions", "model")
+
+        async def run():
+            async with client:
+                await client.complete("问题", stage="summary", source="36kr")
+
+        asyncio.run(run())
+
+        args, kwargs = mock_tracker.record_response.call_args
+        self.assertEqual(args, ("model", "问题", "回答", {"prompt_tokens": 10, "completion_tokens": 5}))
+        self.assertEqual(kwargs["stage"], "summary")
+        self.assertEqual(kwargs["source"], "36kr")
+        self.assertGreater(kwargs["latency"], 0)
+
+    def test_response_without_choices(self):
+        """响应中没有choices时抛出异常"""
+        FakeAsyncClient.answer = None
+        client = AsyncLLMClient("http://model/v1/chat/completions", "model")
+
+        async def run():
+            async with client:
+                await client.complete("问题")
+
+        with self.assertRaises(ValueError):
+            asyncio.run(run())
+
+    def test_new_event_loop_closes_stale_client(self):
+        """在新的事件循环中使用时，关闭上一个循环留下的连接池"""
+        client = AsyncLLMClient("http://model/v1/chat/completions", "model")
+        asyncio.run(client.complete("问题"))
+        asyncio.run(client.complete("问题"))
+
+        self.assertEqual(len(FakeAsyncClient.instances), 2)
+        self.assertTrue(FakeAsyncClient.instances[0].closed)
+        asyncio.run(client.aclose())
+        self.assertTrue(FakeAsyncClient.instances[1].closed)
+
+
+@patch('llm_integration.async_client.httpx.AsyncClient', FakeAsyncClient)
+class TestDigestRequest(unittest.TestCase):
+    """测试 summarize_with_deepseek 通过异步客户端发送汇总请求"""
+
+    def setUp(self):
+        FakeAsyncClient.instances = []
+        FakeAsyncClient.answer = json.dumps([{"title": "AI新闻", "summary": "汇总摘要", "related_ids": [0]}],
+                                            ensure_ascii=False)
+
+    @patch('llm_integration.summary_integration.get_project_root')
+    def test_digest_request(self, mock_root):
+        """汇总请求使用汇总超时、不校验证书，结束后关闭连接"""
+        mock_root.return_value = tempfile.mkdtemp()
+        hotspots = [{"title": "测试新闻", "url": "https://example.com/news1", "source": "test_source",
+                     "summary": "测试摘要"}]
+
+        result = summarize_with_deepseek(hotspots, "test_key", api_url="https://api.example.com/v3/chat/completions",
+                                         model_id="test-model")
+
+        self.assertIn("AI新闻", result)
+        self.assertIn("https://example.com/news1", result)
+        client = FakeAsyncClient.instances[0]
+        self.assertEqual(client.kwargs["timeout"], DIGEST_MODEL_TIMEOUT)
+        self.assertFalse(client.kwargs["verify"])
+        self.assertTrue(client.closed)
+        url, payload = client.requests[0]
+        self.assertEqual(url, "https://api.example.com/v3/chat/completions")
+        self.assertEqual(payload["model"], "test-model")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试批量摘要（分批、结果解析和格式错误时的拆分重试）
+"""
+
+import os
+import sys
+import json
+import asyncio
+import unittest
+from unittest.mock import patch, AsyncMock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_integration.content_integration import (
+    estimate_tokens, plan_batches, parse_batch_response, summarize_batch_with_content_model
+)
+
+
+def _articles(count, content=None):
+    return [{"id": str(i), "title": f"标题{i}", "content": content or f"短内容{i}" * 30} for i in range(count)]
+
+
+class TestContentBatching(unittest.TestCase):
+    """测试 summarize_batch_with_content_model 及其辅助函数"""
+
+    def test_estimate_tokens(self):
+        """中文按字计数，其他文本约4个字符一个token"""
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("科技新闻"), 4)
+        self.assertEqual(estimate_tokens("abcdefgh"), 2)
+
+    def test_plan_batches_respects_budget(self):
+        """按token预算和最大条数分批，保持输入顺序"""
+        articles = _articles(10)
+        batches = plan_batches(articles, token_budget=100000, max_items=4)
+        self.assertEqual([len(batch) for batch in batches], [4, 4, 2])
+        batches = plan_batches(articles, token_budget=1000, max_items=10)
+        self.assertTrue(all(len(batch) < 10 for batch in batches))
+        self.assertEqual([a["id"] for batch in batches for a in batch], [a["id"] for a in articles])
+
+    def test_parse_batch_response(self):
+        """忽略未知id和空摘要，没有JSON数组时抛出异常"""
+        text = '结果如下：[{"id": "0", "summary": "摘要0", "is_tech": true}, {"id": "9", "summary": "x"}, {"id": "1", "summary": ""}]'
+        self.assertEqual(parse_batch_response(text, {"0", "1"}), {"0": {"summary": "摘要0", "is_tech": True}})
+        with self.assertRaises(ValueError):
+            parse_batch_response("无法处理", {"0"})
+
+    @patch('llm_integration.content_integration._generate_summary_async')
+    @patch('llm_integration.content_integration.content_client')
+    def test_malformed_batch_is_split(self, mock_client, mock_single):
+        """格式错误的批次拆分重试，单条时使用单篇摘要"""
+        async def complete(prompt, api_key=None, **kwargs):
+            articles = json.loads(prompt[prompt.index("["):prompt.rindex("]") + 1])
+            if len(articles) > 2:
+                return "[{", None
+            return json.dumps([{"id": a["id"], "summary": "批量" + a["id"], "is_tech": True} for a in articles]), None
+
+        mock_client.complete = AsyncMock(side_effect=complete)
+        mock_single.return_value = {"summary": "单篇", "is_tech": False}
+
+        results = asyncio.run(summarize_batch_with_content_model(_articles(5), "test_key", use_cache=False))
+
+        self.assertEqual(set(results), {"0", "1", "2", "3", "4"})
+        self.assertEqual(results["0"]["summary"], "批量0")
+        self.assertTrue(all(r["summary"] for r in results.values()))
+
+    @patch('llm_integration.content_integration.content_client')
+    def test_identical_content_is_requested_once(self, mock_client):
+        """同时提交的相同内容只请求一次，共享同一个摘要"""
+        async def complete(prompt, api_key=None, **kwargs):
+            await asyncio.sleep(0.01)
+            # 相同内容只剩一篇，使用单篇提示词
+            return '{"summary": "摘要", "is_tech": true}', None
+
+        mock_client.complete = AsyncMock(side_effect=complete)
+
+        async def run():
+            return await asyncio.gather(
+                summarize_batch_with_content_model(_articles(3, content="相同内容" * 30), "test_key", use_cache=False),
+                summarize_batch_with_content_model(_articles(1, content="相同内容" * 30), "test_key", use_cache=False),
+            )
+
+        first, second = asyncio.run(run())
+
+        self.assertEqual(mock_client.complete.await_count, 1)
+        self.assertEqual(set(first), {"0", "1", "2"})
+        self.assertEqual(first["0"]["summary"], "摘要")
+        self.assertEqual(second["0"], first["0"])
+        self.assertEqual(first["1"], first["0"])
+
+
+if __name__ == "__main__":
+    unittest.main()
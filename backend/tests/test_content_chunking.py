@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试长文分段摘要（按token分段、分段摘要后合并、缓存键覆盖全文）
+"""
+
+import os
+import sys
+import asyncio
+import unittest
+from unittest.mock import patch, AsyncMock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.token_tracker import estimate_tokens
+from llm_integration.content_integration import (
+    chunk_text, normalize_content, summarize_with_content_model_async, SUMMARY_PROMPT
+)
+
+
+def _long_article(paragraphs=10, sentences=15):
+    return "\n\n".join(
+        "".join(f"第{i}段第{j}句介绍人工智能模型的训练成本持续下降。" for j in range(sentences))
+        for i in range(paragraphs)
+    )
+
+
+class TestContentChunking(unittest.TestCase):
+    """测试 chunk_text 和长文的分段摘要"""
+
+    def test_normalize_content(self):
+        """合并多余空白和空行"""
+        self.assertEqual(normalize_content("  标题 \t 内容\n\n\n\n第二段  "), "标题 内容\n\n第二段")
+        self.assertEqual(normalize_content(None), "")
+
+    def test_chunk_text_respects_budget(self):
+        """每段不超过token上限，分段后不丢失内容"""
+        text = normalize_content(_long_article())
+        chunks = chunk_text(text, max_tokens=300)
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(estimate_tokens(chunk) <= 300 for chunk in chunks))
+        self.assertEqual("".join(chunks).replace("\n", ""), text.replace("\n", ""))
+
+    def test_chunk_text_splits_long_sentence(self):
+        """没有标点的超长句子按字符切分"""
+        chunks = chunk_text("字" * 250, max_tokens=100)
+        self.assertEqual([len(chunk) for chunk in chunks], [100, 100, 50])
+
+    @patch('llm_integration.content_integration.summary_store')
+    def test_cache_key_covers_full_content(self, mock_store):
+        """前2000字相同但后文不同的内容使用不同的缓存键"""
+        mock_store.get.return_value = {"summary": "缓存", "is_tech": True}
+        prefix = "相同的页头导航。" * 300
+        asyncio.run(summarize_with_content_model_async(prefix + "第一篇正文", "test_key"))
+        asyncio.run(summarize_with_content_model_async(prefix + "第二篇正文", "test_key"))
+        first_hash, second_hash = (call.args[0] for call in mock_store.get.call_args_list)
+        self.assertNotEqual(first_hash, second_hash)
+
+    @patch('llm_integration.content_integration.CONTENT_COMPRESS_TOKENS', 0)
+    @patch('llm_integration.content_integration.content_client')
+    def test_long_content_map_reduce(self, mock_client):
+        """长文分段并行摘要，再用各段要点生成最终摘要"""
+        prompts = []
+
+        async def complete(prompt, api_key=None, stage=None, source=None):
+            prompts.append((stage, prompt))
+            if stage == "chunk_summary":
+                return "要点", None
+            return '{"summary": "全文摘要", "is_tech": true}', None
+
+        mock_client.complete = AsyncMock(side_effect=complete)
+        content = _long_article()
+
+        with patch('llm_integration.content_integration.chunk_text',
+                   side_effect=lambda text: chunk_text(text, max_tokens=700)):
+            result = asyncio.run(summarize_with_content_model_async(content, "test_key", title="标题", use_cache=False))
+
+        self.assertEqual(result, {"summary": "全文摘要", "is_tech": True})
+        stages = [stage for stage, _ in prompts]
+        self.assertGreater(stages.count("chunk_summary"), 1)
+        self.assertEqual(stages[-1], "reduce_summary")
+        self.assertEqual(stages.count("reduce_summary"), 1)
+        # 最后一段的内容也发送给了模型
+        chunk_prompts = "".join(prompt for stage, prompt in prompts if stage == "chunk_summary")
+        self.assertIn("第9段第14句", chunk_prompts)
+        self.assertIn("1. 要点", prompts[-1][1])
+
+
+    @patch('llm_integration.content_integration.CONTENT_COMPRESS_TOKENS', 600)
+    @patch('llm_integration.content_integration.content_client')
+    def test_long_content_is_compressed_first(self, mock_client):
+        """超过压缩阈值的内容先抽取关键句，压缩后一次请求即可"""
+        prompts = []
+
+        async def complete(prompt, api_key=None, stage=None, source=None):
+            prompts.append((stage, prompt))
+            return '{"summary": "全文摘要", "is_tech": true}', None
+
+        mock_client.complete = AsyncMock(side_effect=complete)
+
+        result = asyncio.run(summarize_with_content_model_async(_long_article(), "test_key", use_cache=False))
+
+        self.assertEqual(result["summary"], "全文摘要")
+        self.assertEqual([stage for stage, _ in prompts], ["summary"])
+        self.assertLess(estimate_tokens(prompts[0][1]), 600 + estimate_tokens(SUMMARY_PROMPT.template))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试抽取式摘要（分句、TextRank句子打分和按预算选句）
+"""
+
+import os
+import sys
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.token_tracker import estimate_tokens
+from utils.extractive_summary import split_sentences, rank_sentences, extract_summary, join_sentences
+
+ARTICLE = "\n".join([
+    "首页",
+    "分享到微信",
+    "OpenAI今天发布了新一代大语言模型，推理能力显著提升。",
+    "新一代大语言模型在数学和编程测试中的成绩超过了上一代模型。",
+    "据介绍，大语言模型的推理成本也下降了一半。",
+    "今天天气晴朗，适合出行。",
+    "分享到微信",
+    "业内人士认为，推理能力更强的大语言模型将加速AI应用落地。",
+])
+
+
+class TestExtractiveSummary(unittest.TestCase):
+    """测试 extractive_summary 模块"""
+
+    def test_split_sentences(self):
+        """按中英文句末标点和换行分句，英文句子之间保留空格"""
+        sentences = split_sentences("第一句。第二句！\nFirst one. Second one? 3.5 stays")
+        self.assertEqual(sentences, ["第一句。", "第二句！", "First one.", "Second one?", "3.5 stays"])
+        self.assertEqual(join_sentences(sentences), "第一句。第二句！First one. Second one? 3.5 stays")
+
+    def test_rank_prefers_central_sentences(self):
+        """与全文主题相关的句子得分更高，过短和重复的句子不得分"""
+        sentences = split_sentences(ARTICLE)
+        scores = rank_sentences(sentences)
+        self.assertEqual(len(scores), len(sentences))
+        self.assertAlmostEqual(float(scores.sum()), 1.0)
+        self.assertEqual(scores[sentences.index("首页")], 0)
+        self.assertEqual(scores[6], 0)  # 重复的“分享到微信”
+        off_topic = scores[sentences.index("今天天气晴朗，适合出行。")]
+        self.assertLess(off_topic, scores[sentences.index("新一代大语言模型在数学和编程测试中的成绩超过了上一代模型。")])
+
+    def test_extract_summary_respects_budget(self):
+        """按字符或token预算选句，保持原文顺序"""
+        summary = extract_summary(ARTICLE, max_chars=60)
+        self.assertLessEqual(len(summary), 60)
+        self.assertNotIn("天气", summary)
+        self.assertNotIn("分享", summary)
+        positions = [ARTICLE.index(sentence) for sentence in split_sentences(summary)]
+        self.assertEqual(positions, sorted(positions))
+
+        summary = extract_summary(ARTICLE, max_tokens=50)
+        self.assertLessEqual(estimate_tokens(summary), 50)
+        self.assertTrue(summary)
+
+    def test_short_text_unchanged(self):
+        """未超过预算的文本原样返回"""
+        self.assertEqual(extract_summary("短文本。", max_chars=100), "短文本。")
+        self.assertEqual(extract_summary("", max_chars=100), "")
+        self.assertEqual(extract_summary("一个没有标点而且很长的句子" * 20, max_chars=10), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
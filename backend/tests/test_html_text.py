@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试HTML转纯文本工具
+"""
+
+import os
+import sys
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.html_text import html_to_text, clean_html_fields
+
+
+class TestHtmlText(unittest.TestCase):
+    """测试 html_to_text 和 clean_html_fields"""
+
+    def test_plain_text_short_circuit(self):
+        """不含标签和实体的字符串不经过解析，仅规整空白"""
+        self.assertEqual(html_to_text("  hello   world \n\n second  line "), "hello world\nsecond line")
+        self.assertEqual(html_to_text("  hello   world  ", keep_line_breaks=False), "hello   world")
+
+    def test_line_breaks_preserved(self):
+        """<br> 和 <p> 转换为换行"""
+        html = "<p>第一段  内容</p><p>第二段<br/>换行</p>"
+        self.assertEqual(html_to_text(html), "第一段 内容\n第二段\n换行")
+
+    def test_strip_mode_matches_get_text_strip(self):
+        """keep_line_breaks=False 时与 get_text(strip=True) 一致"""
+        html = "<div> <b>Hello</b> <i>World</i> </div>"
+        self.assertEqual(html_to_text(html, keep_line_breaks=False), "HelloWorld")
+
+    def test_entities_and_scripts(self):
+        """实体被解码，脚本内容被丢弃"""
+        html = "A &amp; B<script>var x = 1;</script><style>p{}</style>"
+        self.assertEqual(html_to_text(html), "A & B")
+
+    def test_non_string_values(self):
+        """非字符串原样返回"""
+        self.assertIsNone(html_to_text(None))
+        self.assertEqual(html_to_text(123), 123)
+
+    def test_clean_html_fields(self):
+        """递归清理字典，URL保持不变"""
+        item = {
+            "title": "<b>标题</b>",
+            "url": "https://example.com/?a=1&copy=2",
+            "hot": 100,
+            "tags": ["<i>AI</i>", "plain"],
+        }
+        cleaned = clean_html_fields(item)
+        self.assertEqual(cleaned["title"], "标题")
+        self.assertEqual(cleaned["url"], "https://example.com/?a=1&copy=2")
+        self.assertEqual(cleaned["hot"], 100)
+        self.assertEqual(cleaned["tags"], ["AI", "plain"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试已处理条目存储（复用判断和增量模式的时间窗口）
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch, AsyncMock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.item_store import ItemStore
+from utils.redirect_cache import RedirectCache
+from utils.url_utils import get_item_id
+from processor.news_processor import process_hotspot_with_summary
+
+
+class TestItemStore(unittest.TestCase):
+    """测试 ItemStore"""
+
+    def setUp(self):
+        self.store = ItemStore(cache_dir=tempfile.mkdtemp())
+
+    def _store(self, item_id, **fields):
+        item = {"item_id": item_id, "url": f"https://example.com/{item_id}", "title": item_id}
+        self.store.store(item, {**item, "summary": "摘要", "summary_source": "AI生成", "content": "正文", **fields})
+        return item
+
+    def test_lookup_requires_unchanged_source(self):
+        """源数据变化时默认不复用，增量模式下仍然复用"""
+        item = self._store("a")
+        self.assertEqual(self.store.lookup(item)["summary"], "摘要")
+        self.assertNotIn("content", self.store.lookup(item))
+        changed = {**item, "title": "新标题"}
+        self.assertIsNone(self.store.lookup(changed))
+        self.assertIsNotNone(self.store.lookup(changed, match_fingerprint=False))
+
+    def test_failed_results_not_stored(self):
+        """失败的结果不保存，下次运行重新处理"""
+        item = self._store("a", summary_source="处理失败")
+        self.assertIsNone(self.store.lookup(item))
+
+    def test_window_records(self):
+        """只返回时间窗口内、且本次未采集到的条目"""
+        now = time.time()
+        self._store("recent", timestamp=int(now * 1000))
+        self._store("old", timestamp=int((now - 3 * 86400) * 1000))
+        self._store("collected", timestamp=int(now * 1000))
+        records = self.store.window_records(now - 86400, exclude_ids={"collected"})
+        self.assertEqual([r["item_id"] for r in records], ["recent"])
+
+    def test_id_stable_after_redirect_learned(self):
+        """首次运行时还不知道短链接的跳转，之后的运行仍能找到该条目"""
+        redirects = RedirectCache(cache_dir=tempfile.mkdtemp())
+        with patch('utils.url_utils.redirect_cache', redirects):
+            item = {"url": "https://t.co/abc", "title": "推文"}
+            first_run = {**item, "item_id": get_item_id(item)}
+            # 抓取时记录了跳转，结果按解析后的id保存
+            redirects.record("https://t.co/abc", "https://example.com/post")
+            self.store.store(first_run, {**first_run, "summary": "摘要", "summary_source": "AI生成"})
+            next_run = {**item, "item_id": get_item_id(item)}
+            self.assertNotEqual(first_run["item_id"], next_run["item_id"])
+            self.assertEqual(self.store.lookup(next_run)["item_id"], next_run["item_id"])
+            self.assertEqual(self.store.window_records(0, exclude_ids={next_run["item_id"]}), [])
+
+            # 按收集时的id保存的记录（跳转尚未记录）也能找到
+            other = {"url": "https://t.co/xyz", "title": "另一条推文"}
+            other = {**other, "item_id": get_item_id(other)}
+            self.store.store(other, {**other, "summary": "摘要", "summary_source": "AI生成"})
+            redirects.record("https://t.co/xyz", "https://example.com/other")
+            self.assertIsNotNone(self.store.lookup({**other, "item_id": get_item_id(other)}))
+
+    def test_save_and_reload(self):
+        """保存后重新加载"""
+        item = self._store("a")
+        self.store.save()
+        reloaded = ItemStore(cache_dir=os.path.dirname(self.store.store_path))
+        self.assertEqual(reloaded.lookup(item)["summary"], "摘要")
+
+
+
+@patch('processor.news_processor.content_client', new_callable=AsyncMock)
+@patch('processor.news_processor.append_jsonl')
+@patch('processor.news_processor.RETRY_FAILED_ITEMS', False)
+@patch('processor.news_processor.run_pipeline')
+class TestIncrementalReuse(unittest.TestCase):
+    """测试处理时复用已存储的条目"""
+
+    def setUp(self):
+        self.store = ItemStore(cache_dir=tempfile.mkdtemp())
+        patcher = patch('processor.news_processor.item_store', self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.item = {"item_id": "a", "url": "https://example.com/a", "title": "标题", "source": "36kr"}
+        self.store.store(self.item, {**self.item, "summary": "旧摘要", "summary_source": "AI生成", "is_tech": True})
+
+    def _process(self, mock_run_pipeline, **kwargs):
+        async def run_pipeline(items, api_key, on_result=None, **_):
+            results = [{**item, "summary": "新摘要", "summary_source": "AI生成", "is_processed": True} for item in items]
+            for index, result in enumerate(results):
+                on_result(index, result)
+            return results
+        mock_run_pipeline.side_effect = run_pipeline
+        # 源数据有变化：只有增量模式复用
+        item = {**self.item, "title": "新标题"}
+        return asyncio.run(process_hotspot_with_summary([item], "test_key", **kwargs))
+
+    def test_incremental_without_cache(self, mock_run_pipeline, mock_append, mock_content_client):
+        """NO_CACHE时增量模式仍然复用已处理的条目，不重新抓取和摘要"""
+        results = self._process(mock_run_pipeline, use_cache=False, incremental=True)
+
+        self.assertEqual(results[0]["summary"], "旧摘要")
+        self.assertEqual(mock_run_pipeline.call_args.args[0], [])
+
+    def test_no_cache_without_incremental(self, mock_run_pipeline, mock_append, mock_content_client):
+        """非增量模式下NO_CACHE重新处理所有条目"""
+        results = self._process(mock_run_pipeline, use_cache=False)
+
+        self.assertEqual(results[0]["summary"], "新摘要")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试紧凑条目模型 NewsItem
+"""
+
+import os
+import sys
+import json
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.news_item import NewsItem, drop_field, without_fields
+from utils.blob_store import BlobStore
+from utils.html_text import clean_html_fields
+
+
+class TestNewsItem(unittest.TestCase):
+    """测试 NewsItem 的字典兼容访问"""
+
+    def setUp(self):
+        self.item = NewsItem({"title": "标题", "url": "https://example.com/a", "source": "36氪", "author": "作者"})
+
+    def test_no_instance_dict(self):
+        """已知字段存放在__slots__中"""
+        self.assertFalse(hasattr(self.item, "__dict__"))
+
+    def test_dict_access(self):
+        """get、下标、in、pop与字典一致"""
+        self.assertEqual(self.item["title"], "标题")
+        self.assertEqual(self.item.get("summary", "默认"), "默认")
+        self.assertIn("author", self.item)
+        self.assertNotIn("content", self.item)
+        with self.assertRaises(KeyError):
+            self.item["content"]
+        self.item["content"] = "正文"
+        self.assertEqual(self.item.pop("content"), "正文")
+        self.assertIsNone(self.item.pop("content", None))
+
+    def test_copy_is_independent(self):
+        """copy() 返回新的 NewsItem"""
+        copied = self.item.copy()
+        copied["summary"] = "摘要"
+        self.assertIsInstance(copied, NewsItem)
+        self.assertNotIn("summary", self.item)
+
+    def test_serialization(self):
+        """转换为字典后可以序列化，{**item} 与 clean_html_fields 返回普通字典"""
+        expected = {"title": "标题", "url": "https://example.com/a", "source": "36氪", "author": "作者"}
+        self.assertEqual(json.loads(json.dumps(self.item.to_dict())), expected)
+        self.assertEqual({**self.item}, expected)
+        self.assertEqual(self.item, expected)
+        self.assertIs(type(clean_html_fields(self.item)), dict)
+
+
+class TestNewsItemContentSpill(unittest.TestCase):
+    """测试长正文写入磁盘并按需读取"""
+
+    def setUp(self):
+        self.store = BlobStore(cache_dir=tempfile.mkdtemp(), min_chars=100)
+        patcher = patch("utils.news_item.blob_store", self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_long_content_spilled(self):
+        """长正文只保留引用，读取时从磁盘加载"""
+        content = "正文" * 100
+        item = NewsItem({"title": "标题", "content": content})
+        self.assertFalse(hasattr(item, "content"))
+        self.assertIn("content", item)
+        self.assertEqual(item["content"], content)
+        self.assertEqual(item.to_dict(), {"title": "标题", "content": content})
+
+    def test_short_content_kept(self):
+        """短正文保存在内存中"""
+        item = NewsItem({"content": "短正文"})
+        self.assertEqual(item.content, "短正文")
+
+    def test_copy_and_release(self):
+        """复制共享同一引用，删除后不再包含正文"""
+        item = NewsItem({"content": "正文" * 100})
+        copied = item.copy()
+        self.assertEqual(copied["content"], item["content"])
+        item.pop("content")
+        self.assertNotIn("content", item)
+        self.assertIn("content", copied)
+
+    def test_drop_without_loading(self):
+        """丢弃正文和输出其他字段时不从磁盘读取正文"""
+        item = NewsItem({"title": "标题", "content": "正文" * 100})
+        with patch.object(self.store, "get") as mock_get:
+            self.assertEqual(without_fields(item, "content"), {"title": "标题"})
+            drop_field(item, "content")
+            drop_field(item, "content")
+            mock_get.assert_not_called()
+        self.assertNotIn("content", item)
+        plain = {"title": "标题", "content": "正文"}
+        drop_field(plain, "content")
+        self.assertEqual(plain, {"title": "标题"})
+
+
+if __name__ == "__main__":
+    unittest.main()
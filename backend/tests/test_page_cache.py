@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试网页磁盘缓存（新鲜度、条件请求后刷新、提取文本回写、按时间和大小清理）
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.page_cache import PageCache
+
+HTML = "<html><body><p>正文内容</p></body></html>"
+
+
+def _random_html():
+    # 随机内容压缩后大小基本不变，便于测试按大小清理
+    return f"<html><body>{os.urandom(8 * 1024).hex()}</body></html>"
+
+
+class TestPageCache(unittest.TestCase):
+    """测试 PageCache"""
+
+    def setUp(self):
+        self.cache = PageCache(cache_dir=tempfile.mkdtemp(), ttl_hours=1, max_age_days=1, max_size_mb=1,
+                               enabled=True)
+
+    def _body_files(self):
+        return os.listdir(self.cache.body_dir)
+
+    def test_put_and_get(self):
+        """保存的HTML和验证信息可以原样读回，URL变体命中同一条目"""
+        self.cache.put("https://example.com/a", HTML, final_url="https://example.com/a/",
+                       etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+
+        entry = self.cache.get("http://www.example.com/a?utm_source=feed")
+        self.assertEqual(entry["html"], HTML)
+        self.assertIsNone(entry["text"])
+        self.assertEqual(entry["etag"], '"v1"')
+        self.assertEqual(entry["last_modified"], "Mon, 01 Jan 2024 00:00:00 GMT")
+        self.assertEqual(entry["final_url"], "https://example.com/a/")
+        self.assertIsNone(self.cache.get("https://example.com/b"))
+
+    def test_is_fresh(self):
+        """TTL内的条目无需重新验证"""
+        self.cache.put("https://example.com/a", HTML)
+        self.cache.put("https://example.com/b", HTML, fetched_at=time.time() - 2 * 3600)
+
+        self.assertTrue(self.cache.is_fresh(self.cache.get("https://example.com/a")))
+        self.assertFalse(self.cache.is_fresh(self.cache.get("https://example.com/b")))
+        self.assertFalse(self.cache.is_fresh(None))
+
+    def test_touch_after_not_modified(self):
+        """304后刷新抓取时间，条目重新变为新鲜"""
+        self.cache.put("https://example.com/a", HTML, etag='"v1"', fetched_at=time.time() - 2 * 3600)
+        self.cache.touch("https://example.com/a")
+
+        entry = self.cache.get("https://example.com/a")
+        self.assertTrue(self.cache.is_fresh(entry))
+        self.assertEqual(entry["etag"], '"v1"')
+        self.assertEqual(entry["html"], HTML)
+
+    def test_store_text(self):
+        """提取的文本写回缓存，保留原有的验证信息和抓取时间"""
+        fetched_at = time.time() - 600
+        self.cache.put("https://example.com/a", HTML, etag='"v1"', fetched_at=fetched_at)
+        self.cache.store_text("https://example.com/a", HTML, "正文内容")
+
+        entry = self.cache.get("https://example.com/a")
+        self.assertEqual(entry["text"], "正文内容")
+        self.assertEqual(entry["etag"], '"v1"')
+        self.assertEqual(entry["fetched_at"], fetched_at)
+
+        # 没有缓存条目时直接新建
+        self.cache.store_text("https://example.com/b", HTML, "正文内容")
+        self.assertEqual(self.cache.get("https://example.com/b")["text"], "正文内容")
+
+    def test_identical_pages_share_body(self):
+        """相同的页面只保存一份，文件名为HTML的SHA-256"""
+        self.cache.put("https://example.com/a", HTML)
+        self.cache.put("https://example.org/mirror", HTML)
+
+        body_hash = hashlib.sha256(HTML.encode('utf-8')).hexdigest()
+        self.assertEqual(self._body_files(), [f"{body_hash}.json.gz"])
+        self.assertEqual(self.cache.get("https://example.org/mirror")["html"], HTML)
+
+    def test_prune_by_age(self):
+        """清理超过最长保存时间的条目和不再被引用的正文"""
+        self.cache.put("https://example.com/old", _random_html(), fetched_at=time.time() - 2 * 86400)
+        self.cache.put("https://example.com/new", HTML)
+
+        self.cache.prune()
+
+        self.assertIsNone(self.cache.get("https://example.com/old"))
+        self.assertEqual(self.cache.get("https://example.com/new")["html"], HTML)
+        self.assertEqual(len(self._body_files()), 1)
+
+    def test_prune_by_size(self):
+        """超过大小上限时从最旧的条目开始清理"""
+        self.cache.max_size_bytes = 20 * 1024
+        now = time.time()
+        for index in range(3):
+            self.cache.put(f"https://example.com/{index}", _random_html(), fetched_at=now - (3 - index) * 60)
+
+        self.cache.prune()
+
+        self.assertIsNone(self.cache.get("https://example.com/0"))
+        self.assertIsNotNone(self.cache.get("https://example.com/1"))
+        self.assertIsNotNone(self.cache.get("https://example.com/2"))
+        total_size = sum(os.path.getsize(os.path.join(self.cache.body_dir, f)) for f in self._body_files())
+        self.assertLessEqual(total_size, self.cache.max_size_bytes)
+
+    def test_prune_keeps_shared_body(self):
+        """正文仍被其他条目引用时，清理旧条目不删除正文"""
+        self.cache.put("https://example.com/old", HTML, fetched_at=time.time() - 2 * 86400)
+        self.cache.put("https://example.com/new", HTML)
+
+        self.cache.prune()
+
+        self.assertEqual(self.cache.get("https://example.com/new")["html"], HTML)
+        with open(self.cache._index_path("https://example.com/new"), 'r', encoding='utf-8') as f:
+            self.assertIn(json.load(f)["body_hash"], self._body_files()[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
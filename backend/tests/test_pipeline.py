@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试处理流水线（抓取、提取、摘要各阶段，批量摘要调度，运行截止时间和失败重试）
+网页抓取和内容模型均使用模拟对象，不访问网络
+"""
+
+import os
+import sys
+import asyncio
+import unittest
+from datetime import datetime
+from unittest.mock import patch, AsyncMock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processor import pipeline
+from processor.pipeline import (
+    new_item_state, fetch_stage, extract_stage, summarize_stage, summarize_batch_stage,
+    _run_batch_summarize_stage, run_pipeline, retry_failed_items, needs_retry, _STOP
+)
+from utils.run_budget import RunBudget
+
+# 足够长，不会被当作短文本直接作为摘要
+CONTENT = "这是从网页抓取的正文内容，介绍了新模型的训练方法和评测结果。" * 8
+AI_RESULT = {"summary": "AI摘要", "is_tech": True}
+
+
+def _item(index=0, **fields):
+    item = {"title": f"测试新闻{index}", "url": f"https://example.com/news/{index}", "source": "36kr",
+            "timestamp": 1700000000000}
+    item.update(fields)
+    return item
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+class PipelineTestCase(unittest.TestCase):
+    """每个测试使用独立的运行预算（不限时）"""
+
+    def setUp(self):
+        self.budget = RunBudget(deadline_minutes=0)
+        patcher = patch('processor.pipeline.run_budget', self.budget)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+@patch('processor.pipeline.fetch_webpage_html')
+class TestFetchStage(PipelineTestCase):
+    """测试 fetch_stage"""
+
+    def test_fetch_when_content_missing(self, mock_fetch):
+        """没有预提取内容时抓取网页"""
+        mock_fetch.return_value = ("<html>页面</html>", "缓存正文")
+        state = fetch_stage(new_item_state(_item(), fetch_options={"timeout": 45}))
+
+        mock_fetch.assert_called_once_with("https://example.com/news/0", timeout=45)
+        self.assertEqual(state["html_content"], "<html>页面</html>")
+        self.assertEqual(state["cached_text"], "缓存正文")
+
+    def test_skip_with_existing_content_or_twitter(self, mock_fetch):
+        """已有预提取内容或来源为Twitter时不抓取"""
+        fetch_stage(new_item_state(_item(content=CONTENT)))
+        fetch_stage(new_item_state(_item(source="Twitter-OpenAI")))
+        mock_fetch.assert_not_called()
+
+    def test_skip_near_deadline(self, mock_fetch):
+        """接近截止时间时不再启动新的抓取，并记录降级"""
+        self.budget.can_fetch = lambda: False
+        state = fetch_stage(new_item_state(_item()))
+
+        mock_fetch.assert_not_called()
+        self.assertIsNone(state["html_content"])
+        self.assertEqual(self.budget.degraded, {"fetch_skipped": 1})
+
+    def test_fetch_error(self, mock_fetch):
+        """抓取异常不中断流水线"""
+        mock_fetch.side_effect = RuntimeError("timeout")
+        state = fetch_stage(new_item_state(_item()))
+        self.assertIsNone(state["html_content"])
+
+
+class TestExtractStage(PipelineTestCase):
+    """测试 extract_stage"""
+
+    @patch('processor.pipeline.extract_publish_time_from_html')
+    @patch('processor.pipeline.extract_webpage_text')
+    def test_extract_text_and_time(self, mock_extract_text, mock_extract_time):
+        """从HTML提取正文和缺失的发布时间，之后释放HTML"""
+        mock_extract_text.return_value = CONTENT
+        mock_extract_time.return_value = datetime(2025, 5, 10, 8, 0, 0)
+        state = new_item_state(_item(timestamp=None))
+        state["html_content"] = "<html>页面</html>"
+
+        state = extract_stage(state)
+
+        self.assertEqual(state["content"], CONTENT)
+        self.assertEqual(state["item"]["extracted_time"], "2025-05-10T08:00:00")
+        self.assertEqual(state["item"]["timestamp"], int(datetime(2025, 5, 10, 8, 0, 0).timestamp() * 1000))
+        self.assertIsNone(state["html_content"])
+
+    @patch('processor.pipeline.extract_webpage_text')
+    def test_cached_text_is_used(self, mock_extract_text):
+        """页面缓存中已有正文时不再提取"""
+        state = new_item_state(_item())
+        state["html_content"], state["cached_text"] = "<html>页面</html>", CONTENT
+
+        state = extract_stage(state)
+
+        mock_extract_text.assert_not_called()
+        self.assertEqual(state["content"], CONTENT)
+
+
+@patch('processor.pipeline.summarize_with_content_model_async', new_callable=AsyncMock)
+class TestSummarizeStage(PipelineTestCase):
+    """测试 summarize_stage"""
+
+    def test_ai_summary(self, mock_summarize):
+        """内容模型生成摘要"""
+        mock_summarize.return_value = AI_RESULT
+        state = _run(summarize_stage(new_item_state(_item(content=CONTENT)), "test_key"))
+
+        self.assertEqual(state["result"]["summary"], "AI摘要")
+        self.assertEqual(state["result"]["summary_source"], "AI生成")
+        self.assertEqual(mock_summarize.call_args.kwargs["source"], "36kr")
+
+    def test_model_failure_falls_back(self, mock_summarize):
+        """内容模型失败时使用抽取的关键句"""
+        mock_summarize.side_effect = RuntimeError("overloaded")
+        state = _run(summarize_stage(new_item_state(_item(content=CONTENT)), "test_key"))
+
+        self.assertEqual(state["result"]["summary_source"], "内容截断(AI失败)")
+        self.assertTrue(state["result"]["summary"])
+
+    def test_no_content(self, mock_summarize):
+        """没有内容时不调用内容模型"""
+        state = _run(summarize_stage(new_item_state(_item()), "test_key"))
+
+        mock_summarize.assert_not_called()
+        self.assertEqual(state["result"]["summary_source"], "无内容")
+
+    def test_deadline_degrades(self, mock_summarize):
+        """到达截止时间后不调用内容模型，使用来源描述作为降级摘要"""
+        self.budget.can_summarize = lambda: False
+        state = _run(summarize_stage(new_item_state(_item(content=CONTENT, desc="来源描述")), "test_key"))
+
+        mock_summarize.assert_not_called()
+        self.assertEqual(state["result"]["summary"], "来源描述")
+        self.assertEqual(state["result"]["summary_source"], "超时降级")
+        self.assertEqual(self.budget.degraded, {"summary_skipped": 1})
+
+
+@patch('processor.pipeline.summarize_batch_with_content_model', new_callable=AsyncMock)
+class TestSummarizeBatchStage(PipelineTestCase):
+    """测试 summarize_batch_stage"""
+
+    def test_results_by_index(self, mock_batch):
+        """按条目序号取回批量结果，缺失的条目使用备选摘要"""
+        mock_batch.return_value = {"0": AI_RESULT}
+        states = [new_item_state(_item(i, content=CONTENT), index=i) for i in range(2)]
+
+        _run(summarize_batch_stage(states, "test_key"))
+
+        articles = mock_batch.call_args.args[0]
+        self.assertEqual([a["id"] for a in articles], ["0", "1"])
+        self.assertEqual(articles[0]["source"], "36kr")
+        self.assertEqual(states[0]["result"]["summary_source"], "AI生成")
+        self.assertEqual(states[1]["result"]["summary_source"], "内容截断(AI失败)")
+
+    def test_batch_failure(self, mock_batch):
+        """整批失败时每条都使用备选摘要"""
+        mock_batch.side_effect = RuntimeError("overloaded")
+        states = [new_item_state(_item(i, content=CONTENT), index=i) for i in range(2)]
+
+        _run(summarize_batch_stage(states, "test_key"))
+
+        self.assertEqual([s["result"]["summary_source"] for s in states], ["内容截断(AI失败)"] * 2)
+
+
+class TestBatchDispatcher(PipelineTestCase):
+    """测试 _run_batch_summarize_stage 的批次划分"""
+
+    def _dispatch(self, states, max_items=3):
+        calls = []
+
+        async def summarize(state):
+            calls.append(("single", [state["index"]]))
+
+        async def summarize_batch(batch):
+            calls.append(("batch", [state["index"] for state in batch]))
+
+        async def run():
+            in_queue, out_queue = asyncio.Queue(), asyncio.Queue()
+            for state in states:
+                in_queue.put_nowait(state)
+            in_queue.put_nowait(_STOP)
+            with patch('processor.pipeline.CONTENT_BATCH_MAX_ITEMS', max_items):
+                await _run_batch_summarize_stage(summarize, summarize_batch, 2, in_queue, out_queue)
+            done = []
+            while True:
+                state = out_queue.get_nowait()
+                if state is _STOP:
+                    return done
+                done.append(state["index"])
+
+        return calls, _run(run())
+
+    def test_short_items_batched_long_items_single(self):
+        """短内容按条数上限成批，长内容单独请求，每个条目都只输出一次"""
+        long_content = "长文内容，介绍了很多细节。" * 400
+        states = [new_item_state(_item(i, content=long_content if i == 2 else CONTENT), index=i) for i in range(6)]
+
+        calls, done = self._dispatch(states)
+
+        self.assertIn(("single", [2]), calls)
+        self.assertIn(("batch", [0, 1, 3]), calls)
+        self.assertIn(("batch", [4, 5]), calls)
+        self.assertEqual(sorted(done), list(range(6)))
+
+
+class TestRunPipeline(unittest.TestCase):
+    """测试 run_pipeline 和 retry_failed_items"""
+
+    @patch('processor.pipeline.CONTENT_BATCH_ENABLED', False)
+    @patch('processor.pipeline.summarize_with_content_model_async', new_callable=AsyncMock)
+    @patch('processor.pipeline.fetch_webpage_html')
+    def test_results_in_input_order(self, mock_fetch, mock_summarize):
+        """所有阶段完成后按输入顺序返回结果，并按完成顺序回调"""
+        mock_summarize.return_value = AI_RESULT
+        items = [_item(i, content=CONTENT) for i in range(5)]
+        completed = []
+
+        with patch('processor.pipeline.run_budget', RunBudget(deadline_minutes=0)):
+            results = _run(run_pipeline(items, "test_key", on_result=lambda index, result: completed.append(index)))
+
+        self.assertEqual([r["title"] for r in results], [item["title"] for item in items])
+        self.assertEqual(sorted(completed), list(range(5)))
+        mock_fetch.assert_not_called()
+
+    @patch('processor.pipeline.CONTENT_BATCH_ENABLED', False)
+    @patch('processor.pipeline.summarize_with_content_model_async', new_callable=AsyncMock)
+    def test_deadline_cancels_unfinished_items(self, mock_summarize):
+        """到达截止时间时停止等待挂起的请求，未完成的条目使用降级结果"""
+        async def hang(*args, **kwargs):
+            await asyncio.sleep(60)
+
+        mock_summarize.side_effect = hang
+        items = [_item(i, content=CONTENT, desc=f"描述{i}") for i in range(3)]
+        # 截止时间0.6秒，不预留汇总时间
+        budget = RunBudget(deadline_minutes=0.01, reserve_minutes=0, fetch_margin_minutes=0)
+
+        with patch('processor.pipeline.run_budget', budget):
+            results = _run(asyncio.wait_for(run_pipeline(items, "test_key"), timeout=10))
+
+        self.assertEqual([r["summary_source"] for r in results], ["超时降级"] * 3)
+        self.assertEqual([r["summary"] for r in results], ["描述0", "描述1", "描述2"])
+        self.assertEqual(budget.degraded, {"unfinished": 3})
+
+    @patch('processor.pipeline.summarize_with_content_model_async', new_callable=AsyncMock)
+    @patch('processor.pipeline.fetch_webpage_html')
+    def test_retry_failed_items(self, mock_fetch, mock_summarize):
+        """重试使用更长的抓取超时，结果更好时才回调"""
+        mock_fetch.return_value = ("<html>页面</html>", CONTENT)
+        async def summarize(content, api_key, title="", **kwargs):
+            if title == "测试新闻1":
+                raise RuntimeError("overloaded")
+            return AI_RESULT
+
+        mock_summarize.side_effect = summarize
+        items = [_item(0), _item(1)]
+        first_results = [{"summary_source": "无内容"}, {"summary_source": "内容截断(AI失败)"}]
+        improved = []
+
+        with patch('processor.pipeline.run_budget', RunBudget(deadline_minutes=0)):
+            count = _run(retry_failed_items(items, first_results, "test_key",
+                                            on_result=lambda index, result: improved.append((index, result))))
+
+        self.assertEqual(count, 1)
+        self.assertEqual([index for index, _ in improved], [0])
+        self.assertEqual(improved[0][1]["summary_source"], "AI生成")
+        self.assertEqual(mock_fetch.call_args.kwargs["timeout"], pipeline.RETRY_FETCH_TIMEOUT)
+
+    def test_retry_skipped_without_budget(self):
+        """时间或token预算不足时不重试"""
+        budget = RunBudget(deadline_minutes=0)
+        budget.can_retry = lambda: False
+
+        with patch('processor.pipeline.run_budget', budget):
+            self.assertEqual(_run(retry_failed_items([_item()], [{"summary_source": "无内容"}], "test_key")), 0)
+
+    def test_needs_retry(self):
+        """只重试抓取或内容模型失败的条目，Twitter条目不重新抓取"""
+        self.assertTrue(needs_retry({"summary_source": "内容截断(AI失败)"}))
+        self.assertTrue(needs_retry({"summary_source": "无内容", "url": "https://example.com", "source": "36kr"}))
+        self.assertFalse(needs_retry({"summary_source": "无内容", "url": "https://x.com/1", "source": "Twitter-A"}))
+        self.assertFalse(needs_retry({"summary_source": "AI生成"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试处理优先级评分
+"""
+
+import os
+import sys
+import time
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processor.priority import parse_hot_value, score_groups, prioritize_groups
+
+
+class TestPriority(unittest.TestCase):
+    """测试 parse_hot_value 和 prioritize_groups"""
+
+    def setUp(self):
+        self.now = time.time()
+
+    def _item(self, title, source, hot="", hours_ago=None):
+        item = {"title": title, "source": source, "hot": hot}
+        if hours_ago is not None:
+            item["timestamp"] = int((self.now - hours_ago * 3600) * 1000)
+        return item
+
+    def test_parse_hot_value(self):
+        """解析数字、带单位和缺失的热度值"""
+        self.assertEqual(parse_hot_value(2412), 2412)
+        self.assertEqual(parse_hot_value("1.2万"), 12000)
+        self.assertEqual(parse_hot_value("3k"), 3000)
+        self.assertEqual(parse_hot_value("123 热度"), 123)
+        self.assertIsNone(parse_hot_value(""))
+        self.assertIsNone(parse_hot_value(None))
+
+    def test_hot_rank_within_source(self):
+        """热度只在同一来源内比较"""
+        groups = {
+            "a": [self._item("a", "juejin", 100)],
+            "b": [self._item("b", "juejin", 2000)],
+            "c": [self._item("c", "v2ex", 50)],
+            "d": [self._item("d", "v2ex", 10)],
+        }
+        scores = score_groups(groups, now=self.now)
+        self.assertGreater(scores["b"], scores["a"])
+        self.assertAlmostEqual(scores["b"], scores["c"])
+
+    def test_priority_order(self):
+        """公众号、新发布、多来源报道的条目优先"""
+        groups = {
+            "old": [self._item("old", "少数派", hours_ago=40)],
+            "wechat": [self._item("wechat", "公众号精选", hours_ago=1)],
+            "cluster": [self._item("cluster", "36氪", hours_ago=40), self._item("cluster", "极客公园"),
+                        self._item("cluster", "Solidot")],
+        }
+        ordered = [group[0]["title"] for group in prioritize_groups(groups, now=self.now)]
+        self.assertEqual(ordered[0], "wechat")
+        self.assertEqual(ordered[-1], "old")
+
+    def test_stable_for_equal_scores(self):
+        """分数相同时保持原顺序"""
+        groups = {str(i): [self._item(str(i), "RSS")] for i in range(5)}
+        ordered = [group[0]["title"] for group in prioritize_groups(groups, now=self.now)]
+        self.assertEqual(ordered, ["0", "1", "2", "3", "4"])
+
+
+if __name__ == "__main__":
+    unittest.main()
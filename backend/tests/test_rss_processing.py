@@ -11,7 +11,7 @@ import json
 import asyncio
 import logging
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -33,7 +33,8 @@ logging.basicConfig(
 # 导入被测试的模块
 from processor.news_processor import process_hotspot_with_summary
 from crawler.web_crawler import fetch_webpage_content, extract_publish_time_from_html
-from llm_integration.content_integration import summarize_with_content_model
+from llm_integration.content_integration import summarize_with_content_model, SUMMARY_PROMPT_VERSION
+from config.config import CONTENT_MODEL_ID
 
 
 class TestRSSProcessing(unittest.TestCase):
@@ -57,7 +58,7 @@ class TestRSSProcessing(unittest.TestCase):
                 "title": "测试RSS标题2 - 已有摘要无内容",
                 "url": "https://example.com/rss2",
                 "source": "公众号-另一位作者",
-                "desc": "这是另一篇测试文章的摘要，但没有完整内容。",
+                "desc": "这是另一篇测试文章的摘要，由RSS源提供，介绍了文章的主要内容和观点，但没有完整的正文内容。",
                 "published": "2025-03-12 11:00:00"
             },
             # 无摘要无内容的RSS条目
@@ -94,65 +95,61 @@ class TestRSSProcessing(unittest.TestCase):
         # 测试用的API密钥
         self.test_api_key = "test_content_model_api_key"
     
-    @patch('processor.news_processor.fetch_webpage_content')
-    @patch('processor.news_processor.extract_publish_time_from_html')
-    @patch('processor.news_processor.summarize_with_content_model')
-    @patch('processor.news_processor.os.path.exists')
-    @patch('processor.news_processor.open')
-    async def test_process_hotspot_with_summary(self, mock_open, mock_exists, mock_summarize, mock_extract_time, mock_fetch):
+    @patch('processor.news_processor.content_client', new_callable=AsyncMock)
+    @patch('processor.news_processor.item_store')
+    @patch('processor.news_processor.append_jsonl')
+    @patch('processor.pipeline.CONTENT_BATCH_ENABLED', False)
+    @patch('processor.pipeline.fetch_webpage_html')
+    @patch('processor.pipeline.extract_publish_time_from_html')
+    @patch('processor.pipeline.summarize_with_content_model_async', new_callable=AsyncMock)
+    def test_process_hotspot_with_summary(self, mock_summarize, mock_extract_time, mock_fetch, mock_append,
+                                          mock_item_store, mock_content_client):
         """测试process_hotspot_with_summary函数"""
         # 设置模拟函数的返回值
-        mock_fetch.return_value = (self.mock_webpage_content, self.mock_html_content)
+        mock_fetch.return_value = (self.mock_html_content, self.mock_webpage_content)
         mock_extract_time.return_value = datetime.strptime("2025-03-12 14:00:00", "%Y-%m-%d %H:%M:%S")
         mock_summarize.return_value = self.mock_summary_result
-        mock_exists.return_value = False  # 假设merged文件不存在，避免文件操作
+        # 生成摘要后原始条目的content会被释放
+        existing_content = self.test_rss_items[0]['content']
         
         # 调用被测试的函数
-        result = await process_hotspot_with_summary(
+        result = asyncio.run(process_hotspot_with_summary(
             self.test_rss_items,
             self.test_api_key,
             max_workers=2,
             tech_only=False,
             use_cache=False
-        )
+        ))
         
         # 验证结果
         self.assertEqual(len(result), len(self.test_rss_items))
+        for item, processed in zip(self.test_rss_items, result):
+            self.assertEqual(processed['title'], item['title'])
+            self.assertTrue(processed['is_processed'])
         
-        # 检查第一个条目 - 已有内容和摘要
-        self.assertEqual(result[0]['title'], self.test_rss_items[0]['title'])
-        self.assertEqual(result[0]['summary'], self.test_rss_items[0]['desc'])
-        self.assertEqual(result[0]['content'], self.test_rss_items[0]['content'])
-        self.assertTrue(result[0]['is_tech'])  # 已有摘要的条目默认设为科技相关
-        self.assertTrue(result[0]['is_processed'])
+        # 检查第一个条目 - 已有的短内容直接作为摘要
+        self.assertEqual(result[0]['summary'], existing_content)
+        self.assertEqual(result[0]['summary_source'], "原文")
         
-        # 检查第二个条目 - 已有摘要无内容
-        self.assertEqual(result[1]['title'], self.test_rss_items[1]['title'])
+        # 检查第二个条目 - 已有摘要无内容，复用RSS摘要
         self.assertEqual(result[1]['summary'], self.test_rss_items[1]['desc'])
-        self.assertEqual(result[1]['content'], self.mock_webpage_content)  # 应该爬取了内容
-        self.assertTrue(result[1]['is_tech'])
-        self.assertTrue(result[1]['is_processed'])
-        
-        # 检查第三个条目 - 无摘要无内容
-        self.assertEqual(result[2]['title'], self.test_rss_items[2]['title'])
-        self.assertEqual(result[2]['summary'], self.mock_summary_result['summary'])  # 应该生成了摘要
-        self.assertEqual(result[2]['content'], self.mock_webpage_content)  # 应该爬取了内容
-        self.assertTrue(result[2]['is_tech'])
-        self.assertTrue(result[2]['is_processed'])
-        
-        # 检查第四个条目 - 有时间戳
-        self.assertEqual(result[3]['title'], self.test_rss_items[3]['title'])
-        self.assertEqual(result[3]['summary'], self.mock_summary_result['summary'])  # 应该生成了摘要
-        self.assertEqual(result[3]['content'], self.mock_webpage_content)  # 应该爬取了内容
-        self.assertTrue(result[3]['is_tech'])
-        self.assertTrue(result[3]['is_processed'])
+        self.assertEqual(result[1]['summary_source'], "来源摘要")
+        self.assertEqual(result[1]['extracted_time'], "2025-03-12T14:00:00")  # 为时间戳爬取了网页
+        
+        # 检查第三个和第四个条目 - 爬取内容后生成摘要
+        for processed in result[2:]:
+            self.assertEqual(processed['summary'], self.mock_summary_result['summary'])
+            self.assertEqual(processed['summary_source'], "AI生成")
+            self.assertTrue(processed['is_tech'])
         
         # 验证函数调用
-        # 第一个条目不应该调用fetch_webpage_content和summarize_with_content_model
-        # 第二个条目应该调用fetch_webpage_content但不调用summarize_with_content_model
-        # 第三个和第四个条目应该都调用fetch_webpage_content和summarize_with_content_model
-        self.assertEqual(mock_fetch.call_count, 3)  # 应该被调用3次（第2、3、4个条目）
-        self.assertEqual(mock_summarize.call_count, 2)  # 应该被调用2次（第3、4个条目）
+        # 第一个条目不应该爬取网页和调用内容模型
+        # 第二个条目缺少时间戳，应该爬取网页但不调用内容模型
+        # 第三个和第四个条目应该爬取网页并调用内容模型
+        self.assertEqual(mock_fetch.call_count, 3)
+        self.assertEqual(mock_summarize.call_count, 2)
+        summarized_content = mock_summarize.call_args.args[0]
+        self.assertEqual(summarized_content, self.mock_webpage_content)
         
     @patch('crawler.web_crawler.requests.get')
     def test_fetch_webpage_content_with_existing_content(self, mock_get):
@@ -172,16 +169,12 @@ class TestRSSProcessing(unittest.TestCase):
         # 验证requests.get没有被调用
         mock_get.assert_not_called()
     
-    @patch('llm_integration.content_integration.load_summary_cache')
-    @patch('llm_integration.content_integration.save_summary_cache')
-    @patch('llm_integration.content_integration.ChatOpenAI')
-    def test_summarize_with_cache(self, mock_chat_openai, mock_save_cache, mock_load_cache):
+    @patch('llm_integration.content_integration.summary_store')
+    @patch('llm_integration.content_integration.content_client', new_callable=AsyncMock)
+    def test_summarize_with_cache(self, mock_content_client, mock_summary_store):
         """测试summarize_with_content_model函数的缓存机制"""
         # 设置模拟缓存
-        mock_cache = {
-            "test_hash": self.mock_summary_result
-        }
-        mock_load_cache.return_value = mock_cache
+        mock_summary_store.get.return_value = self.mock_summary_result
         
         # 模拟get_content_hash函数
         with patch('llm_integration.content_integration.get_content_hash', return_value="test_hash"):
@@ -195,14 +188,14 @@ class TestRSSProcessing(unittest.TestCase):
         # 验证结果
         self.assertEqual(result, self.mock_summary_result)
         
-        # 验证ChatOpenAI没有被调用（应该从缓存获取）
-        mock_chat_openai.assert_not_called()
+        # 验证没有请求内容处理模型（应该从缓存获取）
+        mock_content_client.complete.assert_not_called()
         
-        # 验证缓存加载被调用
-        mock_load_cache.assert_called_once()
+        # 验证缓存按内容哈希、模型和提示词版本查询
+        mock_summary_store.get.assert_called_once_with("test_hash", CONTENT_MODEL_ID, SUMMARY_PROMPT_VERSION)
         
         # 验证缓存保存没有被调用（因为使用了缓存）
-        mock_save_cache.assert_not_called()
+        mock_summary_store.put.assert_not_called()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试单次运行的时间预算（截止前预留汇总时间、停止抓取和摘要）和超时降级
+"""
+
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import DIGEST_MODEL_TIMEOUT, DIGEST_MAX_RETRIES, RUN_DEADLINE_RESERVE_MINUTES_DEFAULT
+from utils.run_budget import RunBudget
+from processor.pipeline import degraded_summary, degraded_result
+
+CONTENT = "新模型在多项评测中取得了领先成绩，推理速度比上一代提升一倍。" * 10
+
+
+class TestRunBudget(unittest.TestCase):
+    """测试 RunBudget"""
+
+    def _budget(self, elapsed, **kwargs):
+        budget = RunBudget(**kwargs)
+        budget.started_at = 1000.0
+        patcher = patch('utils.run_budget.time.monotonic', return_value=1000.0 + elapsed)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return budget
+
+    def test_reserve_covers_digest_retries(self):
+        """默认预留时间足够Deepseek汇总的每次尝试都超时"""
+        self.assertGreaterEqual(RUN_DEADLINE_RESERVE_MINUTES_DEFAULT * 60, DIGEST_MODEL_TIMEOUT * DIGEST_MAX_RETRIES)
+
+    def test_processing_time_left(self):
+        """处理时间为截止时间减去预留时间和已用时间，未设置截止时间时不限制"""
+        budget = self._budget(600, deadline_minutes=60, reserve_minutes=30, fetch_margin_minutes=5)
+        self.assertEqual(budget.processing_time_left(), 60 * 60 - 30 * 60 - 600)
+        self.assertIsNone(self._budget(10 ** 6, deadline_minutes=0).processing_time_left())
+
+    def test_reserve_longer_than_deadline(self):
+        """预留时间不短于截止时间时最多预留一半，处理仍有时间"""
+        with self.assertLogs('utils.run_budget', level='WARNING'):
+            budget = self._budget(0, deadline_minutes=30, reserve_minutes=31, fetch_margin_minutes=5)
+        self.assertEqual(budget.reserve_seconds, 15 * 60)
+        self.assertEqual(budget.processing_time_left(), 15 * 60)
+        self.assertTrue(budget.can_fetch())
+        self.assertTrue(budget.can_summarize())
+
+    def test_fetch_stops_before_summarize(self):
+        """抓取在处理结束前提前停止，摘要到处理结束为止"""
+        kwargs = dict(deadline_minutes=60, reserve_minutes=30, fetch_margin_minutes=5)
+        budget = self._budget(20 * 60, **kwargs)
+        self.assertTrue(budget.can_fetch())
+        self.assertTrue(budget.can_summarize())
+
+        budget = self._budget(27 * 60, **kwargs)
+        self.assertFalse(budget.can_fetch())
+        self.assertTrue(budget.can_summarize())
+
+        budget = self._budget(31 * 60, **kwargs)
+        self.assertLess(budget.processing_time_left(), 0)
+        self.assertFalse(budget.can_summarize())
+
+    @patch('utils.run_budget.token_tracker')
+    def test_retry_stops_at_token_budget(self, mock_tracker):
+        """token用完后不再重试"""
+        mock_tracker.get_usage.return_value = {"qwen": {"total_tokens": 800}, "deepseek": {"total_tokens": 300}}
+        self.assertFalse(self._budget(0, deadline_minutes=0, token_budget=1000).can_retry())
+        self.assertTrue(self._budget(0, deadline_minutes=0, token_budget=2000).can_retry())
+
+
+class TestDegradedSummary(unittest.TestCase):
+    """测试超时降级的摘要"""
+
+    def test_desc_first(self):
+        """有来源描述时使用描述，过长的描述被截断"""
+        self.assertEqual(degraded_summary({"desc": "<p>来源描述</p>"}, CONTENT), ("来源描述", "超时降级"))
+        summary, summary_source = degraded_summary({"desc": "描述" * 100}, "")
+        self.assertEqual(summary, "描述" * 75 + "...")
+        self.assertEqual(summary_source, "超时降级")
+
+    def test_content_without_desc(self):
+        """没有描述时从内容中截取"""
+        summary, summary_source = degraded_summary({"title": "新模型"}, CONTENT)
+        self.assertTrue(summary)
+        self.assertLessEqual(len(summary), 153)
+        self.assertEqual(summary_source, "超时降级")
+
+    def test_no_content(self):
+        """没有描述也没有内容时标记为无内容，下次运行重新处理"""
+        result = degraded_result({"title": "新模型", "content": "短"})
+        self.assertEqual(result["summary_source"], "无内容")
+        self.assertTrue(result["is_processed"])
+        self.assertFalse(result["is_tech"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试运行检查点和 --resume（恢复中断运行的条目、不重复处理、不重复发送汇总）
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch, AsyncMock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.run_manifest import RunManifest
+from utils.utils import append_jsonl, get_sidecar_path, get_record_key
+from processor.news_processor import process_hotspot_with_summary
+from wisecrawl_main import send_digest
+
+ITEMS = [
+    {"item_id": "a", "title": "新模型发布", "url": "https://example.com/a", "source": "36kr", "saved_at": "2025-05-10T08:00:00"},
+    {"item_id": "b", "title": "芯片新品", "url": "https://example.com/b", "source": "ithome", "saved_at": "2025-05-10T08:00:00"},
+]
+
+
+def _processed(item):
+    return {**item, "summary": f"{item['title']}的摘要", "summary_source": "AI生成", "is_tech": True, "is_processed": True}
+
+
+class TestRunManifest(unittest.TestCase):
+    """测试 RunManifest"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.merged_file_path = os.path.join(self.tmp_dir, "hotspots_2025-05-10_08-00-00.jsonl")
+        append_jsonl(self.merged_file_path, ITEMS)
+        self.manifest = RunManifest(path=os.path.join(self.tmp_dir, "run_manifest.json"))
+
+    def _reloaded(self):
+        manifest = RunManifest(path=self.manifest.path)
+        manifest.load()
+        return manifest
+
+    def test_is_resumable(self):
+        """只有在采集结果保存之后中断的运行可以恢复"""
+        self.assertFalse(self.manifest.load())
+
+        self.manifest.start()
+        self.assertFalse(self._reloaded().is_resumable())
+
+        self.manifest.complete_stage("collected", merged_file_path=self.merged_file_path, items=2)
+        self.assertTrue(self._reloaded().is_resumable())
+        self.manifest.complete_stage("processed", items=2)
+        self.manifest.complete_stage("notified")
+        self.assertTrue(self._reloaded().is_resumable())
+
+        self.manifest.finish()
+        self.assertFalse(self._reloaded().is_resumable())
+
+    def test_missing_snapshot_not_resumable(self):
+        """采集结果文件已被清理时不能恢复"""
+        self.manifest.start()
+        self.manifest.complete_stage("collected", merged_file_path=os.path.join(self.tmp_dir, "missing.jsonl"))
+        self.assertFalse(self._reloaded().is_resumable())
+
+    def test_load_collected_items(self):
+        """返回采集结果和侧车文件中已处理的记录"""
+        append_jsonl(get_sidecar_path(self.merged_file_path), [_processed(ITEMS[0])])
+        self.manifest.start()
+        self.manifest.complete_stage("collected", merged_file_path=self.merged_file_path, items=2)
+
+        items, completed_records = self._reloaded().load_collected_items()
+
+        self.assertEqual([item["title"] for item in items], ["新模型发布", "芯片新品"])
+        self.assertNotIn("saved_at", items[0])
+        self.assertEqual([record["summary"] for record in completed_records], ["新模型发布的摘要"])
+
+
+@patch('processor.news_processor.content_client', new_callable=AsyncMock)
+@patch('processor.news_processor.item_store')
+@patch('processor.news_processor.append_jsonl')
+@patch('processor.news_processor.RETRY_FAILED_ITEMS', False)
+@patch('processor.news_processor.run_pipeline')
+class TestResumeProcessing(unittest.TestCase):
+    """测试恢复运行时跳过已处理的条目"""
+
+    def test_completed_records_are_skipped(self, mock_run_pipeline, mock_append, mock_item_store, mock_content_client):
+        """侧车文件中已有记录的条目不再处理，其余条目正常处理"""
+        async def run_pipeline(items, api_key, on_result=None, **kwargs):
+            results = [_processed(item) for item in items]
+            for index, result in enumerate(results):
+                on_result(index, result)
+            return results
+        mock_run_pipeline.side_effect = run_pipeline
+        items = [dict(item) for item in ITEMS]
+        completed_records = [_processed(ITEMS[0])]
+        self.assertEqual(get_record_key(completed_records[0]), get_record_key(items[0]))
+
+        results = asyncio.run(process_hotspot_with_summary(
+            items, "test_key", use_cache=False, merged_file_path=os.path.join(tempfile.mkdtemp(), "hotspots.jsonl"),
+            completed_records=completed_records
+        ))
+
+        self.assertEqual([item["title"] for item in mock_run_pipeline.call_args.args[0]], ["芯片新品"])
+        self.assertEqual([r["summary"] for r in results], ["新模型发布的摘要", "芯片新品的摘要"])
+        # 只有新处理的条目追加到侧车文件
+        self.assertEqual([r["item_id"] for r in mock_append.call_args.args[1]], ["b"])
+
+
+@patch('wisecrawl_main.send_to_webhook')
+@patch('wisecrawl_main.notify')
+@patch('wisecrawl_main.summarize_with_deepseek')
+class TestResumeDigest(unittest.TestCase):
+    """测试恢复运行时不重复发送汇总"""
+
+    def setUp(self):
+        self.manifest = RunManifest(path=os.path.join(tempfile.mkdtemp(), "run_manifest.json"))
+        self.manifest.start()
+
+    def test_digest_sent_once(self, mock_summarize, mock_notify, mock_send_to_webhook):
+        """发送后记录notified阶段，恢复的运行不再发送"""
+        mock_summarize.return_value = "汇总"
+        mock_notify.return_value = True
+
+        send_digest(self.manifest, ITEMS, "key", "url", "model", "webhook", False)
+        resumed = RunManifest(path=self.manifest.path)
+        resumed.load()
+        send_digest(resumed, ITEMS, "key", "url", "model", "webhook", False)
+
+        mock_summarize.assert_called_once()
+        mock_notify.assert_called_once_with("汇总", False)
+        mock_send_to_webhook.assert_not_called()
+        self.assertTrue(resumed.is_stage_done("notified"))
+
+    def test_webhook_fallback(self, mock_summarize, mock_notify, mock_send_to_webhook):
+        """所有通知方式失败时使用原始webhook"""
+        mock_summarize.return_value = "汇总"
+        mock_notify.return_value = False
+
+        send_digest(self.manifest, ITEMS, "key", "url", "model", "webhook", True)
+
+        mock_send_to_webhook.assert_called_once_with("webhook", "汇总", True)
+
+
+if __name__ == '__main__':
+    unittest.main()
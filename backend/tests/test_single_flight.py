@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试相同请求的合并（同时到达的调用只执行一次）
+"""
+
+import os
+import sys
+import asyncio
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.single_flight import AsyncSingleFlight
+
+
+class TestAsyncSingleFlight(unittest.TestCase):
+    """测试 AsyncSingleFlight"""
+
+    def test_concurrent_coroutines_share_one_execution(self):
+        """同时等待同一个键的协程只执行一次，不同键各自执行"""
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def work(value):
+            calls.append(value)
+            await asyncio.sleep(0.05)
+            return value * 2
+
+        async def run():
+            return await asyncio.gather(
+                flight.do("a", work, 1), flight.do("a", work, 1), flight.do("b", work, 2)
+            )
+
+        self.assertEqual(asyncio.run(run()), [2, 2, 4])
+        self.assertEqual(sorted(calls), [1, 2])
+
+    def test_claim_and_release(self):
+        """claim的领取者释放结果后，等待者收到结果，之后可以重新领取"""
+        flight = AsyncSingleFlight()
+
+        async def run():
+            future, leader = flight.claim("key")
+            waiter_future, waiter_leader = flight.claim("key")
+            self.assertTrue(leader)
+            self.assertFalse(waiter_leader)
+            self.assertIs(future, waiter_future)
+            flight.release("key", "结果")
+            self.assertEqual(await waiter_future, "结果")
+            _, leader = flight.claim("key")
+            self.assertTrue(leader)
+            flight.release("key", error=ValueError("失败"))
+
+        asyncio.run(run())
+
+    def test_error_reaches_waiters(self):
+        """执行失败时等待者收到同一个异常"""
+        flight = AsyncSingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("失败")
+
+        async def run():
+            return await asyncio.gather(flight.do("key", fail), flight.do("key", fail), return_exceptions=True)
+
+        results = asyncio.run(run())
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
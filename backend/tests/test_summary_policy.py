@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试分级摘要策略（短文本直接作为摘要、复用来源描述、其余调用内容模型）
+"""
+
+import os
+import sys
+import asyncio
+import unittest
+from unittest.mock import patch, AsyncMock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processor.summary_policy import plan_summary, is_adequate_desc, SHORT_TEXT_TIER, SOURCE_DESC_TIER
+from processor.pipeline import process_single_item
+from utils.run_budget import run_budget
+
+DESC = "OpenAI发布了新一代大语言模型，推理能力显著提升，数学和编程测试的成绩均超过上一代模型，推理成本下降一半。"
+LONG_CONTENT = "正文内容介绍了新模型的训练方法和评测结果。" * 30
+
+
+class TestSummaryPolicy(unittest.TestCase):
+    """测试 plan_summary"""
+
+    def test_short_text_is_the_summary(self):
+        """短文本（推文、快讯）去掉HTML后直接作为摘要"""
+        item = {"title": "推文", "source": "Twitter-OpenAI"}
+        content = "<p>We are releasing a new model today, with better reasoning and lower cost.</p>"
+        self.assertEqual(plan_summary(item, content),
+                         ("We are releasing a new model today, with better reasoning and lower cost.", SHORT_TEXT_TIER))
+        # 过短的文本不足以作为摘要
+        self.assertIsNone(plan_summary(item, "新模型发布"))
+
+    def test_adequate_desc_is_reused(self):
+        """长文有合适的来源描述时复用描述"""
+        item = {"title": "OpenAI发布新模型", "desc": f"<p>{DESC}</p>"}
+        self.assertEqual(plan_summary(item, LONG_CONTENT), (DESC, SOURCE_DESC_TIER))
+        self.assertIsNone(plan_summary({"title": "OpenAI发布新模型"}, LONG_CONTENT))
+
+    def test_inadequate_desc(self):
+        """过短、过长、被截断、只是原文链接或重复标题的描述不使用"""
+        self.assertTrue(is_adequate_desc(DESC, "OpenAI发布新模型"))
+        self.assertFalse(is_adequate_desc("新模型发布", ""))
+        self.assertFalse(is_adequate_desc(DESC * 4, ""))
+        self.assertFalse(is_adequate_desc(DESC[:45] + "...", ""))
+        self.assertFalse(is_adequate_desc(DESC + "点击查看原文", ""))
+        self.assertFalse(is_adequate_desc(DESC, DESC + "（图）"))
+
+    @patch('processor.summary_policy.SUMMARY_POLICY_ENABLED', False)
+    def test_policy_disabled(self):
+        """关闭策略后所有条目都调用内容模型"""
+        self.assertIsNone(plan_summary({"title": "推文"}, "We are releasing a new model today."))
+
+
+@patch('processor.pipeline.summarize_with_content_model_async', new_callable=AsyncMock)
+@patch('processor.pipeline.fetch_webpage_html')
+class TestPipelineSummaryTiers(unittest.TestCase):
+    """测试流水线按策略跳过抓取和内容模型"""
+
+    def setUp(self):
+        run_budget.start()
+
+    def test_desc_item_skips_fetch_and_model(self, mock_fetch, mock_summarize):
+        """有时间戳和合适描述的条目不抓取网页、不调用内容模型"""
+        item = {"title": "OpenAI发布新模型", "url": "https://example.com/a", "source": "36kr",
+                "desc": DESC, "timestamp": 1700000000000}
+
+        result = asyncio.run(process_single_item(item, "test_key"))
+
+        self.assertEqual(result["summary"], DESC)
+        self.assertEqual(result["summary_source"], "来源摘要")
+        mock_fetch.assert_not_called()
+        mock_summarize.assert_not_called()
+        self.assertEqual(run_budget.summary_tiers, {SOURCE_DESC_TIER: 1})
+
+    @patch('processor.pipeline.tech_classifier')
+    def test_tech_only_uncertain_item_uses_model(self, mock_classifier, mock_fetch, mock_summarize):
+        """tech_only模式下本地分类器不确定时，由内容模型判断是否科技相关"""
+        mock_classifier.classify.return_value = None
+        mock_summarize.return_value = {"summary": "AI摘要", "is_tech": False}
+        item = {"title": "OpenAI发布新模型", "url": "https://example.com/a", "source": "36kr",
+                "desc": DESC, "content": LONG_CONTENT, "timestamp": 1700000000000}
+
+        result = asyncio.run(process_single_item(item, "test_key", tech_only=True))
+
+        self.assertEqual(result["summary_source"], "AI生成")
+        self.assertFalse(result["is_tech"])
+        mock_summarize.assert_called_once()
+        self.assertEqual(run_budget.summary_tiers, {"llm": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试摘要缓存存储（版本化的键、过期、LRU淘汰和并发写入）
+"""
+
+import os
+import sys
+import time
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.summary_store import SummaryStore
+
+
+class TestSummaryStore(unittest.TestCase):
+    """测试 SummaryStore"""
+
+    def setUp(self):
+        self.store = SummaryStore(cache_dir=tempfile.mkdtemp())
+        self.result = {"summary": "摘要", "is_tech": True}
+
+    def test_key_includes_model_and_prompt_version(self):
+        """更换模型或提示词版本后不返回旧摘要"""
+        self.store.put("hash", "model-a", "1", self.result)
+        self.assertEqual(self.store.get("hash", "model-a", "1"), self.result)
+        self.assertIsNone(self.store.get("hash", "model-b", "1"))
+        self.assertIsNone(self.store.get("hash", "model-a", "2"))
+        self.assertIsNone(self.store.get(None, "model-a", "1"))
+
+    def test_expired_entries(self):
+        """过期条目不返回，并在清理时删除"""
+        self.store.put("hash", "model", "1", self.result)
+        self.store.ttl_seconds = 0
+        time.sleep(0.01)
+        self.assertIsNone(self.store.get("hash", "model", "1"))
+        self.store.prune()
+        self.store.ttl_seconds = 3600
+        self.assertIsNone(self.store.get("hash", "model", "1"))
+
+    def test_prune_evicts_least_recently_used(self):
+        """超过最大条目数时淘汰最久未使用的条目"""
+        for i in range(3):
+            self.store.put(f"hash{i}", "model", "1", self.result)
+            time.sleep(0.01)
+        # 访问最早写入的条目，使其成为最近使用
+        self.assertIsNotNone(self.store.get("hash0", "model", "1"))
+        self.store.max_entries = 2
+        self.store.prune()
+        self.assertIsNotNone(self.store.get("hash0", "model", "1"))
+        self.assertIsNone(self.store.get("hash1", "model", "1"))
+        self.assertIsNotNone(self.store.get("hash2", "model", "1"))
+
+    def test_concurrent_writes(self):
+        """多个线程同时写入时不丢失条目"""
+        def write(i):
+            self.store.put(f"hash{i}", "model", "1", {"summary": f"摘要{i}", "is_tech": False})
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(write, range(100)))
+        for i in range(100):
+            self.assertEqual(self.store.get(f"hash{i}", "model", "1")["summary"], f"摘要{i}")
+
+
+if __name__ == "__main__":
+    unittest.main()
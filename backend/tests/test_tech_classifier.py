@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试本地科技相关分类器（关键词打分、根据历史处理结果训练、tech_only模式下在抓取前过滤）
+"""
+
+import os
+import sys
+import json
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch, AsyncMock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processor.tech_classifier import TechClassifier, lexicon_hits
+from processor.pipeline import run_pipeline
+from utils.run_budget import run_budget
+
+TECH_TOPICS = ["显卡驱动更新", "云服务降价", "手机系统升级", "浏览器新版本", "编译器优化", "数据库迁移"]
+OTHER_TOPICS = ["歌手巡回演出", "球赛最终比分", "春节出行高峰", "新剧开播收视", "小吃街开业", "马拉松报名"]
+
+
+def _records(topics, is_tech, count=60):
+    return [{"item_id": f"{is_tech}-{i}", "title": f"{topics[i % len(topics)]}第{i}期", "desc": "",
+             "is_tech": is_tech, "summary_source": "AI生成"} for i in range(count)]
+
+
+class TestTechClassifier(unittest.TestCase):
+    """测试 TechClassifier"""
+
+    def setUp(self):
+        self.classifier = TechClassifier(cache_dir=tempfile.mkdtemp(), positive_threshold=0.9,
+                                         negative_threshold=0.1, enabled=True)
+
+    def test_lexicon_only(self):
+        """未训练时只用关键词，命中两个以上同类关键词才给出确定判断"""
+        self.assertEqual(lexicon_hits("OpenAI发布开源大模型，said"), (3, 0))
+        self.assertTrue(self.classifier.classify({"title": "OpenAI发布开源大模型"}))
+        self.assertFalse(self.classifier.classify({"title": "明星综艺收视率创新高", "desc": "娱乐圈"}))
+        self.assertIsNone(self.classifier.classify({"title": "某公司发布新产品"}))
+        self.assertIsNone(TechClassifier(enabled=False).classify({"title": "OpenAI发布开源大模型"}))
+
+    def test_train_and_reload(self):
+        """根据内容模型的判断训练，保存后重新加载得到相同结果"""
+        records = _records(TECH_TOPICS, True) + _records(OTHER_TOPICS, False)
+        # 不是内容模型判断的结果不作为样本
+        records.append({"title": "显卡驱动更新", "is_tech": False, "summary_source": "来源摘要"})
+
+        self.assertTrue(self.classifier.train(records))
+        self.assertGreater(self.classifier.score({"title": "显卡驱动更新"}), 0.9)
+        self.assertLess(self.classifier.score({"title": "歌手巡回演出"}), 0.1)
+
+        reloaded = TechClassifier(cache_dir=os.path.dirname(self.classifier.model_path))
+        reloaded.model_path = self.classifier.model_path
+        self.assertAlmostEqual(reloaded.score({"title": "显卡驱动更新"}),
+                               self.classifier.score({"title": "显卡驱动更新"}), places=5)
+
+    def test_not_enough_samples(self):
+        """任一类样本不足时不训练"""
+        self.assertFalse(self.classifier.train(_records(TECH_TOPICS, True)))
+        self.assertFalse(os.path.exists(self.classifier.model_path))
+
+    def test_ensure_trained_on_newer_history(self):
+        """历史处理结果比模型新时才重新训练"""
+        history_dir = tempfile.mkdtemp()
+        with open(os.path.join(history_dir, "processed_news_2025-05-10_08-00-00.json"), 'w', encoding='utf-8') as f:
+            json.dump(_records(TECH_TOPICS, True), f, ensure_ascii=False)
+
+        self.assertTrue(self.classifier.ensure_trained(history_dir, extra_records=_records(OTHER_TOPICS, False)))
+        self.assertFalse(self.classifier.ensure_trained(history_dir, extra_records=_records(OTHER_TOPICS, False)))
+        self.assertFalse(self.classifier.ensure_trained(tempfile.mkdtemp()))
+
+
+@patch('processor.pipeline.CONTENT_BATCH_ENABLED', False)
+@patch('processor.pipeline.summarize_with_content_model_async', new_callable=AsyncMock)
+@patch('processor.pipeline.fetch_webpage_html')
+class TestTechPrefilter(unittest.TestCase):
+    """测试 tech_only 模式下的本地预筛选"""
+
+    def setUp(self):
+        run_budget.start()
+
+    def test_prefilter_in_pipeline(self, mock_fetch, mock_summarize):
+        """明确的非科技条目不抓取、不摘要；明确的科技条目直接使用来源描述；其余交给内容模型"""
+        mock_fetch.return_value = ("", None)
+        mock_summarize.return_value = {"summary": "AI摘要", "is_tech": True}
+        items = [
+            {"title": "明星综艺收视率创新高", "url": "https://example.com/1", "desc": "娱乐圈", "timestamp": 1},
+            {"title": "OpenAI发布开源大模型", "url": "https://example.com/2", "timestamp": 1,
+             "desc": "OpenAI今天发布了开源大模型，支持在本地显卡上运行，推理速度比上一代提升一倍，开发者可以免费使用。"},
+            {"title": "某公司发布新产品", "url": "https://example.com/3", "timestamp": 1,
+             "content": "某公司今天举行发布会，介绍了新产品的功能、价格和上市时间，并回答了现场提问。" * 5},
+        ]
+        classifier = TechClassifier(cache_dir=tempfile.mkdtemp(), positive_threshold=0.9,
+                                    negative_threshold=0.1, enabled=True)
+
+        with patch('processor.pipeline.tech_classifier', classifier):
+            results = asyncio.run(run_pipeline(items, "test_key", tech_only=True))
+
+        self.assertEqual([r["summary_source"] for r in results], ["本地过滤", "来源摘要", "AI生成"])
+        self.assertEqual([r["is_tech"] for r in results], [False, True, True])
+        mock_fetch.assert_not_called()
+        mock_summarize.assert_called_once()
+        self.assertEqual(run_budget.summary_tiers, {"prefiltered": 1, "source_desc": 1, "llm": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试时间归一化与时间窗口过滤
+"""
+
+import os
+import sys
+import time
+import calendar
+import unittest
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.time_utils import (
+    TimeNormalizer, struct_time_to_epoch, normalize_item_times, window_start, filter_by_window
+)
+
+
+class TestTimeUtils(unittest.TestCase):
+    """测试 TimeNormalizer 和 filter_by_window"""
+
+    def test_struct_time_is_utc(self):
+        """feedparser 的 *_parsed 是 UTC 时间，不能按本地时间转换"""
+        struct = time.strptime("2025-03-08 12:00:00", "%Y-%m-%d %H:%M:%S")
+        self.assertEqual(struct_time_to_epoch(struct), calendar.timegm(struct))
+        self.assertEqual(struct_time_to_epoch(struct), 1741435200)
+
+    def test_to_epoch_formats(self):
+        """测试秒/毫秒时间戳、数字字符串、ISO 8601、RFC 822 和本地时间字符串"""
+        normalizer = TimeNormalizer()
+        self.assertEqual(normalizer.to_epoch(1741435200), 1741435200)
+        self.assertEqual(normalizer.to_epoch(1741435200000), 1741435200)
+        self.assertEqual(normalizer.to_epoch("1741435200000"), 1741435200)
+        self.assertEqual(normalizer.to_epoch("2025-03-08T12:00:00.000Z"), 1741435200)
+        self.assertEqual(normalizer.to_epoch("Sat, 08 Mar 2025 12:00:00 GMT"), 1741435200)
+        self.assertEqual(normalizer.to_epoch("Sat Mar 08 12:00:00 +0000 2025"), 1741435200)
+        local = datetime(2025, 3, 8, 20, 30)
+        self.assertEqual(normalizer.to_epoch("2025-03-08 20:30:00"), local.timestamp())
+        self.assertEqual(normalizer.to_epoch("2025年03月08日 20:30"), local.timestamp())
+        # 纯数字的日期不是时间戳
+        self.assertEqual(normalizer.to_epoch("20250308"), datetime(2025, 3, 8).timestamp())
+        self.assertEqual(normalizer.to_epoch("20250308203000"), local.timestamp())
+        self.assertEqual(normalizer.to_epoch("1741435200.5"), 1741435200.5)
+        for value in (None, "", "not a date", 0, True, "12345", "-1741435200"):
+            self.assertIsNone(normalizer.to_epoch(value))
+
+    def test_format_cached_per_source(self):
+        """同一来源解析成功的格式会被记住"""
+        normalizer = TimeNormalizer()
+        normalizer.to_epoch("2025/03/08 20:30", source="来源A")
+        self.assertEqual(normalizer._formats["来源A"], "%Y/%m/%d %H:%M")
+        self.assertEqual(normalizer.to_epoch("2025/03/09 08:00", source="来源A"),
+                         datetime(2025, 3, 9, 8, 0).timestamp())
+        self.assertNotIn("来源B", normalizer._formats)
+
+    def test_normalize_item_times(self):
+        """归一化后 timestamp 为毫秒整数，无时间的条目保持不变"""
+        items = [
+            {"title": "a", "time": "2025-03-08T12:00:00Z"},
+            {"title": "b", "published": "2025-03-08 20:30:00"},
+            {"title": "c"},
+        ]
+        normalize_item_times(items)
+        self.assertEqual(items[0]["timestamp"], 1741435200000)
+        self.assertEqual(items[1]["timestamp"], int(datetime(2025, 3, 8, 20, 30).timestamp() * 1000))
+        self.assertNotIn("timestamp", items[2])
+
+    def test_filter_by_window(self):
+        """测试窗口过滤、未来时间容差以及无时间条目的保留/丢弃"""
+        now = datetime.now()
+        items = [
+            {"title": "recent", "timestamp": int(now.timestamp() * 1000)},
+            {"title": "old", "timestamp": int((now - timedelta(days=3)).timestamp() * 1000)},
+            {"title": "skew", "timestamp": int((now + timedelta(minutes=10)).timestamp() * 1000)},
+            {"title": "future", "timestamp": int((now + timedelta(days=400)).timestamp() * 1000)},
+            {"title": "unknown"},
+        ]
+        start = window_start(1, now)
+        self.assertEqual(start, (now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)).timestamp())
+
+        kept = filter_by_window(items, start, end=now.timestamp())
+        self.assertEqual([item["title"] for item in kept], ["recent", "skew", "unknown"])
+
+        kept = filter_by_window(items, start, end=now.timestamp(), keep_unknown=False)
+        self.assertEqual([item["title"] for item in kept], ["recent", "skew"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试token统计（并发记录、API用量与本地估算、按阶段和来源的报告）
+"""
+
+import os
+import sys
+import json
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.token_tracker import TokenTracker, estimate_tokens
+
+
+class TestTokenTracker(unittest.TestCase):
+    """测试 TokenTracker"""
+
+    def setUp(self):
+        self.tracker = TokenTracker()
+
+    def test_estimate_tokens(self):
+        """中文按字计数，英文单词约4个字符一个token，数字和符号各算一个"""
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("人工智能"), 4)
+        self.assertEqual(estimate_tokens("OpenAI发布GPT"), 5)
+        self.assertEqual(estimate_tokens("2025年5月"), 4)
+
+    def test_concurrent_add_usage(self):
+        """多个线程同时记录时不丢失用量"""
+        def add(_):
+            self.tracker.add_usage("model", 10, 5, stage="summary", source="36kr")
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(add, range(1000)))
+
+        usage = self.tracker.get_usage()["model"]
+        self.assertEqual(usage["total_tokens"], 15000)
+        self.assertEqual(usage["requests"], 1000)
+        self.assertEqual(self.tracker.report()["sources"]["36kr"]["prompt_tokens"], 10000)
+
+    def test_record_response_prefers_api_usage(self):
+        """优先使用API返回的用量，没有时用本地估算并标记"""
+        self.tracker.record_response("model", "提示词", "回答", {"prompt_tokens": 100, "completion_tokens": 20},
+                                     stage="summary", latency=2.0)
+        self.tracker.record_response("model", "提示词", "回答", None, stage="digest", latency=1.0)
+
+        report = self.tracker.report()
+        self.assertEqual(report["stages"]["summary"]["prompt_tokens"], 100)
+        self.assertEqual(report["stages"]["summary"]["tokens_per_second"], 10.0)
+        self.assertEqual(report["stages"]["digest"]["prompt_tokens"], 3)
+        self.assertEqual(report["stages"]["digest"]["estimated_requests"], 1)
+        self.assertEqual(report["models"]["model"]["requests"], 2)
+        self.assertEqual(report["models"]["model"]["avg_latency_seconds"], 1.5)
+
+    def test_batch_usage_split_between_sources(self):
+        """批量请求的用量按权重分摊到各来源"""
+        self.tracker.add_usage("model", 300, 90, stage="batch_summary", source={"36kr": 2, "ithome": 1})
+
+        sources = self.tracker.report()["sources"]
+        self.assertEqual(sources["36kr"]["prompt_tokens"], 200)
+        self.assertEqual(sources["ithome"]["completion_tokens"], 30)
+        self.assertEqual(sources["ithome"]["requests"], 1)
+
+    def test_save_report(self):
+        """报告写入JSON文件"""
+        self.tracker.add_usage("model", 10, 5, stage="summary")
+        path = os.path.join(tempfile.mkdtemp(), "reports", "token_usage.json")
+
+        self.assertEqual(self.tracker.save_report(path, extra={"run_seconds": 12.5}), path)
+        with open(path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+        self.assertEqual(report["run_seconds"], 12.5)
+        self.assertEqual(report["models"]["model"]["total_tokens"], 15)
+        self.assertIn("summary", report["stages"])
+
+
+if __name__ == "__main__":
+    unittest.main()
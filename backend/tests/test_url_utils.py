@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试URL规范化和条目ID生成
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.url_utils import canonicalize_url, get_item_id, assign_item_ids
+from utils.redirect_cache import RedirectCache
+
+
+class TestUrlUtils(unittest.TestCase):
+    """测试 canonicalize_url 和 get_item_id"""
+
+    def test_scheme_host_and_tracking_params(self):
+        """协议、www前缀、跟踪参数、锚点和结尾斜杠被统一"""
+        self.assertEqual(
+            canonicalize_url("http://www.36kr.com/p/123/?utm_source=feed&b=2&a=1#top"),
+            "https://36kr.com/p/123?a=1&b=2"
+        )
+
+    def test_mobile_host(self):
+        """移动端域名与桌面端一致"""
+        self.assertEqual(canonicalize_url("https://m.36kr.com/p/123"), canonicalize_url("https://36kr.com/p/123"))
+        self.assertEqual(canonicalize_url("https://x.com/user/status/1"), "https://twitter.com/user/status/1")
+
+    def test_redirectors(self):
+        """代理和跳转链接被还原为目标地址"""
+        self.assertEqual(
+            canonicalize_url("https://r4l.deno.dev/https://linux.do/t/topic/1"),
+            "https://linux.do/t/topic/1"
+        )
+        self.assertEqual(
+            canonicalize_url("https://link.zhihu.com/?target=https%3A//github.com/a/b"),
+            "https://github.com/a/b"
+        )
+
+    def test_wechat_article_params_kept(self):
+        """公众号文章保留标识参数，去掉分享参数"""
+        self.assertEqual(
+            canonicalize_url("https://mp.weixin.qq.com/s?__biz=MzA&mid=1&idx=1&sn=ab&chksm=zz&scene=21#wechat_redirect"),
+            "https://mp.weixin.qq.com/s?__biz=MzA&idx=1&mid=1&sn=ab"
+        )
+
+    def test_host_specific_tracking_params(self):
+        """from等通用参数只在已知用于跟踪的网站上去掉，其他网站可能用来分页或检索"""
+        self.assertEqual(
+            canonicalize_url("https://mp.weixin.qq.com/s?__biz=MzA&mid=1&idx=1&sn=ab&from=timeline"),
+            "https://mp.weixin.qq.com/s?__biz=MzA&idx=1&mid=1&sn=ab"
+        )
+        self.assertEqual(
+            canonicalize_url("https://www.bilibili.com/video/BV1xx/?spm_id_from=333.1007&vd_source=ab"),
+            "https://bilibili.com/video/BV1xx"
+        )
+        self.assertNotEqual(canonicalize_url("https://example.com/list?from=20"),
+                            canonicalize_url("https://example.com/list?from=40"))
+
+    def test_item_id(self):
+        """同一文章得到相同ID，无URL的条目按来源和标题区分"""
+        a = {"url": "http://www.example.com/post/1?utm_medium=rss", "title": "A", "source": "RSS"}
+        b = {"url": "https://example.com/post/1/", "title": "A copy", "source": "hot"}
+        c = {"url": "#", "title": "tweet 1", "source": "Twitter"}
+        d = {"url": "#", "title": "tweet 2", "source": "Twitter"}
+        self.assertEqual(get_item_id(a), get_item_id(b))
+        self.assertNotEqual(get_item_id(c), get_item_id(d))
+        assign_item_ids([a, c])
+        self.assertEqual(a["item_id"], get_item_id(b))
+
+    def test_recorded_redirect_is_resolved(self):
+        """已记录的短链跳转在规范化时被解析为最终地址"""
+        cache = RedirectCache(cache_dir=tempfile.mkdtemp(), ttl_days=1)
+        cache.record("https://t.co/abc", "https://www.example.com/article/?utm_source=twitter")
+        with patch('utils.url_utils.redirect_cache', cache):
+            self.assertEqual(canonicalize_url("https://t.co/abc"), "https://example.com/article")
+            self.assertEqual(canonicalize_url("https://t.co/abc", resolve_redirects=False), "https://t.co/abc")
+        cache.save()
+        reloaded = RedirectCache(cache_dir=cache.cache_path.rsplit(os.sep, 1)[0], ttl_days=1)
+        self.assertEqual(reloaded.resolve("https://t.co/abc"), "https://www.example.com/article/?utm_source=twitter")
+
+
+if __name__ == '__main__':
+    unittest.main()
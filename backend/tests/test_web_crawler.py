@@ -9,16 +9,22 @@ import sys
 import os
 import unittest
 import logging
+import tempfile
 from pathlib import Path
+from unittest.mock import patch
+
+from requests.models import Response
 
 # 添加项目根目录到Python路径
 sys.path.append(str(Path(__file__).parent.parent))
 
 from crawler.web_crawler import (
     fetch_webpage_content,
+    fetch_webpage_html,
     extract_content_with_multiple_methods,
     extract_publish_time_from_html
 )
+from utils.redirect_cache import RedirectCache
 
 # 配置日志
 logging.basicConfig(
@@ -116,6 +122,49 @@ class TestWebCrawler(unittest.TestCase):
         self.assertEqual(content, existing_content)
         self.assertEqual(html, "")
 
+
+def _response(url, status_code, history=()):
+    response = Response()
+    response.url = url
+    response.status_code = status_code
+    response._content = b"<html><body>page</body></html>"
+    response.history = list(history)
+    return response
+
+
+@patch('crawler.web_crawler.time.sleep')
+@patch('crawler.web_crawler.cloudscraper.create_scraper')
+class TestFetchRedirects(unittest.TestCase):
+    """测试抓取时记录跳转"""
+
+    def setUp(self):
+        self.cache = RedirectCache(cache_dir=tempfile.mkdtemp())
+        patcher = patch('crawler.web_crawler.redirect_cache', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_successful_redirect_is_recorded(self, mock_create_scraper, mock_sleep):
+        """跳转到正常页面时记录跳转"""
+        mock_create_scraper.return_value.get.return_value = _response(
+            "https://example.com/article", 200, [_response("https://t.co/abc", 301)])
+
+        html, _ = fetch_webpage_html("https://t.co/abc", use_page_cache=False)
+
+        self.assertTrue(html)
+        self.assertEqual(self.cache.resolve("https://t.co/abc"), "https://example.com/article")
+
+    def test_redirect_to_error_page_not_recorded(self, mock_create_scraper, mock_sleep):
+        """跳转到错误页面（4xx/5xx）时不记录，避免不同文章共用一个地址"""
+        for status_code in (404, 503):
+            mock_create_scraper.return_value.get.return_value = _response(
+                "https://example.com/login", status_code, [_response("https://t.co/abc", 302)])
+
+            html, _ = fetch_webpage_html("https://t.co/abc", max_retries=1, use_page_cache=False)
+
+            self.assertEqual(html, "")
+            self.assertEqual(self.cache.resolve("https://t.co/abc"), "https://t.co/abc")
+
+
 if __name__ == "__main__":
     # 检查命令行参数数量
     if len(sys.argv) == 2:
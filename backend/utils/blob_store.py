@@ -0,0 +1,90 @@
+import os
+import time
+import hashlib
+import logging
+from threading import get_ident
+
+from config.config import BLOB_STORE_ENABLED, BLOB_SPILL_MIN_CHARS, BLOB_STORE_MAX_AGE_HOURS
+from utils.utils import get_backend_dir
+
+logger = logging.getLogger(__name__)
+
+
+class BlobStore:
+    """
+    Content-addressed file store for large text fields (article content)
+
+    put() writes the text once under its SHA-256 and returns that hash as the reference;
+    get() reads it back on demand, so items only keep the short reference in memory.
+    Identical content collected from several sources or runs is stored once.
+    """
+
+    def __init__(self, cache_dir="cache/blobs", min_chars=BLOB_SPILL_MIN_CHARS,
+                 max_age_hours=BLOB_STORE_MAX_AGE_HOURS, enabled=BLOB_STORE_ENABLED):
+        self.cache_dir = os.path.join(get_backend_dir(), cache_dir)
+        self.min_chars = min_chars
+        self.max_age_seconds = max_age_hours * 3600
+        self.enabled = enabled
+
+    def should_spill(self, value):
+        return self.enabled and isinstance(value, str) and len(value) >= self.min_chars
+
+    def _path(self, ref):
+        # Two-level fan-out keeps directories small
+        return os.path.join(self.cache_dir, ref[:2], f"{ref}.txt")
+
+    def put(self, text):
+        """
+        Store text and return its reference, None if it could not be written
+        """
+        data = text.encode('utf-8')
+        ref = hashlib.sha256(data).hexdigest()
+        path = self._path(ref)
+        try:
+            if os.path.exists(path):
+                # Refresh the age so prune() keeps blobs that are still in use
+                os.utime(path)
+                return ref
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            return ref
+        except OSError as e:
+            logger.warning(f"Failed to write blob {ref}: {str(e)}")
+            return None
+
+    def get(self, ref):
+        """
+        Load the text stored under ref, "" if it is missing
+        """
+        try:
+            with open(self._path(ref), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError as e:
+            logger.warning(f"Failed to read blob {ref}: {str(e)}")
+            return ""
+
+    def prune(self):
+        """
+        Remove blobs not written or reused for max_age_hours
+        """
+        if not os.path.isdir(self.cache_dir):
+            return
+        now = time.time()
+        removed = 0
+        for root, _, filenames in os.walk(self.cache_dir):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                try:
+                    if now - os.path.getmtime(path) > self.max_age_seconds:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    pass
+        logger.info(f"Blob store pruned: removed {removed} blobs")
+
+
+# Global blob store instance
+blob_store = BlobStore()
@@ -0,0 +1,130 @@
+import re
+import logging
+
+import numpy as np
+
+from utils.token_tracker import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Sentence ends: CJK punctuation directly, Latin punctuation when followed by whitespace
+_SENTENCE_END_PATTERN = re.compile(r'(?<=[。！？；])|(?<=[.!?;])\s+')
+_CJK_RUN_PATTERN = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]+')
+_LATIN_WORD_PATTERN = re.compile(r'[a-z][a-z0-9]+|\d+(?:\.\d+)?')
+# CJK characters and full-width punctuation, no space is needed after them
+_CJK_END_PATTERN = re.compile(r'[\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]$')
+
+# Sentences shorter than this are usually menu entries, captions or bylines
+MIN_SENTENCE_CHARS = 8
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_ITERATIONS = 30
+
+
+def split_sentences(text):
+    """
+    Split text into sentences (punctuation stays with its sentence, line breaks end a sentence)
+    """
+    sentences = []
+    for line in (text or "").split('\n'):
+        sentences.extend(s.strip() for s in _SENTENCE_END_PATTERN.split(line) if s and s.strip())
+    return sentences
+
+
+def sentence_separator(sentence):
+    """
+    What goes between this sentence and the next one of the same line
+    """
+    return "" if _CJK_END_PATTERN.search(sentence) else " "
+
+
+def join_sentences(sentences):
+    return "".join(sentence + sentence_separator(sentence) for sentence in sentences).strip()
+
+
+def text_terms(sentence):
+    """
+    Terms of a text: CJK character bigrams and lowercase Latin words and numbers
+    """
+    # CJK text has no spaces: character bigrams (and single characters of one-character runs)
+    terms = []
+    for run in _CJK_RUN_PATTERN.findall(sentence):
+        terms.extend(run[i:i + 2] for i in range(max(len(run) - 1, 1)))
+    terms.extend(_LATIN_WORD_PATTERN.findall(sentence.lower()))
+    return terms
+
+
+def rank_sentences(sentences):
+    """
+    TextRank over TF-IDF sentence vectors: returns one score per sentence (higher is more
+    informative, scores sum to 1). Sentences similar to many others rank high; too short
+    sentences and repeated ones (navigation, share buttons) get no score.
+    """
+    count = len(sentences)
+    if count == 0:
+        return np.zeros(0)
+    vocabulary = {}
+    rows, cols, values = [], [], []
+    seen = set()
+    for row, sentence in enumerate(sentences):
+        if len(sentence) < MIN_SENTENCE_CHARS or sentence in seen:
+            continue
+        seen.add(sentence)
+        terms = text_terms(sentence)
+        for term in set(terms):
+            rows.append(row)
+            cols.append(vocabulary.setdefault(term, len(vocabulary)))
+            values.append(terms.count(term) / len(terms))
+    if not vocabulary:
+        return np.zeros(count)
+
+    tf = np.zeros((count, len(vocabulary)))
+    tf[rows, cols] = values
+    document_frequency = np.count_nonzero(tf, axis=0)
+    vectors = tf * (np.log((1 + count) / (1 + document_frequency)) + 1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0)
+    active = norms[:, 0] > 0
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(similarity, out_weight, out=np.zeros_like(similarity), where=out_weight > 0)
+
+    scores = active / active.sum()
+    teleport = (1 - TEXTRANK_DAMPING) * scores
+    for _ in range(TEXTRANK_ITERATIONS):
+        scores = teleport + TEXTRANK_DAMPING * (transition.T @ scores)
+    scores = scores * active
+    total = scores.sum()
+    return scores / total if total > 0 else scores
+
+
+def extract_summary(text, max_tokens=None, max_chars=None):
+    """
+    Pick the highest ranked sentences of text until max_tokens (estimated) or max_chars
+    would be exceeded, and join them in their original order. Text that already fits is
+    returned unchanged. Returns "" if no sentence fits.
+    """
+    def fits(length_chars, length_tokens):
+        return ((max_chars is None or length_chars <= max_chars)
+                and (max_tokens is None or length_tokens <= max_tokens))
+
+    text = (text or "").strip()
+    if fits(len(text), estimate_tokens(text) if max_tokens is not None else 0):
+        return text
+
+    sentences = split_sentences(text)
+    scores = rank_sentences(sentences)
+    selected = []
+    used_chars = 0
+    used_tokens = 0
+    for index in np.argsort(-scores, kind="stable"):
+        if scores[index] <= 0:
+            break
+        sentence = sentences[index]
+        tokens = estimate_tokens(sentence) if max_tokens is not None else 0
+        if fits(used_chars + len(sentence), used_tokens + tokens):
+            selected.append(index)
+            used_chars += len(sentence)
+            used_tokens += tokens
+    return join_sentences(sentences[index] for index in sorted(selected))
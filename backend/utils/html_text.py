@@ -0,0 +1,125 @@
+import re
+import logging
+from collections.abc import Mapping
+from functools import lru_cache
+from html.parser import HTMLParser
+
+logger = logging.getLogger(__name__)
+
+# Tags that start a new line in the cleaned text (matches the old clean_html behaviour for <br>/<p>)
+LINE_BREAK_TAGS = {"br", "p", "div", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "blockquote"}
+# Tags whose text is never shown to readers
+SKIPPED_TAGS = {"script", "style", "noscript", "template"}
+
+HTML_TEXT_CACHE_SIZE = 4096
+# Longer strings (full article bodies) are rarely repeated, don't keep them in the memo
+HTML_TEXT_MEMO_MAX_LENGTH = 2000
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class _TextExtractor(HTMLParser):
+    """
+    Streaming HTML parser that only collects text nodes, no tree is built
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.chunks = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in LINE_BREAK_TAGS:
+            self.chunks.append("\n")
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in LINE_BREAK_TAGS:
+            self.chunks.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            if self._skip_depth:
+                self._skip_depth -= 1
+        elif tag in LINE_BREAK_TAGS:
+            self.chunks.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.chunks.append(data)
+
+
+def _extract_chunks(text):
+    parser = _TextExtractor()
+    try:
+        parser.feed(text)
+        parser.close()
+    except Exception as e:
+        # HTMLParser is very lenient, but never let a malformed string break the pipeline
+        logger.warning(f"Failed to parse HTML, falling back to raw text: {str(e)}")
+        return [text]
+    return parser.chunks
+
+
+def _normalize_lines(text):
+    # Collapse whitespace inside each line and drop empty lines
+    lines = (_WHITESPACE_RE.sub(' ', line).strip() for line in text.splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+def _looks_like_html(text):
+    return '<' in text or '&' in text
+
+
+def _is_plain_url(text):
+    # Query strings like ?a=1&copy=2 must not be entity-decoded
+    return text.startswith(('http://', 'https://')) and '<' not in text and not any(c.isspace() for c in text)
+
+
+def _html_to_text(text, keep_line_breaks):
+    if not _looks_like_html(text):
+        return _normalize_lines(text) if keep_line_breaks else text.strip()
+
+    chunks = _extract_chunks(text)
+    if keep_line_breaks:
+        return _normalize_lines(''.join(chunks))
+    # Same result as BeautifulSoup.get_text(strip=True)
+    return ''.join(chunk.strip() for chunk in chunks if chunk.strip())
+
+
+_html_to_text_cached = lru_cache(maxsize=HTML_TEXT_CACHE_SIZE)(_html_to_text)
+
+
+def html_to_text(text, keep_line_breaks=True):
+    """
+    Convert an HTML fragment to plain text
+
+    Strings without '<' or '&' skip parsing entirely. Results are memoized, so
+    repeated inputs (same desc on several items, identical urls, etc.) are free.
+
+    Args:
+        text: Value to clean, non-string values are returned unchanged.
+        keep_line_breaks (bool): If True, <br>/<p> and other block tags become line breaks,
+            whitespace is collapsed per line and empty lines are dropped.
+            If False, text nodes are stripped and concatenated (BeautifulSoup get_text(strip=True)).
+    """
+    if not isinstance(text, str) or not text:
+        return text
+    if len(text) > HTML_TEXT_MEMO_MAX_LENGTH:
+        return _html_to_text(text, keep_line_breaks)
+    return _html_to_text_cached(text, keep_line_breaks)
+
+
+def clean_html_fields(value):
+    """
+    Recursively convert all string values in a dict/list structure to plain text
+    Mappings such as NewsItem come back as plain dicts
+    """
+    if isinstance(value, Mapping):
+        return {k: clean_html_fields(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [clean_html_fields(v) for v in value]
+    if isinstance(value, str):
+        return value if _is_plain_url(value) else html_to_text(value)
+    return value
@@ -0,0 +1,146 @@
+import os
+import json
+import time
+import logging
+from threading import Lock
+
+from config.config import ITEM_STORE_TTL_DAYS
+from utils.utils import get_backend_dir, get_content_hash
+from utils.time_utils import item_epoch
+from utils.url_utils import get_item_id, get_item_ids
+
+logger = logging.getLogger(__name__)
+
+# Source fields that define "the same input"; volatile fields such as hot counts are ignored
+FINGERPRINT_FIELDS = ("url", "title", "desc", "content")
+# Large fields are not kept in the store
+EXCLUDED_RECORD_FIELDS = ("content",)
+# Results that should be retried on the next run instead of being reused
+NON_REUSABLE_SUMMARY_SOURCES = {"内容截断(AI失败)", "处理失败", "无内容", "未知", "超时降级", "本地过滤"}
+
+
+def _record_epoch(entry):
+    """
+    Publish time of a stored record in epoch seconds, falling back to when it was stored
+    """
+    epoch = item_epoch(entry["record"])
+    return epoch if epoch is not None else entry.get("stored_at", 0)
+
+
+def get_source_fingerprint(item):
+    """
+    Hash of the source-provided fields of an item, changes when the source data changes
+    """
+    payload = json.dumps([item.get(k) or "" for k in FINGERPRINT_FIELDS], ensure_ascii=False)
+    return get_content_hash(payload)
+
+
+class ItemStore:
+    """
+    Persistent store of fully processed records keyed by item_id (hash of the canonical URL)
+
+    Loaded lazily once per process and written back with save(), records expire after ttl_days.
+    """
+
+    def __init__(self, cache_dir="cache/items", ttl_days=ITEM_STORE_TTL_DAYS):
+        self.store_path = os.path.join(get_backend_dir(), cache_dir, "processed_items.json")
+        self.ttl_seconds = ttl_days * 24 * 3600
+        self._records = None
+        self._dirty = False
+        self._lock = Lock()
+
+    def _load(self):
+        # Caller holds the lock
+        if self._records is not None:
+            return
+        self._records = {}
+        if not os.path.exists(self.store_path):
+            return
+        try:
+            with open(self.store_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            now = time.time()
+            self._records = {k: v for k, v in data.items() if now - v.get("stored_at", 0) < self.ttl_seconds}
+            self._dirty = len(self._records) != len(data)
+            logger.info(f"Loaded processed item store with {len(self._records)} records")
+        except Exception as e:
+            logger.warning(f"Failed to load processed item store: {str(e)}")
+
+    def lookup(self, item, match_fingerprint=True):
+        """
+        Return the stored processed record for item if its source data is unchanged, else None
+        With match_fingerprint=False any stored record of the same item is returned.
+        The item is looked up under all its ids (see get_item_ids), so a record stored before
+        or after the item's redirect was learned is still found.
+        """
+        if not item.get("item_id"):
+            return None
+        with self._lock:
+            self._load()
+            entry = next((self._records[i] for i in get_item_ids(item) if i in self._records), None)
+        if not entry or time.time() - entry.get("stored_at", 0) >= self.ttl_seconds:
+            return None
+        if match_fingerprint and entry.get("fingerprint") != get_source_fingerprint(item):
+            return None
+        return entry["record"]
+
+    def window_records(self, since, exclude_ids=()):
+        """
+        Return stored records published (or, without a timestamp, processed) at or after the
+        epoch seconds `since`, newest first, skipping the item_ids in exclude_ids
+        """
+        with self._lock:
+            self._load()
+            entries = list(self._records.items())
+        now = time.time()
+        window = [
+            (_record_epoch(entry), entry["record"]) for item_id, entry in entries
+            if item_id not in exclude_ids and now - entry.get("stored_at", 0) < self.ttl_seconds
+        ]
+        return [record for epoch, record in sorted(window, key=lambda x: x[0], reverse=True) if epoch >= since]
+
+    def store(self, item, result):
+        """
+        Persist the processed result for item (the original source item, used for the fingerprint)
+        """
+        item_id = result.get("item_id") or item.get("item_id")
+        if not item_id or result.get("summary_source") in NON_REUSABLE_SUMMARY_SOURCES:
+            return
+        # The id was computed from the collected URL; if fetching it learned a redirect (t.co, ...),
+        # store under the resolved id that the next runs compute for the same item
+        if item_id == get_item_id(item, resolve_redirects=False):
+            item_id = get_item_id(item)
+        record = {k: v for k, v in result.items() if k not in EXCLUDED_RECORD_FIELDS}
+        record["item_id"] = item_id
+        entry = {
+            "fingerprint": get_source_fingerprint(item),
+            "content_hash": get_content_hash(result.get("content") or ""),
+            "stored_at": time.time(),
+            "record": record,
+        }
+        with self._lock:
+            self._load()
+            self._records[item_id] = entry
+            self._dirty = True
+
+    def save(self):
+        """
+        Write the store back to disk if it changed
+        """
+        with self._lock:
+            if not self._dirty or self._records is None:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.store_path), exist_ok=True)
+                tmp_path = f"{self.store_path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._records, f, ensure_ascii=False)
+                os.replace(tmp_path, self.store_path)
+                self._dirty = False
+                logger.info(f"Saved processed item store with {len(self._records)} records")
+            except Exception as e:
+                logger.warning(f"Failed to save processed item store: {str(e)}")
+
+
+# Global processed item store instance
+item_store = ItemStore()
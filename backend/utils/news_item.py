@@ -0,0 +1,137 @@
+from collections.abc import MutableMapping
+
+from utils.blob_store import blob_store
+
+# Fields every collector, the processor and the output share; they live in slots
+NEWS_ITEM_FIELDS = (
+    "item_id", "title", "url", "source", "hot", "time", "timestamp", "published", "desc", "content",
+    "summary", "is_tech", "summary_source", "is_processed", "extracted_time", "saved_at",
+)
+NEWS_ITEM_FIELD_SET = frozenset(NEWS_ITEM_FIELDS)
+
+
+class NewsItem(MutableMapping):
+    """
+    Compact news item with dict-style access
+
+    Known fields are stored in __slots__ (no per-instance dict), any other key goes to a
+    small overflow dict created on first use. Supports item.get(), item["x"], `in`,
+    {**item}, dict(item) and copy(), so code written for plain dict items keeps working.
+    Use to_dict() (or dict(item)) before serializing to JSON.
+
+    Long content is spilled to the blob store when it is set and only its reference is
+    kept; reading item["content"] (also through pop() or items()) loads it back from disk,
+    `in`, iteration over the keys and del do not. See drop_field() and without_fields().
+    """
+
+    __slots__ = NEWS_ITEM_FIELDS + ("_extra", "_content_ref")
+
+    def __init__(self, data=None, **fields):
+        self._extra = None
+        self._content_ref = None
+        if data:
+            self.update(data)
+        if fields:
+            self.update(fields)
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Return data unchanged if it already is a NewsItem, else wrap it
+        """
+        return data if isinstance(data, cls) else cls(data)
+
+    def __getitem__(self, key):
+        if key == "content" and self._content_ref:
+            return blob_store.get(self._content_ref)
+        if key in NEWS_ITEM_FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        if key == "content":
+            self._set_content(value)
+        elif key in NEWS_ITEM_FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key == "content" and self._content_ref:
+            self._content_ref = None
+        elif key in NEWS_ITEM_FIELD_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        for key in NEWS_ITEM_FIELDS:
+            if key in self:
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        if key == "content" and self._content_ref:
+            return True
+        if key in NEWS_ITEM_FIELD_SET:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __repr__(self):
+        return f"NewsItem({self.to_dict()!r})"
+
+    def _set_content(self, value):
+        self._content_ref = None
+        if blob_store.should_spill(value):
+            ref = blob_store.put(value)
+            if ref:
+                self._content_ref = ref
+                if hasattr(self, "content"):
+                    del self.content
+                return
+        self.content = value
+
+    def copy(self):
+        # Copies slots directly so spilled content is shared by reference, not reloaded
+        copied = NewsItem()
+        for key in NEWS_ITEM_FIELDS:
+            if hasattr(self, key):
+                setattr(copied, key, getattr(self, key))
+        copied._content_ref = self._content_ref
+        if self._extra:
+            copied._extra = dict(self._extra)
+        return copied
+
+    def to_dict(self):
+        return dict(self.items())
+
+
+def drop_field(item, key):
+    """
+    Remove key from a NewsItem or dict if present; unlike pop() spilled content is not read back
+    """
+    if key in item:
+        del item[key]
+
+
+def without_fields(item, *keys):
+    """
+    Plain dict copy of a NewsItem or dict without keys; the excluded fields (e.g. spilled content) are not read
+    """
+    return {k: item[k] for k in item if k not in keys}
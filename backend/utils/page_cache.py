@@ -0,0 +1,227 @@
+import os
+import gzip
+import json
+import time
+import hashlib
+import logging
+from threading import Lock, get_ident
+
+from config.config import (
+    PAGE_CACHE_ENABLED, PAGE_CACHE_TTL_HOURS, PAGE_CACHE_MAX_AGE_DAYS, PAGE_CACHE_MAX_SIZE_MB
+)
+from utils.utils import get_backend_dir
+from utils.url_utils import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+
+def _cache_key_url(url):
+    """
+    Normalize URL before hashing it into a cache key
+    """
+    return canonicalize_url(url) or (url or "").strip()
+
+
+def _sha256(data):
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def _atomic_write(path, data):
+    tmp_path = f"{path}.{os.getpid()}.{get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class PageCache:
+    """
+    On-disk cache of fetched webpages, keyed by canonical URL
+
+    Each URL has a small JSON index entry (validators, fetch time, final URL) that points to
+    a gzip-compressed body file named by the SHA-256 of the HTML, so identical pages
+    served under several URLs are stored only once.
+    """
+
+    def __init__(self, cache_dir="cache/pages", ttl_hours=PAGE_CACHE_TTL_HOURS,
+                 max_age_days=PAGE_CACHE_MAX_AGE_DAYS, max_size_mb=PAGE_CACHE_MAX_SIZE_MB,
+                 enabled=PAGE_CACHE_ENABLED):
+        self.cache_dir = os.path.join(get_backend_dir(), cache_dir)
+        self.index_dir = os.path.join(self.cache_dir, "index")
+        self.body_dir = os.path.join(self.cache_dir, "bodies")
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.enabled = enabled
+        self._lock = Lock()
+
+    def _index_path(self, url):
+        return os.path.join(self.index_dir, f"{_sha256(_cache_key_url(url))}.json")
+
+    def _body_path(self, body_hash):
+        return os.path.join(self.body_dir, f"{body_hash}.json.gz")
+
+    def get(self, url):
+        """
+        Return the cached entry for url (dict with html, text, etag, last_modified,
+        fetched_at, final_url) or None if missing or unreadable
+        """
+        if not self.enabled or not url:
+            return None
+        try:
+            index_path = self._index_path(url)
+            if not os.path.exists(index_path):
+                return None
+            with open(index_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            with gzip.open(self._body_path(entry["body_hash"]), 'rt', encoding='utf-8') as f:
+                body = json.load(f)
+            entry["html"] = body.get("html", "")
+            entry["text"] = body.get("text")
+            return entry
+        except Exception as e:
+            logger.warning(f"Failed to read page cache for {url}: {str(e)}")
+            return None
+
+    def is_fresh(self, entry):
+        """
+        True if the entry can be served without revalidation
+        """
+        return bool(entry) and (time.time() - entry.get("fetched_at", 0)) < self.ttl_seconds
+
+    def put(self, url, html, text=None, final_url=None, etag=None, last_modified=None, fetched_at=None):
+        """
+        Store fetched HTML (and optionally extracted text) for url
+        """
+        if not self.enabled or not url or not html:
+            return
+        try:
+            body_hash = _sha256(html)
+            with self._lock:
+                os.makedirs(self.index_dir, exist_ok=True)
+                os.makedirs(self.body_dir, exist_ok=True)
+            body_path = self._body_path(body_hash)
+            # Body files are immutable per hash, only rewrite when text was not stored before
+            existing_text = None
+            if os.path.exists(body_path):
+                try:
+                    with gzip.open(body_path, 'rt', encoding='utf-8') as f:
+                        existing_text = json.load(f).get("text")
+                except Exception:
+                    existing_text = None
+            if not os.path.exists(body_path) or (text and not existing_text):
+                payload = json.dumps({"html": html, "text": text or existing_text}, ensure_ascii=False)
+                _atomic_write(body_path, gzip.compress(payload.encode('utf-8')))
+            entry = {
+                "url": url,
+                "final_url": final_url or url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "fetched_at": fetched_at or time.time(),
+                "body_hash": body_hash,
+            }
+            _atomic_write(self._index_path(url), json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+        except Exception as e:
+            logger.warning(f"Failed to write page cache for {url}: {str(e)}")
+
+    def store_text(self, url, html, text):
+        """
+        Add extracted text to the cached page, keeping its validators and fetch time
+        """
+        if not self.enabled or not url:
+            return
+        entry = None
+        try:
+            with open(self._index_path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            pass
+        if entry:
+            self.put(url, html, text=text, final_url=entry.get("final_url"), etag=entry.get("etag"),
+                     last_modified=entry.get("last_modified"), fetched_at=entry.get("fetched_at"))
+        else:
+            self.put(url, html, text=text)
+
+    def touch(self, url):
+        """
+        Mark a cached entry as revalidated (e.g. after a 304 Not Modified response)
+        """
+        if not self.enabled or not url:
+            return
+        try:
+            index_path = self._index_path(url)
+            with open(index_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            entry["fetched_at"] = time.time()
+            _atomic_write(index_path, json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+        except Exception as e:
+            logger.warning(f"Failed to refresh page cache entry for {url}: {str(e)}")
+
+    def prune(self):
+        """
+        Evict entries older than max_age, orphaned bodies, then the oldest entries
+        until the cache fits in max_size
+        """
+        if not os.path.isdir(self.index_dir):
+            return
+        now = time.time()
+        removed = 0
+        entries = []
+        for filename in os.listdir(self.index_dir):
+            index_path = os.path.join(self.index_dir, filename)
+            try:
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                if now - entry.get("fetched_at", 0) > self.max_age_seconds:
+                    os.remove(index_path)
+                    removed += 1
+                    continue
+                entries.append((entry.get("fetched_at", 0), index_path, entry["body_hash"]))
+            except Exception as e:
+                logger.warning(f"Removing unreadable page cache entry {index_path}: {str(e)}")
+                try:
+                    os.remove(index_path)
+                    removed += 1
+                except OSError:
+                    pass
+
+        referenced = {body_hash for _, _, body_hash in entries}
+        body_sizes = {}
+        if os.path.isdir(self.body_dir):
+            for filename in os.listdir(self.body_dir):
+                body_path = os.path.join(self.body_dir, filename)
+                body_hash = filename.split('.')[0]
+                if body_hash not in referenced:
+                    try:
+                        os.remove(body_path)
+                    except OSError:
+                        pass
+                    continue
+                body_sizes[body_hash] = os.path.getsize(body_path)
+
+        total_size = sum(body_sizes.values())
+        if total_size > self.max_size_bytes:
+            # Oldest first; a body is removed once no remaining entry points to it
+            entries.sort()
+            refcount = {}
+            for _, _, body_hash in entries:
+                refcount[body_hash] = refcount.get(body_hash, 0) + 1
+            for _, index_path, body_hash in entries:
+                if total_size <= self.max_size_bytes:
+                    break
+                try:
+                    os.remove(index_path)
+                    removed += 1
+                    refcount[body_hash] -= 1
+                    if refcount[body_hash] == 0:
+                        os.remove(self._body_path(body_hash))
+                        total_size -= body_sizes.get(body_hash, 0)
+                except OSError as e:
+                    logger.warning(f"Failed to evict page cache entry {index_path}: {str(e)}")
+
+        logger.info(f"Page cache pruned: removed {removed} entries, size {total_size / 1024 / 1024:.1f} MB")
+
+
+# Global page cache instance
+page_cache = PageCache()
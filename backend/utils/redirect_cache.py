@@ -0,0 +1,109 @@
+import os
+import json
+import time
+import logging
+from threading import Lock
+
+from config.config import REDIRECT_CACHE_TTL_DAYS
+from utils.utils import get_backend_dir
+
+logger = logging.getLogger(__name__)
+
+
+def _redirect_key(url):
+    return (url or "").strip().split('#')[0]
+
+
+class RedirectCache:
+    """
+    Persistent map of source URL -> final URL learned from redirect chains
+
+    Loaded lazily once per process and written back with save(), entries expire after ttl_days.
+    """
+
+    def __init__(self, cache_dir="cache/redirects", ttl_days=REDIRECT_CACHE_TTL_DAYS):
+        self.cache_path = os.path.join(get_backend_dir(), cache_dir, "redirect_map.json")
+        self.ttl_seconds = ttl_days * 24 * 3600
+        self._map = None
+        self._dirty = False
+        self._lock = Lock()
+
+    def _load(self):
+        # Caller holds the lock
+        if self._map is not None:
+            return
+        self._map = {}
+        if not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            now = time.time()
+            self._map = {k: v for k, v in data.items() if now - v.get("resolved_at", 0) < self.ttl_seconds}
+            self._dirty = len(self._map) != len(data)
+            logger.info(f"Loaded redirect cache with {len(self._map)} entries")
+        except Exception as e:
+            logger.warning(f"Failed to load redirect cache: {str(e)}")
+
+    def resolve(self, url):
+        """
+        Return the known final URL for url, or url itself if no (fresh) redirect is recorded
+        """
+        key = _redirect_key(url)
+        if not key:
+            return url
+        with self._lock:
+            self._load()
+            entry = self._map.get(key)
+        if entry and time.time() - entry.get("resolved_at", 0) < self.ttl_seconds:
+            return entry["final_url"]
+        return url
+
+    def record(self, source_url, final_url):
+        """
+        Remember that source_url redirects to final_url
+        """
+        key = _redirect_key(source_url)
+        final_url = _redirect_key(final_url)
+        if not key or not final_url or key == final_url:
+            return
+        with self._lock:
+            self._load()
+            self._map[key] = {"final_url": final_url, "resolved_at": time.time()}
+            self._dirty = True
+
+    def record_response(self, source_url, response):
+        """
+        Record the redirect chain of a requests response (every hop maps to the final URL)
+        Chains that end on an error or a not-modified response are not recorded
+        """
+        if not getattr(response, "history", None):
+            return
+        if not 200 <= response.status_code < 300:
+            return
+        final_url = response.url
+        self.record(source_url, final_url)
+        for hop in response.history:
+            self.record(hop.url, final_url)
+
+    def save(self):
+        """
+        Write the map back to disk if it changed
+        """
+        with self._lock:
+            if not self._dirty or self._map is None:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+                tmp_path = f"{self.cache_path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._map, f, ensure_ascii=False)
+                os.replace(tmp_path, self.cache_path)
+                self._dirty = False
+                logger.info(f"Saved redirect cache with {len(self._map)} entries")
+            except Exception as e:
+                logger.warning(f"Failed to save redirect cache: {str(e)}")
+
+
+# Global redirect cache instance
+redirect_cache = RedirectCache()
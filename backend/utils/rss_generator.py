@@ -1,13 +1,12 @@
 import logging
 import os
-from datetime import datetime
 from email.utils import formatdate # For RFC 822 date format
 import html # To escape characters in XML
-from dateutil import parser as date_parser # For flexible date parsing
 import json
 
 # Import the config variable
 from config.config import RSS_FEED_LINK
+from utils.time_utils import item_epoch
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +16,7 @@ def generate_rss_feed(news_items, output_path, feed_title="WiseCrawl Aggregated
 
     Args:
         news_items (list): A list of dictionaries, where each dict represents a news item.
-                           Expected keys: 'title', 'url', 'summary', 'timestamp' (Unix ms) or 'published'/'extracted_time'.
+                           Expected keys: 'title', 'url', 'summary', 'timestamp' (Unix ms) or 'time'/'published'/'extracted_time'.
         output_path (str): The full path where the RSS XML file should be saved.
         feed_title (str): The title of the RSS feed.
         feed_link (str): The URL of the website associated with the feed.
@@ -52,36 +51,12 @@ def generate_rss_feed(news_items, output_path, feed_title="WiseCrawl Aggregated
         guid = link
 
         pub_date_str = ""
-        try:
-            timestamp_ms = item.get('timestamp')
-            published_str = item.get('published')
-            extracted_time_str = item.get('extracted_time')
-
-            dt = None
-            if timestamp_ms:
-                dt = datetime.fromtimestamp(timestamp_ms / 1000.0)
-            elif published_str:
-                 try:
-                     dt = datetime.strptime(published_str, "%Y-%m-%d %H:%M:%S")
-                 except ValueError:
-                     logger.warning(f"Could not parse published_str '{published_str}' for '{title}'. Trying dateutil parser.")
-                     try:
-                         dt = date_parser.parse(published_str)
-                     except Exception as e_parse:
-                         logger.warning(f"dateutil failed to parse '{published_str}': {e_parse}")
-            elif extracted_time_str:
-                 try:
-                    dt = datetime.fromisoformat(extracted_time_str.replace('Z', '+00:00'))
-                 except ValueError:
-                    logger.warning(f"Could not parse extracted_time_str '{extracted_time_str}' for '{title}'.")
-
-            if dt:
-                pub_date_str = formatdate(dt.timestamp(), localtime=True)
-            else:
-                 logger.warning(f"Missing valid date for item: '{title}'.")
-
-        except Exception as e:
-            logger.error(f"Error processing date for item '{title}': {e}")
+        # Times were normalized at ingestion, item_epoch() also parses any leftover string fields
+        epoch = item_epoch(item)
+        if epoch is not None:
+            pub_date_str = formatdate(epoch, localtime=True)
+        else:
+            logger.warning(f"Missing valid date for item: '{title}'.")
 
         # Escape content
         escaped_title = html.escape(title)
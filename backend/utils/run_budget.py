@@ -0,0 +1,122 @@
+import time
+import logging
+from threading import Lock
+from contextlib import contextmanager
+
+from config.config import (
+    RUN_DEADLINE_MINUTES, RUN_DEADLINE_RESERVE_MINUTES, RUN_DEADLINE_FETCH_MARGIN_MINUTES, RUN_TOKEN_BUDGET
+)
+from utils.token_tracker import token_tracker
+
+logger = logging.getLogger(__name__)
+
+# At most this share of the run deadline is reserved for the digest and notification
+MAX_RESERVE_SHARE = 0.5
+
+
+class RunBudget:
+    """
+    Wall-clock budget of one run
+
+    Processing must end RUN_DEADLINE_RESERVE_MINUTES (at most half of the deadline) before the
+    deadline so the digest and notification still go out in time; new webpage fetches stop
+    RUN_DEADLINE_FETCH_MARGIN_MINUTES before that so items already downloaded can still be
+    summarized. Also keeps the time spent per stage, the number of degraded items and the number
+    of items per summary tier (see processor.summary_policy) for the end-of-run report.
+    A deadline of 0 disables all time limits. Optional work (retries) also stops once the
+    tokens recorded by token_tracker reach RUN_TOKEN_BUDGET (0 means unlimited).
+    """
+
+    def __init__(self, deadline_minutes=RUN_DEADLINE_MINUTES, reserve_minutes=RUN_DEADLINE_RESERVE_MINUTES,
+                 fetch_margin_minutes=RUN_DEADLINE_FETCH_MARGIN_MINUTES, token_budget=RUN_TOKEN_BUDGET):
+        self.deadline_seconds = deadline_minutes * 60
+        self.reserve_seconds = reserve_minutes * 60
+        # A reserve as long as the deadline would leave no time for processing at all
+        if self.deadline_seconds and self.reserve_seconds > self.deadline_seconds * MAX_RESERVE_SHARE:
+            self.reserve_seconds = self.deadline_seconds * MAX_RESERVE_SHARE
+            logger.warning(f"Run deadline reserve of {reserve_minutes} minutes does not fit the {deadline_minutes} minute "
+                           f"deadline, reserving {self.reserve_seconds / 60:.1f} minutes instead")
+        self.fetch_margin_seconds = fetch_margin_minutes * 60
+        self.token_budget = token_budget
+        self._lock = Lock()
+        self.start()
+
+    def start(self):
+        """
+        Start (or restart) the clock and clear the statistics
+        """
+        self.started_at = time.monotonic()
+        self.stage_seconds = {}
+        self.degraded = {}
+        self.summary_tiers = {}
+
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+    def processing_time_left(self):
+        """
+        Seconds left for fetching and summarizing items, None if there is no deadline
+        """
+        if not self.deadline_seconds:
+            return None
+        return self.deadline_seconds - self.reserve_seconds - self.elapsed()
+
+    def can_fetch(self):
+        left = self.processing_time_left()
+        return left is None or left > self.fetch_margin_seconds
+
+    def can_summarize(self):
+        left = self.processing_time_left()
+        return left is None or left > 0
+
+    def tokens_used(self):
+        return sum(usage.get("total_tokens", 0) for usage in token_tracker.get_usage().values())
+
+    def can_retry(self):
+        """
+        True if there is still time for a fetch and the token budget is not used up
+        """
+        if self.token_budget and self.tokens_used() >= self.token_budget:
+            return False
+        return self.can_fetch()
+
+    def add_stage_time(self, stage, seconds):
+        with self._lock:
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0) + seconds
+
+    @contextmanager
+    def stage(self, stage):
+        """
+        Measure the time spent in a block of code as `stage`
+        """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add_stage_time(stage, time.monotonic() - start)
+
+    def record_degraded(self, reason):
+        with self._lock:
+            self.degraded[reason] = self.degraded.get(reason, 0) + 1
+
+    def record_summary_tier(self, tier):
+        with self._lock:
+            self.summary_tiers[tier] = self.summary_tiers.get(tier, 0) + 1
+
+    def report(self):
+        """
+        Log the time spent per stage, the items per summary tier and the items degraded
+        because of the deadline
+        """
+        stages = ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in self.stage_seconds.items())
+        logger.info(f"Run finished in {self.elapsed():.1f}s, time per stage: {stages or 'n/a'}")
+        if self.summary_tiers:
+            tiers = ", ".join(f"{tier} {count}" for tier, count in self.summary_tiers.items())
+            logger.info(f"Items per summary tier: {tiers}")
+        if self.degraded:
+            degraded = ", ".join(f"{reason} {count}" for reason, count in self.degraded.items())
+            logger.warning(f"Items degraded by the run deadline: {degraded}")
+
+
+# Global run budget instance
+run_budget = RunBudget()
@@ -0,0 +1,102 @@
+import os
+import json
+import logging
+from datetime import datetime
+
+from utils.utils import get_project_root, get_sidecar_path, read_jsonl
+from utils.news_item import NewsItem
+
+logger = logging.getLogger(__name__)
+
+# Stages of a run in execution order
+RUN_STAGES = ("collected", "processed", "saved", "notified")
+
+
+class RunManifest:
+    """
+    Checkpoint of the current run, used by `wisecrawl_main.py --resume`
+
+    Records when each stage finished and where its output lives. Per-item completion is
+    the sidecar JSONL of the merged snapshot (see utils.get_sidecar_path), which is appended
+    as soon as an item is processed, so an interrupted run loses at most the items in flight.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(get_project_root(), "data", "runs", "run_manifest.json")
+        self.data = {}
+
+    def load(self):
+        """
+        Load the manifest of the last run, returns False if there is none
+        """
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to load run manifest {self.path}: {str(e)}")
+            self.data = {}
+            return False
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Failed to save run manifest {self.path}: {str(e)}")
+
+    def start(self):
+        """
+        Begin a new run, discarding the checkpoint of the previous one
+        """
+        now = datetime.now()
+        self.data = {
+            "run_id": now.strftime("%Y-%m-%d_%H-%M-%S"),
+            "started_at": now.isoformat(),
+            "status": "running",
+            "stages": {},
+        }
+        self.save()
+
+    def complete_stage(self, stage, **info):
+        """
+        Mark a stage as finished, with optional details (output paths, counts)
+        """
+        self.data.setdefault("stages", {})[stage] = {"completed_at": datetime.now().isoformat(), **info}
+        self.save()
+
+    def is_stage_done(self, stage):
+        return stage in self.data.get("stages", {})
+
+    def stage_info(self, stage):
+        return self.data.get("stages", {}).get(stage, {})
+
+    def finish(self):
+        self.data["status"] = "completed"
+        self.data["finished_at"] = datetime.now().isoformat()
+        self.save()
+
+    def is_resumable(self):
+        """
+        True if the last run was interrupted after its collected items were saved
+        """
+        merged_file_path = self.stage_info("collected").get("merged_file_path")
+        return (self.data.get("status") == "running" and bool(merged_file_path)
+                and os.path.exists(merged_file_path))
+
+    def load_collected_items(self):
+        """
+        Return (items, completed_records) of the interrupted run: the merged snapshot and the
+        processed records already appended to its sidecar
+        """
+        merged_file_path = self.stage_info("collected")["merged_file_path"]
+        items = [NewsItem(record) for record in read_jsonl(merged_file_path)]
+        for item in items:
+            # Added when the snapshot was written, not part of the item
+            item.pop("saved_at", None)
+        return items, read_jsonl(get_sidecar_path(merged_file_path))
@@ -0,0 +1,59 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSingleFlight:
+    """
+    Coalesces concurrent calls with the same key among coroutines on one event loop
+
+    The first caller of a key (the leader) runs the function; callers arriving while it
+    runs wait for its result (or exception) instead of running it again. Nothing is kept
+    after the call finishes, caching is up to the function.
+
+    Besides do(), claim()/release() let a caller lead several keys at once (one batch
+    request for many articles) while other callers wait on the individual keys.
+    """
+
+    def __init__(self):
+        self._calls = {}
+
+    def claim(self, key):
+        """
+        Return (future, leader); the leader must call release(key, ...) when done
+        """
+        future = self._calls.get(key)
+        if future is not None and not future.done():
+            return future, False
+        future = self._calls[key] = asyncio.get_running_loop().create_future()
+        return future, True
+
+    def release(self, key, result=None, error=None):
+        future = self._calls.pop(key, None)
+        if future is None or future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+            # Mark it retrieved, there may be no waiter to do it
+            future.exception()
+        else:
+            future.set_result(result)
+
+    async def do(self, key, func, *args, **kwargs):
+        future, leader = self.claim(key)
+        if not leader:
+            logger.debug(f"Waiting for in-flight call {key}")
+            # Shielded so a cancelled waiter does not cancel the leader's result
+            return await asyncio.shield(future)
+        try:
+            result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            # Waiters get an ordinary error, cancellation stays with the cancelled task
+            self.release(key, error=RuntimeError(f"In-flight call {key} was cancelled"))
+            raise
+        except Exception as e:
+            self.release(key, error=e)
+            raise
+        self.release(key, result)
+        return result
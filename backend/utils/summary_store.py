@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+
+from config.config import SUMMARY_CACHE_TTL_DAYS, SUMMARY_CACHE_MAX_ENTRIES
+from utils.utils import get_backend_dir
+
+logger = logging.getLogger(__name__)
+
+# Whole-dict pickle used before the SQLite store, removed by prune()
+LEGACY_CACHE_FILE = "summary_cache.pkl"
+
+
+class SummaryStore:
+    """
+    SQLite cache of content model results, keyed by (content hash, model id, prompt version)
+
+    Each lookup and write touches a single row, so the cost does not grow with the cache
+    size. The database runs in WAL mode and every thread uses its own connection, so
+    workers can read while another one writes and concurrent writes are not lost.
+    Entries expire after ttl_days; prune() also evicts the least recently used entries
+    beyond max_entries.
+    """
+
+    def __init__(self, cache_dir="cache/summary", ttl_days=SUMMARY_CACHE_TTL_DAYS,
+                 max_entries=SUMMARY_CACHE_MAX_ENTRIES):
+        self.cache_dir = os.path.join(get_backend_dir(), cache_dir)
+        self.path = os.path.join(self.cache_dir, "summaries.db")
+        self.ttl_seconds = ttl_days * 24 * 3600
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        with self._init_lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                with conn:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS summaries ("
+                        " content_hash TEXT NOT NULL, model TEXT NOT NULL, prompt_version TEXT NOT NULL,"
+                        " result TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL,"
+                        " PRIMARY KEY (content_hash, model, prompt_version))"
+                    )
+                    conn.execute("CREATE INDEX IF NOT EXISTS idx_summaries_accessed ON summaries (accessed_at)")
+                self._initialized = True
+            conn.execute("PRAGMA synchronous=NORMAL")
+        self._local.conn = conn
+        return conn
+
+    def get(self, content_hash, model, prompt_version):
+        """
+        Return the cached result dict, None if missing, expired or unreadable
+        """
+        if not content_hash:
+            return None
+        key = (content_hash, model, prompt_version)
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT result, created_at FROM summaries WHERE content_hash = ? AND model = ? AND prompt_version = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row[1] > self.ttl_seconds:
+                return None
+            with conn:
+                conn.execute(
+                    "UPDATE summaries SET accessed_at = ? WHERE content_hash = ? AND model = ? AND prompt_version = ?",
+                    (now,) + key,
+                )
+            return json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Failed to read summary cache: {str(e)}")
+            return None
+
+    def put(self, content_hash, model, prompt_version, result):
+        """
+        Store (or replace) the result for the key in its own transaction
+        """
+        if not content_hash:
+            return
+        now = time.time()
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO summaries"
+                    " (content_hash, model, prompt_version, result, created_at, accessed_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (content_hash, model, prompt_version, json.dumps(result, ensure_ascii=False), now, now),
+                )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Failed to write summary cache: {str(e)}")
+
+    def prune(self):
+        """
+        Delete expired entries, then the least recently used ones beyond max_entries
+        """
+        legacy_path = os.path.join(self.cache_dir, LEGACY_CACHE_FILE)
+        if os.path.exists(legacy_path):
+            try:
+                os.remove(legacy_path)
+            except OSError:
+                pass
+        if not os.path.exists(self.path):
+            return
+        try:
+            conn = self._connect()
+            with conn:
+                expired = conn.execute(
+                    "DELETE FROM summaries WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+                ).rowcount
+                evicted = conn.execute(
+                    "DELETE FROM summaries WHERE rowid IN ("
+                    " SELECT rowid FROM summaries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                ).rowcount
+                remaining = conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            logger.info(f"Summary cache pruned: removed {expired} expired and {evicted} least recently used entries, "
+                        f"{remaining} entries left")
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to prune summary cache: {str(e)}")
+
+
+# Global summary store instance
+summary_store = SummaryStore()
@@ -0,0 +1,191 @@
+import re
+import time
+import logging
+import calendar
+from threading import Lock
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+
+logger = logging.getLogger(__name__)
+
+# Timestamps above this are in milliseconds (10^10 seconds is the year 2286)
+MILLISECOND_THRESHOLD = 9999999999
+# Numeric strings taken as epoch seconds (9-10 digits) or milliseconds (12-13 digits); other
+# digit strings such as "20250510" are dates and go through TIME_FORMATS
+_EPOCH_STRING_PATTERN = re.compile(r'^(\d{9,10}|\d{12,13})(\.\d+)?$')
+# Item time fields in order of trust
+ITEM_TIME_FIELDS = ("timestamp", "time", "published", "extracted_time")
+
+# Formats seen in the sources; naive ones are local time (hot list API, our own RSS/tweet fields)
+TIME_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y/%m/%d %H:%M",
+    "%Y/%m/%d",
+    "%a %b %d %H:%M:%S %z %Y",  # Twitter createdAt
+    "%Y年%m月%d日 %H:%M",
+    "%Y年%m月%d日",
+    "%Y%m%d%H%M%S",
+    "%Y%m%d",
+)
+# Marker for values handled by fromisoformat / RFC 822 parsing in the format cache
+_ISO = "iso"
+_RFC822 = "rfc822"
+
+
+def struct_time_to_epoch(struct):
+    """
+    Convert a UTC time.struct_time (feedparser *_parsed fields) to epoch seconds
+
+    time.mktime() would treat it as local time and shift it by the local UTC offset.
+    """
+    return calendar.timegm(struct)
+
+
+def feed_entry_epoch(entry):
+    """
+    Publish (or update) time of a feedparser entry in epoch seconds, None if missing
+    """
+    for field in ("published_parsed", "updated_parsed"):
+        struct = getattr(entry, field, None)
+        if struct:
+            return struct_time_to_epoch(struct)
+    return None
+
+
+def _as_epoch(dt):
+    # Naive datetimes are taken as local time
+    return dt.timestamp()
+
+
+class TimeNormalizer:
+    """
+    Converts any timestamp found in items (epoch s/ms as numbers or numeric strings, ISO 8601, RFC 822,
+    the formats in TIME_FORMATS) to epoch seconds
+
+    The format that worked last is remembered per source and tried first, so items of the
+    same source are usually parsed with a single attempt.
+    """
+
+    def __init__(self):
+        self._formats = {}
+        self._lock = Lock()
+
+    def _parse_string(self, value, fmt):
+        if fmt == _ISO:
+            return _as_epoch(datetime.fromisoformat(value.replace('Z', '+00:00')))
+        if fmt == _RFC822:
+            return _as_epoch(parsedate_to_datetime(value))
+        return _as_epoch(datetime.strptime(value, fmt))
+
+    def to_epoch(self, value, source=""):
+        """
+        Return epoch seconds for value, None if it is empty or cannot be parsed
+        """
+        if value is None or value == "" or isinstance(value, bool):
+            return None
+        if isinstance(value, datetime):
+            return _as_epoch(value)
+        if isinstance(value, (int, float)):
+            epoch = float(value)
+        else:
+            value = str(value).strip()
+            if not value:
+                return None
+            if not _EPOCH_STRING_PATTERN.match(value):
+                return self._parse_text(value, source)
+            epoch = float(value)
+        if epoch <= 0:
+            return None
+        return epoch / 1000 if epoch > MILLISECOND_THRESHOLD else epoch
+
+    def _parse_text(self, value, source):
+        cached = self._formats.get(source)
+        candidates = ((cached,) if cached else ()) + (_ISO,) + TIME_FORMATS + (_RFC822,)
+        for fmt in candidates:
+            try:
+                epoch = self._parse_string(value, fmt)
+            except (ValueError, TypeError, IndexError, OverflowError):
+                continue
+            if fmt != cached:
+                with self._lock:
+                    self._formats[source] = fmt
+            return epoch
+        logger.debug(f"Unrecognized time format from {source or 'unknown source'}: {value}")
+        return None
+
+    def item_epoch(self, item):
+        """
+        Epoch seconds of an item from the first parseable time field, None if there is none
+        """
+        source = item.get("source", "")
+        for field in ITEM_TIME_FIELDS:
+            epoch = self.to_epoch(item.get(field), source)
+            if epoch is not None:
+                return epoch
+        return None
+
+
+# Global time normalizer instance
+time_normalizer = TimeNormalizer()
+
+
+def to_epoch(value, source=""):
+    return time_normalizer.to_epoch(value, source)
+
+
+def item_epoch(item):
+    return time_normalizer.item_epoch(item)
+
+
+def normalize_item_times(items):
+    """
+    Store every item's time as an epoch millisecond `timestamp` (done once at ingestion,
+    later filters and the RSS feed read it without parsing). Returns the items.
+    """
+    for item in items:
+        epoch = item_epoch(item)
+        if epoch is not None:
+            item["timestamp"] = int(epoch * 1000)
+    return items
+
+
+def window_start(days, now=None):
+    """
+    Start of a window of `days` full days before today, e.g. days=1 -> yesterday 00:00 local time
+    """
+    now = now or datetime.now()
+    start = now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days)
+    return start.timestamp()
+
+
+def filter_by_window(items, start, end=None, keep_unknown=True, future_tolerance=3600, label="items"):
+    """
+    Keep the items whose time lies in [start, end] (epoch seconds, end defaults to now)
+
+    Items up to future_tolerance seconds ahead of end are kept (clock skew). Items without a
+    parseable time are kept if keep_unknown is True. Logs one summary line instead of one per item.
+    """
+    end = end or time.time()
+    kept = []
+    outside = unknown = 0
+    for item in items:
+        epoch = item_epoch(item)
+        if epoch is None:
+            unknown += 1
+            if keep_unknown:
+                kept.append(item)
+            continue
+        if start <= epoch <= end + future_tolerance:
+            kept.append(item)
+        else:
+            outside += 1
+            logger.debug(f"Outside time window: {item.get('title', '')}, time: {datetime.fromtimestamp(epoch)}")
+    start_text = datetime.fromtimestamp(start).strftime("%Y-%m-%d %H:%M")
+    end_text = datetime.fromtimestamp(end).strftime("%Y-%m-%d %H:%M")
+    logger.info(f"Time window {start_text} - {end_text}: kept {len(kept)}/{len(items)} {label}, "
+                f"{outside} outside the window, {unknown} without time ({'kept' if keep_unknown else 'dropped'})")
+    return kept
+
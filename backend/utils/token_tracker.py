@@ -1,42 +1,179 @@
+import os
+import re
+import json
 import logging
+from copy import deepcopy
+from datetime import datetime
+from threading import Lock
 from typing import Dict
 
+from utils.utils import get_project_root
+
 logger = logging.getLogger(__name__)
 
+_CJK_PATTERN = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]')
+# Latin words, numbers and single punctuation marks, each roughly one token
+_WORD_PATTERN = re.compile(r'[A-Za-z]+|\d+|[^\sA-Za-z\d]')
+
+
+def estimate_tokens(text):
+    """
+    Local token count used when the API does not report usage: one token per CJK
+    character, about four characters per token for words, one per number or symbol
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK_PATTERN.findall(text))
+    other = _CJK_PATTERN.sub(' ', text)
+    return cjk + sum((len(word) + 3) // 4 for word in _WORD_PATTERN.findall(other))
+
+
+def _new_counters():
+    return {
+        'prompt_tokens': 0,
+        'completion_tokens': 0,
+        'total_tokens': 0,
+        'requests': 0,
+        'estimated_requests': 0,  # Requests whose usage was estimated locally
+        'latency_seconds': 0.0,
+    }
+
+
+def _with_rates(counters):
+    """
+    Counters plus average latency and generation speed (completion tokens per second)
+    """
+    result = dict(counters)
+    result['latency_seconds'] = round(counters['latency_seconds'], 3)
+    requests = counters['requests']
+    latency = counters['latency_seconds']
+    result['avg_latency_seconds'] = round(latency / requests, 3) if requests else 0.0
+    result['tokens_per_second'] = round(counters['completion_tokens'] / latency, 2) if latency else 0.0
+    return result
+
+
 class TokenTracker:
+    """
+    Token usage per model, per stage (summary, batch_summary, digest, ...) and per item source
+
+    Thread-safe: model requests are recorded from the event loop and from worker threads.
+    A batch request covering items of several sources splits its tokens between them by weight.
+    """
+
     def __init__(self):
-        self._token_usage = {}  # model -> {prompt_tokens, completion_tokens, total_tokens}
-        
-    def add_usage(self, model: str, prompt_tokens: int, completion_tokens: int):
-        """Add token usage for a model."""
-        if model not in self._token_usage:
-            self._token_usage[model] = {
-                'prompt_tokens': 0,
-                'completion_tokens': 0,
-                'total_tokens': 0
-            }
-            
-        self._token_usage[model]['prompt_tokens'] += prompt_tokens
-        self._token_usage[model]['completion_tokens'] += completion_tokens
-        self._token_usage[model]['total_tokens'] += (prompt_tokens + completion_tokens)
-    
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._token_usage = {}  # model -> counters
+            self._stage_usage = {}  # stage -> counters
+            self._source_usage = {}  # source -> counters
+
+    @staticmethod
+    def _add(table, key, prompt_tokens, completion_tokens, latency, estimated, requests=1):
+        counters = table.setdefault(key, _new_counters())
+        counters['prompt_tokens'] += prompt_tokens
+        counters['completion_tokens'] += completion_tokens
+        counters['total_tokens'] += prompt_tokens + completion_tokens
+        counters['requests'] += requests
+        if estimated:
+            counters['estimated_requests'] += requests
+        counters['latency_seconds'] += latency
+
+    def add_usage(self, model: str, prompt_tokens: int, completion_tokens: int, stage: str = None,
+                  source=None, latency: float = 0.0, estimated: bool = False):
+        """
+        Add token usage of one request
+        source is a source name or a {source: weight} dict for requests covering several items
+        """
+        with self._lock:
+            self._add(self._token_usage, model, prompt_tokens, completion_tokens, latency, estimated)
+            if stage:
+                self._add(self._stage_usage, stage, prompt_tokens, completion_tokens, latency, estimated)
+            if not source:
+                return
+            weights = source if isinstance(source, dict) else {source: 1}
+            total_weight = sum(weights.values()) or 1
+            for name, weight in weights.items():
+                share = weight / total_weight
+                # The request counts once per source, its tokens and latency are shared
+                self._add(self._source_usage, name, round(prompt_tokens * share),
+                          round(completion_tokens * share), latency * share, estimated)
+
+    def record_response(self, model, prompt_text, completion_text, usage=None, stage=None, source=None,
+                        latency=0.0):
+        """
+        Record a request from the usage returned by the API, estimating it locally when
+        the server does not report usage
+        """
+        if usage and usage.get("prompt_tokens") is not None:
+            self.add_usage(model, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0) or 0,
+                           stage=stage, source=source, latency=latency)
+        else:
+            self.add_usage(model, estimate_tokens(prompt_text), estimate_tokens(completion_text),
+                           stage=stage, source=source, latency=latency, estimated=True)
+
     def get_usage(self) -> Dict:
-        """Get the current token usage statistics."""
-        return self._token_usage
-    
+        """Get the current token usage statistics per model."""
+        with self._lock:
+            return deepcopy(self._token_usage)
+
+    def report(self) -> Dict:
+        """
+        Machine-readable usage report with per-model, per-stage and per-source breakdowns
+        """
+        with self._lock:
+            return {
+                'models': {model: _with_rates(c) for model, c in self._token_usage.items()},
+                'stages': {stage: _with_rates(c) for stage, c in self._stage_usage.items()},
+                'sources': {source: _with_rates(c) for source, c in self._source_usage.items()},
+            }
+
+    def save_report(self, path=None, extra=None):
+        """
+        Write the report as JSON (default data/reports/token_usage_<date>_<time>.json),
+        return the path or None on failure
+        """
+        if path is None:
+            now = datetime.now()
+            path = os.path.join(get_project_root(), "data", "reports",
+                                f"token_usage_{now.strftime('%Y-%m-%d')}_{now.strftime('%H-%M-%S')}.json")
+        report = {'generated_at': datetime.now().isoformat(), **(extra or {}), **self.report()}
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+            logger.info(f"Token usage report saved to {path}")
+            return path
+        except OSError as e:
+            logger.error(f"Failed to save token usage report {path}: {str(e)}")
+            return None
+
     def print_summary(self):
         """Print a summary of token usage."""
-        if not self._token_usage:
+        report = self.report()
+        if not report['models']:
             logger.info("No token usage recorded.")
             return
-            
+
         logger.info("\n=== Token Usage Summary ===")
-        for model, usage in self._token_usage.items():
+        for model, usage in report['models'].items():
             logger.info(f"\nModel: {model}")
             logger.info(f"Prompt tokens: {usage['prompt_tokens']}")
             logger.info(f"Completion tokens: {usage['completion_tokens']}")
             logger.info(f"Total tokens: {usage['total_tokens']}")
+            logger.info(f"Requests: {usage['requests']} ({usage['estimated_requests']} estimated), "
+                        f"avg latency {usage['avg_latency_seconds']}s, {usage['tokens_per_second']} tokens/s")
+        for title, table in (("Stage", report['stages']), ("Source", report['sources'])):
+            if table:
+                logger.info(f"\nBy {title.lower()}:")
+            for name, usage in sorted(table.items(), key=lambda entry: -entry[1]['total_tokens']):
+                logger.info(f"{title} {name}: {usage['total_tokens']} tokens in {usage['requests']} requests, "
+                            f"avg latency {usage['avg_latency_seconds']}s")
         logger.info("\n" + "="*24)
 
 # Global token tracker instance
-token_tracker = TokenTracker()
\ No newline at end of file
+token_tracker = TokenTracker()
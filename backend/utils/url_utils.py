@@ -0,0 +1,180 @@
+import re
+import hashlib
+import logging
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, unquote
+
+from utils.redirect_cache import redirect_cache
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that only track the click and never change the page
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "yclid", "msclkid", "dclid", "mc_cid", "mc_eid", "igshid",
+    "spm", "ref_src", "ref_url", "share_source", "share_medium", "share_token",
+    "share_from", "_hsenc", "_hsmi", "tt_from", "isappinstalled",
+    # WeChat article share parameters (__biz/mid/idx/sn identify the article and are kept)
+    "chksm", "scene", "srcid", "sharer_sharetime", "sharer_shareid", "sharer_shareinfo",
+    "sharer_shareinfo_first", "clicktime", "enterid", "ascene", "devicetype",
+    "nettype", "exportkey", "pass_ticket", "wx_header",
+}
+TRACKING_PARAM_PREFIXES = ("utm_", "hmsr", "hmpl", "hmcu", "hmkw", "hmci")
+# Generic parameter names that only track the click on some hosts (keyed by canonical host);
+# elsewhere they can select the page (e.g. "from" for pagination), so they are kept
+HOST_TRACKING_PARAMS = {
+    "mp.weixin.qq.com": {"from"},
+    "weibo.com": {"from"},
+    "bilibili.com": {"from", "spm_id_from", "from_spmid", "vd_source"},
+}
+
+# Mobile hosts that serve the same article as the desktop host
+MOBILE_HOST_PREFIXES = ("m.", "mobile.", "wap.", "3g.")
+MOBILE_HOST_MAP = {
+    "mobile.twitter.com": "twitter.com",
+    "x.com": "twitter.com",
+    "mobile.x.com": "twitter.com",
+    "m.weibo.cn": "weibo.com",
+}
+
+# Proxy hosts whose path is the original URL, e.g. https://r4l.deno.dev/https://linux.do/...
+PATH_PROXY_HOSTS = {"r4l.deno.dev"}
+# Redirector hosts that carry the target URL in a query parameter
+QUERY_REDIRECTORS = {
+    "www.google.com": ("q", "url"),
+    "google.com": ("q", "url"),
+    "link.zhihu.com": ("target",),
+    "link.juejin.cn": ("target",),
+    "links.jianshu.com": ("to",),
+    "www.jianshu.com": ("to",),
+    "l.facebook.com": ("u",),
+    "out.reddit.com": ("url",),
+}
+
+_EMBEDDED_URL_RE = re.compile(r'^/+(https?:/{1,2}.+)$', re.IGNORECASE)
+
+
+def _unwrap_redirector(parts):
+    """
+    Return the wrapped target URL if parts point to a known redirector/proxy, else None
+    """
+    host = parts.netloc.lower()
+    if host in PATH_PROXY_HOSTS:
+        match = _EMBEDDED_URL_RE.match(parts.path)
+        if match:
+            target = match.group(1)
+            # Proxies sometimes collapse "https://" to "https:/"
+            target = re.sub(r'^(https?):/(?!/)', r'\1://', target, flags=re.IGNORECASE)
+            if parts.query:
+                target = f"{target}?{parts.query}"
+            return target
+    if host in QUERY_REDIRECTORS:
+        params = dict(parse_qsl(parts.query, keep_blank_values=True))
+        for name in QUERY_REDIRECTORS[host]:
+            value = params.get(name)
+            if value and value.lower().startswith(("http://", "https://")):
+                return unquote(value)
+    return None
+
+
+def _canonical_host(host):
+    host = host.lower().rstrip('.')
+    # Drop default ports
+    if host.endswith(":80") or host.endswith(":443"):
+        host = host.rsplit(':', 1)[0]
+    if host in MOBILE_HOST_MAP:
+        return MOBILE_HOST_MAP[host]
+    if host.startswith("www."):
+        host = host[4:]
+    for prefix in MOBILE_HOST_PREFIXES:
+        # Keep at least a registrable domain (m.example.com -> example.com, not m.com -> com)
+        if host.startswith(prefix) and host.count('.') >= 2:
+            host = host[len(prefix):]
+            break
+    return host
+
+
+def _is_tracking_param(name, host):
+    name = name.lower()
+    return (name in TRACKING_PARAMS or name.startswith(TRACKING_PARAM_PREFIXES)
+            or name in HOST_TRACKING_PARAMS.get(host, ()))
+
+
+def canonicalize_url(url, resolve_redirects=True):
+    """
+    Normalize a URL so that variants of the same page compare equal
+
+    If resolve_redirects is True, shortened/proxied links whose redirect chain was seen
+    before (t.co, RSSHub, ...) are first replaced by their recorded final URL.
+    Unwraps known redirectors/proxies, unifies the scheme to https, lowercases the host,
+    drops www/mobile host prefixes, default ports, tracking parameters, fragments and
+    trailing slashes, and sorts the remaining query parameters.
+    The result is an identity key, it is not meant to be fetched.
+    """
+    if not url or not isinstance(url, str):
+        return ""
+    url = url.strip()
+    try:
+        if resolve_redirects:
+            url = redirect_cache.resolve(url)
+        # Redirectors can be nested (proxy -> google -> page)
+        for _ in range(3):
+            parts = urlsplit(url)
+            target = _unwrap_redirector(parts)
+            if not target:
+                break
+            url = target
+
+        parts = urlsplit(url)
+        if parts.scheme.lower() not in ("http", "https", ""):
+            return url
+        host = _canonical_host(parts.netloc)
+        if not host:
+            return url
+
+        path = re.sub(r'/{2,}', '/', parts.path or "/")
+        if len(path) > 1:
+            path = path.rstrip('/')
+            for index_name in ("/index.html", "/index.htm", "/index.php"):
+                if path.endswith(index_name):
+                    path = path[:-len(index_name)] or "/"
+                    break
+
+        query_items = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if not _is_tracking_param(k, host)]
+        query = urlencode(sorted(query_items))
+
+        return urlunsplit(("https", host, path, query, ""))
+    except Exception as e:
+        logger.warning(f"Failed to canonicalize URL {url}: {str(e)}")
+        return url
+
+
+def get_item_id(item, resolve_redirects=True):
+    """
+    Stable item id: hash of the canonical URL, or of source + title for items without a URL
+    """
+    canonical = canonicalize_url(item.get("url", ""), resolve_redirects=resolve_redirects)
+    # Placeholder links such as "#" do not identify anything
+    if canonical.startswith("https://"):
+        key = canonical
+    else:
+        key = f"{item.get('source', '')}|{item.get('title', '')}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+def get_item_ids(item):
+    """
+    Every id the item may be known under: its item_id, the id with the currently known
+    redirects resolved, and the id of the URL as collected (used before its redirect was learned)
+    """
+    ids = [item.get("item_id"), get_item_id(item), get_item_id(item, resolve_redirects=False)]
+    return list(dict.fromkeys(i for i in ids if i))
+
+
+def assign_item_ids(items):
+    """
+    Set the item_id field on every item (kept if already present), return the items
+    """
+    for item in items:
+        if not item.get("item_id"):
+            item["item_id"] = get_item_id(item)
+    return items
@@ -1,9 +1,7 @@
 import os
 import hashlib
-import pickle
 import json
 import logging
-from pathlib import Path
 from datetime import datetime
 import time
 
@@ -50,7 +48,7 @@ def save_hotspots_to_jsonl(hotspots, directory="data"):
         with open(filename, 'w', encoding='utf-8') as f:
             for item in hotspots:
                 # Add timestamp
-                item_with_timestamp = item.copy()
+                item_with_timestamp = dict(item)
                 item_with_timestamp['saved_at'] = datetime.now().isoformat()
                 f.write(json.dumps(item_with_timestamp, ensure_ascii=False) + '\n')
         
@@ -60,52 +58,54 @@ def save_hotspots_to_jsonl(hotspots, directory="data"):
         logger.error(f"Error saving hotspot data: {str(e)}")
         return None
 
-def get_content_hash(content):
+def get_sidecar_path(jsonl_path):
     """
-    Calculate content hash for cache identification
+    Path of the append-only sidecar holding processed updates for a JSONL snapshot
     """
-    if not content:
-        return None
-    return hashlib.md5(content.encode('utf-8')).hexdigest()
+    base = jsonl_path[:-len(".jsonl")] if jsonl_path.endswith(".jsonl") else jsonl_path
+    return f"{base}.processed.jsonl"
 
-def load_summary_cache(cache_dir="cache/summary"):
+def append_jsonl(path, records):
     """
-    Load summary cache from backend directory
+    Append records to a JSONL file and flush, so completed work survives a crash
     """
-    try:
-        # Get backend directory
-        backend_dir = get_backend_dir()
-        # Build absolute path from backend directory
-        abs_cache_dir = os.path.join(backend_dir, cache_dir)
-        cache_path = Path(abs_cache_dir) / "summary_cache.pkl"
-        if not cache_path.exists():
-            return {}
-        
-        with open(cache_path, 'rb') as f:
-            cache = pickle.load(f)
-            logger.info(f"Loaded summary cache with {len(cache)} entries")
-            return cache
-    except Exception as e:
-        logger.warning(f"Failed to load summary cache: {str(e)}")
-        return {}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(dict(record), ensure_ascii=False) + '\n')
+        f.flush()
 
-def save_summary_cache(cache, cache_dir="cache/summary"):
+def read_jsonl(path):
     """
-    Save summary cache in backend directory
+    Read all records of a JSONL file, skipping blank and truncated lines
     """
-    try:
-        # Get backend directory
-        backend_dir = get_backend_dir()
-        # Build absolute path from backend directory
-        abs_cache_dir = os.path.join(backend_dir, cache_dir)
-        cache_path = Path(abs_cache_dir)
-        cache_path.mkdir(parents=True, exist_ok=True)
-        
-        with open(cache_path / "summary_cache.pkl", 'wb') as f:
-            pickle.dump(cache, f)
-            logger.info(f"Saved summary cache with {len(cache)} entries")
-    except Exception as e:
-        logger.warning(f"Failed to save summary cache: {str(e)}")
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A crash can leave the last line half written
+                logger.warning(f"Skipping malformed line in {path}")
+    return records
+
+def get_record_key(record):
+    """
+    Key matching a sidecar record to its snapshot item; duplicates from different sources stay separate
+    """
+    return (record.get("item_id"), record.get("url", ""), record.get("source", ""))
+
+def get_content_hash(content):
+    """
+    Calculate content hash for cache identification
+    """
+    if not content:
+        return None
+    return hashlib.md5(content.encode('utf-8')).hexdigest()
 
 def check_base_url(base_url):
     """
@@ -8,22 +8,32 @@ warnings.filterwarnings("ignore", category=MarkupResemblesLocatorWarning)
 import os
 import sys
 import asyncio
+import time
+import argparse
 import logging
-from datetime import datetime, timedelta
-import re
-from bs4 import BeautifulSoup
+from datetime import datetime
 
 # Import configurations
 from config.config import (
     TECH_SOURCES, ALL_SOURCES, WEBHOOK_URL, DEEPSEEK_API_KEY, 
     CONTENT_MODEL_API_KEY, BASE_URL, DEEPSEEK_API_URL, DEEPSEEK_MODEL_ID,
     RSS_URL, RSS_DAYS, TITLE_LENGTH, MAX_WORKERS, FILTER_DAYS, RSS_FEEDS,
-    RSS_FEED_LINK, XKIT_TWITTER_FEED, XKIT_TWITTER_FEED_URL
+    RSS_FEED_LINK, XKIT_TWITTER_FEED, XKIT_TWITTER_FEED_URL, DIGEST_MAX_RETRIES
 )
 
 # Import utility functions
 from utils.utils import save_hotspots_to_jsonl, check_base_url, cleanup_old_files, get_project_root
 from utils.token_tracker import token_tracker
+from utils.html_text import clean_html_fields
+from utils.page_cache import page_cache
+from utils.blob_store import blob_store
+from utils.summary_store import summary_store
+from utils.url_utils import assign_item_ids, get_item_ids
+from utils.redirect_cache import redirect_cache
+from utils.run_manifest import RunManifest
+from utils.item_store import item_store
+from utils.run_budget import run_budget
+from utils.time_utils import filter_by_window, normalize_item_times, window_start
 
 # Import data collection modules
 from crawler.data_collector import (
@@ -33,6 +43,7 @@ from crawler.data_collector import (
 
 # Import processing module
 from processor.news_processor import process_hotspot_with_summary
+from processor.tech_classifier import tech_classifier
 
 # Import LLM integration module
 from llm_integration.summary_integration import summarize_with_deepseek
@@ -58,7 +69,92 @@ def str_to_bool(value):
         return value
     return value.lower() in ('true', '1', 't', 'y', 'yes')
 
+def collect_content(tech_only, base_url, filter_days, rss_url, rss_days, project_root):
+    """
+    Collect hotspots, RSS articles and recent tweets, return the merged item list
+    """
+    # Select information sources based on parameters
+    sources = TECH_SOURCES if tech_only else ALL_SOURCES
+    
+    # Collect hotspots
+    # Pass the cleaned base_url
+    hotspots = collect_all_hotspots(sources, base_url) # Pass the original base_url with potential slash
+    
+    if not hotspots:
+        logger.warning("No hotspot data collected, will try other sources...")
+        hotspots = [] # Ensure hotspots is a list
+    
+    # Save raw hotspot data
+    if hotspots:
+        raw_data_dir = os.path.join(project_root, "data", "raw")
+        save_hotspots_to_jsonl(hotspots, directory=raw_data_dir)
+    
+    # Filter recent hotspots
+    hotspots = filter_recent_hotspots(hotspots, filter_days)
+    
+    # Save filtered hotspot data
+    if hotspots:
+        filtered_data_dir = os.path.join(project_root, "data", "filtered")
+        save_hotspots_to_jsonl(hotspots, directory=filtered_data_dir)
+    
+    # Get RSS articles
+    # Prioritize RSS_FEEDS list, if empty use single RSS_URL
+    rss_articles = fetch_rss_articles(rss_url=rss_url, days=rss_days, rss_feeds=RSS_FEEDS)
+    
+    # Get Twitter Feed
+    twitter_feed_raw = fetch_twitter_feed(days_to_fetch=2) # Get last 2 days
+    
+    # Filter tweets, keep only last 24 hours (tweets without a timestamp are skipped)
+    recent_tweets = filter_by_window(twitter_feed_raw, time.time() - 86400, keep_unknown=False, label="tweets")
+    
+    # Merge hotspots, RSS articles and filtered tweets
+    all_content = hotspots + rss_articles + recent_tweets # Add recent_tweets
+    logger.info(f"Total {len(all_content)} items after merging (including tweets)")
+    
+    # Store every item's time as an epoch ms timestamp once, later filters and the RSS feed reuse it
+    normalize_item_times(all_content)
+    
+    # Assign stable ids from canonical URLs so duplicates across sources are processed once
+    assign_item_ids(all_content)
+    
+    return all_content
+
+def send_digest(manifest, content, deepseek_key, deepseek_url, model_id, webhook, tech_only):
+    """
+    Summarize the processed items with Deepseek and send the digest, once per run:
+    a resumed run whose digest was already sent skips it
+    """
+    if manifest.is_stage_done("notified"):
+        # Resumed after the digest was already sent, don't notify twice
+        logger.info("Notification was already sent by the interrupted run, skipping")
+        return
+    
+    # Use Deepseek for summarization
+    with run_budget.stage("digest"):
+        summary = summarize_with_deepseek(content, deepseek_key, deepseek_url, model_id,
+                                         max_retries=DIGEST_MAX_RETRIES, tech_only=tech_only)
+    
+    # Try multiple notification methods
+    with run_budget.stage("notify"):
+        success = notify(summary, tech_only)
+        if not success:
+            # If all configured notification methods fail, try original webhook as fallback
+            logger.warning("All configured notification methods failed, trying original webhook method")
+            send_to_webhook(webhook, summary, tech_only)
+    manifest.complete_stage("notified")
+
 def main():
+    parser = argparse.ArgumentParser(description="Collect, summarize and publish hotspot news")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the last interrupted run instead of collecting again")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only process items not handled by earlier runs and merge them with the stored items of the window")
+    args = parser.parse_args()
+    resume = args.resume
+    
+    # The run deadline (RUN_DEADLINE_MINUTES) counts from here
+    run_budget.start()
+    
     # Get project root directory for data paths
     project_root = get_project_root()
     
@@ -78,6 +174,7 @@ def main():
     max_workers = MAX_WORKERS
     skip_content = str_to_bool(os.getenv('SKIP_CONTENT', 'False')) # Keep env var override for this
     filter_days = FILTER_DAYS
+    incremental = args.incremental or str_to_bool(os.getenv('INCREMENTAL_MODE', 'False'))
     
     # --- DEBUGGING --- 
     # print(f"DEBUG: BASE_URL from config.py: '{BASE_URL}'")
@@ -99,83 +196,40 @@ def main():
         logger.error("No Content Model API Key provided. Please set CONTENT_MODEL_API_KEY in environment variables or set SKIP_CONTENT=True to skip content processing")
         sys.exit(1)
     
-    # Check if BASE_URL is accessible
-    # Clean the base_url before checking
-    cleaned_base_url = base_url.rstrip('/') # Remove trailing slash for check_base_url
-    # print(f"DEBUG: Value passed to check_base_url: '{cleaned_base_url}'") # Remove debug print
-    if not check_base_url(cleaned_base_url):
-        logger.error(f"BASE_URL {cleaned_base_url} is not accessible, exiting")
-        sys.exit(1)
-    
-    # Select information sources based on parameters
-    sources = TECH_SOURCES if tech_only else ALL_SOURCES
-    
-    # Collect hotspots
-    # Pass the cleaned base_url
-    hotspots = collect_all_hotspots(sources, base_url) # Pass the original base_url with potential slash
-    
-    if not hotspots:
-        logger.warning("No hotspot data collected, will try other sources...")
-        hotspots = [] # Ensure hotspots is a list
-    
-    # Save raw hotspot data
-    if hotspots:
-        raw_data_dir = os.path.join(project_root, "data", "raw")
-        save_hotspots_to_jsonl(hotspots, directory=raw_data_dir)
-    
-    # Filter recent hotspots
-    hotspots = filter_recent_hotspots(hotspots, filter_days)
-    
-    # Save filtered hotspot data
-    if hotspots:
-        filtered_data_dir = os.path.join(project_root, "data", "filtered")
-        save_hotspots_to_jsonl(hotspots, directory=filtered_data_dir)
-    
-    # Get RSS articles
-    # Prioritize RSS_FEEDS list, if empty use single RSS_URL
-    rss_articles = fetch_rss_articles(rss_url=rss_url, days=rss_days, rss_feeds=RSS_FEEDS)
-    
-    # Get Twitter Feed
-    twitter_feed_raw = fetch_twitter_feed(days_to_fetch=2) # Get last 2 days
-    
-    # Filter tweets, keep only last 24 hours
-    recent_tweets = []
-    cutoff_time_tweets = datetime.now() - timedelta(days=1)
-    if twitter_feed_raw:
-        logger.info(f"Start filtering tweets from last 24 hours (cutoff time: {cutoff_time_tweets})...")
-        for tweet in twitter_feed_raw:
-            if tweet.get("timestamp"): # Ensure timestamp exists
-                # Ensure timestamp is treated correctly (it's already in milliseconds from fetch_twitter_feed)
-                tweet_time_ms = tweet["timestamp"]
-                if isinstance(tweet_time_ms, (int, float)):
-                   tweet_time = datetime.fromtimestamp(tweet_time_ms / 1000)
-                   if tweet_time >= cutoff_time_tweets:
-                       recent_tweets.append(tweet)
-                   # else: # Uncomment to see discarded tweets
-                   #     logger.debug(f"Discarded older tweet: {tweet['title']} @ {tweet_time}")
-                else:
-                   logger.warning(f"Invalid tweet timestamp format: {tweet_time_ms}, type: {type(tweet_time_ms)}, skipping tweet: {tweet.get('title')}")
-
-            else:
-                 logger.warning(f"Tweet missing timestamp, cannot filter: {tweet.get('title')}")
-                 # Decide whether to include tweets without timestamps or skip them
-                 # For now, we skip them to ensure only recent ones are included
-                 # recent_tweets.append(tweet) # Uncomment to include tweets without timestamp
-
-        logger.info(f"After filtering, kept {len(recent_tweets)}/{len(twitter_feed_raw)} tweets from last 24 hours.")
-    
-    # Merge hotspots, RSS articles and filtered tweets
-    all_content = hotspots + rss_articles + recent_tweets # Add recent_tweets
-    logger.info(f"Total {len(all_content)} items after merging (including tweets)")
-    
-    # Check if there's any content after merging
-    if not all_content:
-        logger.error("No valid content from any source, exiting")
-        sys.exit(1)
+    # Checkpoint of this run; --resume continues the last interrupted run from it
+    manifest = RunManifest()
+    completed_records = None
+    if resume and manifest.load() and manifest.is_resumable():
+        merged_file_path = manifest.stage_info("collected")["merged_file_path"]
+        all_content, completed_records = manifest.load_collected_items()
+        logger.info(f"Resuming run {manifest.data.get('run_id')}: {len(all_content)} collected items, "
+                    f"{len(completed_records)} already processed")
+    else:
+        if resume:
+            logger.info("No interrupted run to resume, starting a new run")
+        manifest.start()
+        
+        # Check if BASE_URL is accessible
+        # Clean the base_url before checking
+        cleaned_base_url = base_url.rstrip('/') # Remove trailing slash for check_base_url
+        # print(f"DEBUG: Value passed to check_base_url: '{cleaned_base_url}'") # Remove debug print
+        if not check_base_url(cleaned_base_url):
+            logger.error(f"BASE_URL {cleaned_base_url} is not accessible, exiting")
+            sys.exit(1)
     
-    # Save merged data
-    merged_data_dir = os.path.join(project_root, "data", "merged")
-    save_hotspots_to_jsonl(all_content, directory=merged_data_dir)
+        
+        with run_budget.stage("collect"):
+            all_content = collect_content(tech_only, base_url, filter_days, rss_url, rss_days, project_root)
+        
+        # Check if there's any content after merging
+        if not all_content:
+            logger.error("No valid content from any source, exiting")
+            sys.exit(1)
+        
+        # Save merged data
+        merged_data_dir = os.path.join(project_root, "data", "merged")
+        merged_file_path = save_hotspots_to_jsonl(all_content, directory=merged_data_dir)
+        manifest.complete_stage("collected", merged_file_path=merged_file_path, items=len(all_content))
     
     # Get webpage content and generate summaries
     if not skip_content:
@@ -184,12 +238,21 @@ def main():
             if asyncio.get_event_loop().is_closed():
                 asyncio.set_event_loop(asyncio.new_event_loop())
             
+            # Tech-only runs drop clear non-tech items before fetching; retrain the classifier on newer history first
+            if tech_only:
+                tech_classifier.ensure_trained(os.path.join(project_root, "data", "processed_output"),
+                                               extra_records=item_store.window_records(0))
+            
             # Process all content asynchronously
             loop = asyncio.get_event_loop()
-            all_content_with_summary = loop.run_until_complete(
-                process_hotspot_with_summary(all_content, content_model_key, max_workers, 
-                                           tech_only, use_cache=not no_cache)
-            )
+            with run_budget.stage("process"):
+                all_content_with_summary = loop.run_until_complete(
+                    process_hotspot_with_summary(all_content, content_model_key, max_workers, 
+                                               tech_only, use_cache=not no_cache,
+                                               merged_file_path=merged_file_path,
+                                               completed_records=completed_records,
+                                               incremental=incremental)
+                )
             logger.info(f"Generated summaries for {len(all_content_with_summary)} items")
         except Exception as e:
             logger.error(f"Error getting webpage content or generating summaries: {str(e)}")
@@ -199,6 +262,20 @@ def main():
         all_content_with_summary = all_content
         logger.info("Skipped webpage content retrieval and summary generation")
     
+    # Persist redirects learned while fetching pages
+    redirect_cache.save()
+    manifest.complete_stage("processed", items=len(all_content_with_summary))
+    
+    # Incremental mode: add already processed items of the window that this run did not collect again
+    if incremental:
+        # Same window as filter_recent_hotspots: from midnight FILTER_DAYS days ago until now
+        collected_ids = {item_id for item in all_content for item_id in get_item_ids(item)}
+        retained = item_store.window_records(window_start(filter_days), exclude_ids=collected_ids)
+        if tech_only:
+            retained = [item for item in retained if item.get("is_tech", False)]
+        all_content_with_summary = all_content_with_summary + retained
+        logger.info(f"Incremental mode: {len(all_content)} collected items, {len(retained)} retained items from earlier runs in the window")
+    
     # Deduplicate based on title, prioritize RSS and Twitter
     logger.info(f"Starting title-based deduplication (prioritizing RSS/Twitter), items before: {len(all_content_with_summary)}")
     seen_titles = {}
@@ -237,41 +314,15 @@ def main():
     processed_filename = os.path.join(processed_output_dir, f"processed_news_{timestamp_str}.json")
     
     try:
-        # HTML tag cleaning function
-        def clean_html(text):
-            if not isinstance(text, str):
-                return text
-            # Use BeautifulSoup to clean HTML tags while preserving line breaks
-            soup = BeautifulSoup(text, 'html.parser')
-            # Convert <br> and </p> tags to newlines
-            for br in soup.find_all(['br', 'p']):
-                br.replace_with('\n' + br.get_text())
-            clean_text = soup.get_text()
-            # Clean extra whitespace while preserving line breaks
-            lines = clean_text.splitlines()
-            cleaned_lines = [re.sub(r'\s+', ' ', line).strip() for line in lines]
-            # Filter out empty lines and rejoin with newlines
-            clean_text = '\n'.join(line for line in cleaned_lines if line)
-            return clean_text
-
-        # Recursively clean all string values in dictionary
-        def clean_dict(item):
-            if isinstance(item, dict):
-                return {k: clean_dict(v) for k, v in item.items()}
-            elif isinstance(item, list):
-                return [clean_dict(i) for i in item]
-            elif isinstance(item, str):
-                return clean_html(item)
-            return item
-
-        # Clean HTML tags from all content
-        cleaned_content = [clean_dict(item) for item in deduplicated_content]
+        # Clean HTML tags from all content (line breaks preserved, plain strings skip parsing)
+        cleaned_content = [clean_html_fields(item) for item in deduplicated_content]
         
         # Save to JSON file
         import json 
         with open(processed_filename, 'w', encoding='utf-8') as f:
             json.dump(cleaned_content, f, ensure_ascii=False, indent=4)
         logger.info(f"Successfully saved processed news list (HTML tags cleaned and line breaks preserved) to: {processed_filename}")
+        manifest.complete_stage("saved", processed_file_path=processed_filename)
 
         # --- Generate RSS Feed ---
         try:
@@ -288,16 +339,7 @@ def main():
     except Exception as e:
         logger.error(f"Error saving processed news list to {processed_filename}: {str(e)}")
     
-    # Use Deepseek for summarization
-    summary = summarize_with_deepseek(deduplicated_content, deepseek_key,
-                                     deepseek_url, model_id, tech_only=tech_only)
-    
-    # Try multiple notification methods
-    success = notify(summary, tech_only)
-    if not success:
-        # If all configured notification methods fail, try original webhook as fallback
-        logger.warning("All configured notification methods failed, trying original webhook method")
-        send_to_webhook(webhook, summary, tech_only)
+    send_digest(manifest, deduplicated_content, deepseek_key, deepseek_url, model_id, webhook, tech_only)
     
     logger.info("Processing complete")
 
@@ -310,19 +352,34 @@ def main():
         os.path.join(project_root, "data", "outputs"),  # LLM output data
         os.path.join(project_root, "data", "webhook"),  # Webhook logs
         os.path.join(project_root, "data", "processed_output"),  # Processed output data
+        os.path.join(project_root, "data", "reports"),  # Token usage reports
     ]
     days_to_keep = 7 # Set retention period
     logger.info(f"Starting cleanup of data older than {days_to_keep} days...")
     for directory in directories_to_clean:
         cleanup_old_files(directory, days_to_keep=days_to_keep)
 
-    # Clean up cache in backend directory
-    cleanup_old_files("cache/summary", days_to_keep=days_to_keep, use_backend_dir=True)
+    # Expire old summaries and evict least recently used ones from the summary cache
+    summary_store.prune()
+    # Evict expired and oversized entries from the raw page cache
+    page_cache.prune()
+    # Remove spilled article content no longer referenced by recent runs
+    blob_store.prune()
 
     logger.info("Data cleanup complete")
     
-    # Print token usage summary
+    manifest.finish()
+    
+    # Report time per stage, items per summary tier and items degraded by the run deadline
+    run_budget.report()
+    
+    # Print token usage summary and save the per-stage/per-source report of this run
     token_tracker.print_summary()
+    token_tracker.save_report(extra={
+        "run_seconds": round(run_budget.elapsed(), 1),
+        "stage_seconds": {stage: round(seconds, 1) for stage, seconds in run_budget.stage_seconds.items()},
+        "summary_tiers": dict(run_budget.summary_tiers),
+    })
     
     return 0
 